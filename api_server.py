@@ -0,0 +1,365 @@
+"""
+KEPCO 용량 조회 REST/JSON API 서버
+
+Streamlit 화면 없이 GIS/CRM 등 외부 시스템이 용량 조회를 호출할 수 있도록 하는 경량 비동기
+HTTP 서버입니다(asyncio 표준 라이브러리만 사용). Streamlit 앱과 같은 KEPCOService 전역 자원
+(커넥션 풀, 속도 제한, 회로 차단기, 주소 캐시, SQLite 저장소, 동일 요청 병합)을 그대로 사용합니다.
+캐시에 있는 주소/용량은 이벤트 루프에서 바로 응답하고, 원격 조회만 스레드 풀로 넘깁니다.
+
+엔드포인트:
+    GET  /health
+    GET  /metrics                                   Prometheus 텍스트
+    GET  /v1/address?gbn=-1..4&do=&si=&gu=&lidong=  하위 주소 목록
+    GET  /v1/capacity?do=&si=&gu=&lidong=&li=&jibun= 설비별 용량 + 병목 요약
+    GET  /v1/transformer/<전산화번호>                배전용(공용)변압기 상별 용량
+    POST /v1/batch  {"sites": [{"do":..}, ...], "poles": ["1234A567", ...]}
+
+사용법:
+    python api_server.py --host 0.0.0.0 --port 8080
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from utils.bulk_screening import summarize_normalized
+from utils.cache import TTLCache
+from utils.kepco_api import AsyncKEPCOService, KEPCOService
+from utils.metrics import get_metrics
+from utils.normalize import normalize_mesh_rows, to_capacity_records
+from utils.transformer_batch import flatten_transformer_result, is_valid_pole_number
+
+API_METRIC = "kepcogrid_api_request_seconds"
+
+# gbn별 주소 목록 필드 (-1: 시/도)
+ADDRESS_FIELDS = {-1: "ADDR_DO", 0: "ADDR_SI", 1: "ADDR_GU", 2: "ADDR_LIDONG", 3: "ADDR_LI", 4: "ADDR_JIBUN"}
+ADDRESS_PARAMS = ["do", "si", "gu", "lidong", "li", "jibun"]
+
+BATCH_MAX = int(os.getenv("KEPCO_API_BATCH_MAX", "500"))
+MAX_BODY_BYTES = int(os.getenv("KEPCO_API_MAX_BODY", str(1024 * 1024)))
+KEEPALIVE_TIMEOUT = float(os.getenv("KEPCO_API_KEEPALIVE", "15"))
+# 요청 헤더 전체(및 본문)를 받는 제한 시간과 헤더 개수/크기 상한
+REQUEST_TIMEOUT = float(os.getenv("KEPCO_API_REQUEST_TIMEOUT", "15"))
+MAX_HEADER_COUNT = int(os.getenv("KEPCO_API_MAX_HEADERS", "100"))
+MAX_HEADER_BYTES = int(os.getenv("KEPCO_API_MAX_HEADER_BYTES", str(16 * 1024)))
+
+# 정규화까지 끝난 용량 응답 캐시 (앱의 KEPCO_MESH_CACHE_TTL과 같은 유지 시간)
+CAPACITY_CACHE = TTLCache(
+    ttl=float(os.getenv("KEPCO_MESH_CACHE_TTL", "600")),
+    max_entries=int(os.getenv("KEPCO_API_CACHE_MAX_ENTRIES", "20000"))
+)
+
+
+class APIError(Exception):
+    """요청 처리 오류 (status로 응답)"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _address_from(params: Dict[str, str]) -> Tuple[str, ...]:
+    """요청 값에서 정규화된 주소 (do, si, gu, lidong, li, jibun)"""
+    address = [str(params.get(name, "") or "").strip() for name in ADDRESS_PARAMS]
+    if address[4] == "(해당없음)":
+        address[4] = ""
+    return tuple(address)
+
+
+class CapacityAPI:
+    """라우팅과 조회 (HTTP 처리와 분리)"""
+
+    def __init__(self, service: Optional[KEPCOService] = None, concurrency: int = 16):
+        self.service = service or KEPCOService()
+        self.async_service = AsyncKEPCOService(self.service, max_concurrency=concurrency)
+        self.metrics = get_metrics()
+        self.started_at = time.time()
+
+    async def dispatch(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, object]:
+        """(상태 코드, JSON 객체 또는 텍스트) 반환"""
+        if path == "/health" and method == "GET":
+            return 200, {
+                "status": "ok",
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "circuit": self.service.client.breaker.state
+            }
+        if path == "/metrics" and method == "GET":
+            return 200, self.metrics.render_prometheus()
+        if path == "/v1/address" and method == "GET":
+            return 200, await self.address(query)
+        if path == "/v1/capacity" and method == "GET":
+            return 200, await self.capacity(_address_from(query))
+        if path.startswith("/v1/transformer/") and method == "GET":
+            return 200, await self.transformer(unquote(path[len("/v1/transformer/"):]))
+        if path == "/v1/batch" and method == "POST":
+            return 200, await self.batch(body)
+
+        known = {"/health", "/metrics", "/v1/address", "/v1/capacity", "/v1/batch"}
+        if path in known or path.startswith("/v1/transformer/"):
+            raise APIError(405, f"허용되지 않는 메서드: {method}")
+        raise APIError(404, f"경로 없음: {path}")
+
+    async def address(self, query: Dict[str, str]) -> Dict:
+        try:
+            gbn = int(query.get("gbn", "-1"))
+        except ValueError:
+            raise APIError(400, "gbn은 -1~4 정수여야 합니다")
+        if gbn not in ADDRESS_FIELDS:
+            raise APIError(400, "gbn은 -1~4 정수여야 합니다")
+
+        args = (gbn, *_address_from(query)[:4])
+        # 스냅샷/캐시에 있으면 스레드 전환 없이 응답
+        if self.service.has_address_data(*args):
+            items = self.service.get_address_data(*args)
+        else:
+            items = await self.async_service.get_address_data(*args)
+        if items is None:
+            raise APIError(502, "주소 데이터를 가져올 수 없습니다")
+
+        field = ADDRESS_FIELDS[gbn]
+        return {"gbn": gbn, "items": [item.get(field, "") for item in items]}
+
+    async def capacity(self, address: Tuple[str, ...]) -> Dict:
+        if not address[0] or not address[3]:
+            raise APIError(400, "do와 lidong은 필수입니다")
+
+        cached = CAPACITY_CACHE.get(address)
+        if cached is not None:
+            return cached
+
+        # 원격 조회와 정규화(1회)를 함께 스레드 풀에서 실행해 이벤트 루프를 막지 않음
+        result = await self.async_service.run(self._lookup_capacity, address)
+        if result is None:
+            raise APIError(502, "용량 정보를 가져올 수 없습니다")
+        CAPACITY_CACHE.set(address, result)
+        return result
+
+    def _lookup_capacity(self, address: Tuple[str, ...]) -> Optional[Dict]:
+        rows = self.service.retrieve_mesh_capacity("address", *address)
+        if rows is None:
+            return None
+        df = normalize_mesh_rows(rows)
+        return {
+            "address": dict(zip(ADDRESS_PARAMS, address)),
+            "summary": summarize_normalized(df),
+            "facilities": to_capacity_records(df)
+        }
+
+    async def transformer(self, pole_number: str) -> Dict:
+        pole_number = pole_number.strip().upper()
+        if not is_valid_pole_number(pole_number):
+            raise APIError(400, f"전산화번호 형식 오류: {pole_number} (예: 1234A567)")
+        data = await self.async_service.query_by_transformer_number(pole_number)
+        return flatten_transformer_result(pole_number, data)
+
+    async def batch(self, body: bytes) -> Dict:
+        try:
+            request = json.loads(body.decode("utf-8")) if body else {}
+        except (UnicodeDecodeError, ValueError):
+            raise APIError(400, "요청 본문이 올바른 JSON이 아닙니다")
+        if not isinstance(request, dict):
+            raise APIError(400, "요청 본문은 JSON 객체여야 합니다")
+
+        sites = request.get("sites", []) or []
+        poles = request.get("poles", []) or []
+        if not isinstance(sites, list) or not isinstance(poles, list):
+            raise APIError(400, "sites와 poles는 배열이어야 합니다")
+        if len(sites) + len(poles) > BATCH_MAX:
+            raise APIError(413, f"한 번에 최대 {BATCH_MAX}건까지 조회할 수 있습니다")
+
+        async def site_result(site) -> Dict:
+            address = _address_from(site if isinstance(site, dict) else {})
+            try:
+                return {**(await self.capacity(address)), "error": None}
+            except APIError as e:
+                return {"address": dict(zip(ADDRESS_PARAMS, address)), "error": e.message}
+
+        async def pole_result(pole) -> Dict:
+            try:
+                return {**(await self.transformer(str(pole))), "error": None}
+            except APIError as e:
+                return {"전산화번호": str(pole), "error": e.message}
+
+        # 동시 실행 수는 AsyncKEPCOService의 세마포어가 제한, 같은 주소는 single-flight로 병합
+        site_results, pole_results = await asyncio.gather(
+            asyncio.gather(*(site_result(site) for site in sites)),
+            asyncio.gather(*(pole_result(pole) for pole in poles))
+        )
+        return {"sites": list(site_results), "poles": list(pole_results)}
+
+    def close(self):
+        self.async_service.close()
+
+
+class RequestRejected(Exception):
+    """헤더를 끝까지 읽지 않고 응답 후 연결을 닫아야 하는 요청"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HTTPServer:
+    """asyncio 스트림 기반 HTTP/1.1 서버 (keep-alive, Content-Length 본문만 지원 - chunked 요청은 거부)"""
+
+    def __init__(self, api: CapacityAPI):
+        self.api = api
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                keep_alive = await self.handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handle_request(self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        start = time.perf_counter()
+        # 인코딩하지 않은 한글 경로도 받도록 바이트 단위로 나눈 뒤 UTF-8로 해석
+        parts = request_line.rstrip(b"\r\n").split(b" ")
+        if len(parts) != 3:
+            self.write_response(writer, 400, {"error": "잘못된 요청"}, keep_alive=False)
+            return False
+        method, target, version = (part.decode("utf-8", errors="replace") for part in parts)
+
+        try:
+            headers = await asyncio.wait_for(self.read_headers(reader), REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.write_response(writer, 408, {"error": "요청 헤더 수신 시간 초과"}, keep_alive=False)
+            return False
+        except RequestRejected as e:
+            self.write_response(writer, e.status, {"error": e.message}, keep_alive=False)
+            return False
+
+        # 본문 길이를 알 수 없으면 다음 요청과 경계를 나눌 수 없으므로 연결을 닫음
+        if headers.get("transfer-encoding", "").lower() not in ("", "identity"):
+            self.write_response(writer, 411, {"error": "Content-Length가 필요합니다 (chunked 전송 미지원)"}, keep_alive=False)
+            return False
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.write_response(writer, 400, {"error": "잘못된 Content-Length"}, keep_alive=False)
+            return False
+        if length > MAX_BODY_BYTES:
+            self.write_response(writer, 413, {"error": "요청 본문이 너무 큽니다"}, keep_alive=False)
+            return False
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), REQUEST_TIMEOUT) if length else b""
+        except asyncio.TimeoutError:
+            self.write_response(writer, 408, {"error": "요청 본문 수신 시간 초과"}, keep_alive=False)
+            return False
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        route = self.route_label(url.path)
+        try:
+            status, payload = await self.api.dispatch(method.upper(), url.path, query, body)
+        except APIError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            print(f"API 처리 오류 ({method} {url.path}): {str(e)}")
+            status, payload = 500, {"error": "내부 오류"}
+
+        self.write_response(writer, status, payload, keep_alive)
+        self.api.metrics.observe(API_METRIC, time.perf_counter() - start, error=status >= 500, route=route)
+        return keep_alive
+
+    @staticmethod
+    async def read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        """빈 줄까지 헤더 읽기 (개수/전체 크기 상한 초과 시 RequestRejected)"""
+        headers: Dict[str, str] = {}
+        count = total = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            count += 1
+            total += len(line)
+            if count > MAX_HEADER_COUNT or total > MAX_HEADER_BYTES:
+                raise RequestRejected(431, "요청 헤더가 너무 많거나 큽니다")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    def route_label(path: str) -> str:
+        """지표 라벨용 경로 (전산화번호는 묶음)"""
+        if path.startswith("/v1/transformer/"):
+            return "/v1/transformer"
+        return path if path in ("/health", "/metrics", "/v1/address", "/v1/capacity", "/v1/batch") else "other"
+
+    @staticmethod
+    def write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+
+        reason = HTTPStatus(status).phrase
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        # 헤더와 본문을 한 번에 써서 작은 응답이 두 패킷으로 나뉘지 않도록 함
+        writer.write(head.encode("latin-1") + body)
+
+
+async def serve(host: str, port: int, concurrency: int):
+    api = CapacityAPI(concurrency=concurrency)
+    server = await asyncio.start_server(HTTPServer(api).handle_connection, host, port)
+    addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"KEPCO 용량 조회 API 서버 실행 중: {addresses}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KEPCO 용량 조회 REST/JSON API 서버")
+    parser.add_argument("--host", default=os.getenv("KEPCO_API_HOST", "127.0.0.1"), help="바인드 주소")
+    parser.add_argument("--port", type=int, default=int(os.getenv("KEPCO_API_PORT", "8080")), help="포트")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("KEPCO_API_CONCURRENCY", "16")),
+                        help="원격 조회 동시 실행 수 (속도 제한은 별도로 전역 적용)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,17 @@ import streamlit as st
 import pandas as pd
 import json
 import os
+import threading
+import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
 from utils.kepco_api import KEPCOService
+from utils.address_prefetch import AddressPrefetcher
+from utils.regional_guidance import get_guidance_engine
+from utils.metrics import STAGE_METRIC, get_metrics, start_metrics_server
+from utils.normalize import format_capacity_record, normalize_mesh_rows, to_capacity_records
+from utils.bulk_screening import checkpoint_path_for, read_sites, screen_sites, to_csv_bytes
+from utils.transformer_batch import is_valid_pole_number, lookup_transformers, parse_pole_numbers
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
@@ -351,9 +359,86 @@ st.markdown("""
 # 세션 상태 초기화
 if 'search_history' not in st.session_state:
     st.session_state.search_history = []
+# 공유 선행 조회기에서 이 세션의 선택/예약을 구분하는 식별자
+if 'prefetch_session' not in st.session_state:
+    st.session_state.prefetch_session = uuid.uuid4().hex
 
 
 
+# 용량 조회 결과 캐시 유지 시간 (초)
+MESH_CACHE_TTL = int(os.getenv("KEPCO_MESH_CACHE_TTL", "600"))
+
+# 성능 지표 (관리자 화면은 KEPCO_ADMIN_PANEL=1일 때만 메뉴에 표시)
+METRICS = get_metrics()
+ADMIN_PANEL_ENABLED = os.getenv("KEPCO_ADMIN_PANEL", "") == "1"
+
+# st.cache_data 적중 여부 확인용 (미적중 시에만 캐시 함수 본문이 같은 스레드에서 실행됨)
+_page_cache_state = threading.local()
+
+
+class CapacityLookupError(Exception):
+    """용량 조회 실패 (st.cache_data는 예외를 캐시하지 않으므로 실패 결과는 재시도됨)"""
+
+
+@st.cache_resource
+def get_kepco_service() -> KEPCOService:
+    """세션/재실행 간 공유되는 KEPCO 서비스 (커넥션 풀·주소 캐시 재사용)"""
+    return KEPCOService()
+
+
+@st.cache_resource
+def get_address_prefetcher() -> AddressPrefetcher:
+    """다음 주소 단계 선행 조회기 (모든 세션이 공유, 작업자 수 제한)"""
+    return AddressPrefetcher(
+        get_kepco_service(),
+        workers=int(os.getenv("KEPCO_PREFETCH_WORKERS", "2")),
+        fanout=int(os.getenv("KEPCO_PREFETCH_FANOUT", "3"))
+    )
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    """KEPCO_METRICS_PORT가 있으면 Prometheus /metrics 서버를 프로세스당 한 번 시작"""
+    port = os.getenv("KEPCO_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_metrics_server(int(port))
+    except (OSError, ValueError) as e:
+        print(f"지표 서버 시작 오류: {str(e)}")
+        return None
+
+
+@st.cache_data(ttl=MESH_CACHE_TTL, show_spinner=False)
+def _cached_capacity_records(sido, si, gu, dong, li, jibun):
+    _page_cache_state.missed = True
+    mesh_results = get_kepco_service().retrieve_mesh_capacity(
+        search_condition="address",
+        addr_do=sido,
+        addr_si=si,
+        addr_gu=gu,
+        addr_lidong=dong,
+        addr_li=li,
+        addr_jibun=jibun
+    )
+    if mesh_results is None:
+        raise CapacityLookupError(f"{sido} {si} {gu} {dong} {li} {jibun}".strip())
+    return to_capacity_records(normalize_mesh_rows(mesh_results))
+
+
+def fetch_capacity_records(sido, si, gu, dong, li="", jibun="") -> Optional[List[Dict]]:
+    """정규화된 주소 기준으로 캐시된 용량 조회 결과 반환 (조회 실패 시 None)"""
+    li = "" if li == "(해당없음)" else li
+    address = tuple(str(v or "").strip() for v in (sido, si, gu, dong, li, jibun))
+    _page_cache_state.missed = False
+    try:
+        return _cached_capacity_records(*address)
+    except CapacityLookupError:
+        return None
+    finally:
+        METRICS.cache_access("mesh_page", not _page_cache_state.missed)
+
+
 def process_address_search(sido, si, gu, dong, li="", jibun=""):
     """주소별 검색 처리"""
     search_query = f"{sido} {si} {gu} {dong}"
@@ -364,87 +449,10 @@ def process_address_search(sido, si, gu, dong, li="", jibun=""):
     
     st.session_state.search_history.append(search_query)
     
-    # KEPCO 서비스를 통한 실제 용량 조회
-    kepco_service = KEPCOService()
-    
-    # retrieve_mesh_capacity 메서드 사용으로 정확한 용량 계산
-    mesh_results = kepco_service.retrieve_mesh_capacity(
-        search_condition="address",
-        addr_do=sido,
-        addr_si=si,
-        addr_gu=gu,
-        addr_lidong=dong,
-        addr_li=li if li != "(해당없음)" else "",
-        addr_jibun=jibun
-    )
+    # 정규화된 주소 기준 캐시 조회 (같은 주소 재검색 시 원격 호출 없음)
+    formatted_results = fetch_capacity_records(sido, si, gu, dong, li, jibun)
     
-    # 결과가 있으면 표준 형식으로 변환
-    if mesh_results and len(mesh_results) > 0:
-        formatted_results = []
-        for item in mesh_results:
-            # 수정된 API 필드 매핑을 사용한 데이터 추출
-            subst_capa = int(item.get("SUBST_CAPA", 0))  # 변전소 접속기준용량
-            subst_pwr = int(item.get("SUBST_PWR", 0))    # 변전소 접수기준 접속용량
-            mtr_capa = int(item.get("MTR_CAPA", 0))      # 주변압기 접속기준용량
-            mtr_pwr = int(item.get("MTR_PWR", 0))        # 주변압기 접수기준 접속용량
-            dl_capa = int(item.get("DL_CAPA", 0))        # 배전선로 접속기준용량
-            dl_pwr = int(item.get("DL_PWR", 0))          # 배전선로 접수기준 접속용량
-            
-            # 접수기준 접속 여유용량 (API에서 직접 제공)
-            vol_1 = int(item.get("VOL_1", 0))            # 변전소 접수기준 접속 여유용량
-            vol_2 = int(item.get("VOL_2", 0))            # 주변압기 접수기준 접속 여유용량  
-            vol_3 = int(item.get("VOL_3", 0))            # 배전선로 접수기준 접속 여유용량
-            
-            # 접속계획 반영 접속용량 (실제 접속 가능 용량)
-            g_subst_capa = int(item.get("G_SUBST_CAPA", 0))  # 변전소 접속계획 반영 접속용량
-            g_mtr_capa = int(item.get("G_MTR_CAPA", 0))      # 주변압기 접속계획 반영 접속용량
-            g_dl_capa = int(item.get("G_DL_CAPA", 0))        # 배전선로 접속계획 반영 접속용량
-            
-            # 최종 접속가능용량은 세 단계의 최소값 (병목 지점)
-            min_available = min([v for v in [g_subst_capa, g_mtr_capa, g_dl_capa] if v >= 0])
-            status = "정상" if min_available > 0 else "포화"
-            
-            capacity_data = {
-                "변전소": item.get("SUBST_NM", ""),
-                "변전소코드": item.get("SUBST_CD", ""),
-                "주변압기": f"TR-{item.get('MTR_NO', '')}" if item.get('MTR_NO') else "-",
-                "배전선로": item.get("DL_NM", "") or "-",
-                "배전선로코드": item.get("DL_CD", ""),
-                # 접속기준용량 (각 설비의 최대 설계 용량)
-                "변전소접속기준용량": f"{subst_capa:,} kW",
-                "주변압기접속기준용량": f"{mtr_capa:,} kW", 
-                "배전선로접속기준용량": f"{dl_capa:,} kW",
-                # 접수기준접속용량 (현재 실제 접속된 용량)
-                "변전소접수기준접속용량": f"{subst_pwr:,} kW",
-                "주변압기접수기준접속용량": f"{mtr_pwr:,} kW",
-                "배전선로접수기준접속용량": f"{dl_pwr:,} kW",
-                # 접수기준 접속 여유용량 (API에서 직접 계산된 값)
-                "변전소여유용량": f"{vol_1:,} kW",
-                "주변압기여유용량": f"{vol_2:,} kW",
-                "배전선로여유용량": f"{vol_3:,} kW",
-                # 접속계획 반영 접속용량 (실제 계획이 반영된 접속용량)
-                "변전소접속계획반영접속용량": f"{g_subst_capa:,} kW",
-                "주변압기접속계획반영접속용량": f"{g_mtr_capa:,} kW",
-                "배전선로접속계획반영접속용량": f"{g_dl_capa:,} kW",
-                # 최종 접속가능용량 (병목지점의 용량)
-                "최종접속가능용량": min_available,
-                "상태": status,
-                # 원본 API 데이터 보존
-                "SUBST_CAPA": subst_capa,
-                "SUBST_PWR": subst_pwr,
-                "MTR_CAPA": mtr_capa,
-                "MTR_PWR": mtr_pwr,
-                "DL_CAPA": dl_capa,
-                "DL_PWR": dl_pwr,
-                "VOL_1": vol_1,
-                "VOL_2": vol_2,
-                "VOL_3": vol_3,
-                "G_SUBST_CAPA": g_subst_capa,
-                "G_MTR_CAPA": g_mtr_capa,
-                "G_DL_CAPA": g_dl_capa
-            }
-            formatted_results.append(capacity_data)
-        
+    if formatted_results:
         st.session_state.search_results = formatted_results
         # 검색 기록에 저장 (성공한 경우)
         query_address = f"{sido} {si} {dong}"
@@ -460,7 +468,8 @@ def process_address_search(sido, si, gu, dong, li="", jibun=""):
             query_address += f" {li}"
         add_to_search_history('주소기반 검색', query_address, [])
     
-    st.rerun()
+    # 주소 선택 fragment에서 호출되므로 결과/히스토리 영역까지 전체 재실행
+    st.rerun(scope="app")
 
 def display_detailed_analysis(facility):
     """상세 분석 및 해설 표시"""
@@ -627,39 +636,11 @@ def display_detailed_analysis(facility):
     """)
 
 def get_regional_guidance(addr_do, subst_cd):
-    """지역별 특별 안내사항 반환"""
-    
-    # 특별 변전소 코드 기반 안내
-    special_subst_codes = ['S621', 'D372']  # 운남, 안좌
-    if subst_cd in special_subst_codes:
-        return "※ 해당 변전소는 송전계통 보강이 필요하므로, 계통보강('31.12월 예정) 후 발전소 연계가능"
-    
-    # 지역별 안내사항
-    if addr_do in ["광주광역시", "전라남도"]:
-        return "※ 해당 변전소는 송전계통 보강이 필요하므로, 계통보강('31.12월 예정) 후 발전소 연계가능 ('24. 8. 31부터 적용)"
-    
-    elif addr_do == "전북특별자치도":
-        special_jeonbuk_codes = ['2674', '2274', '2463', 'SC03', 'D510', '2742', 'E541']
-        if subst_cd in special_jeonbuk_codes:
-            return "※ 해당 변전소는 송전계통 보강이 필요하므로, 계통보강('31.12월 예정) 후 발전소 연계가능"
-        else:
-            return "※ 해당 변전소는 송전계통 보강이 필요하므로, 계통보강('31.12월 예정) 후 발전소 연계가능 ('24. 8. 31부터 적용)"
-    
-    elif addr_do == "제주특별자치도":
-        return "※ 해당 변전소는 신규 발전소 연계시 전력수급의 균형 및 안정적 전력계통 운영에 지장을 줄 수 있어, 발전소 연계 잠정보류(추후 대책 마련 예정) [단, 1MW 이하 발전소의 경우 '24. 8. 31부터 적용]"
-    
-    elif addr_do == "강원특별자치도":
-        gangwon_codes = ['2510', '4363', 'S401', 'S418', 'S440', 'S423', '2447', 'S408', 'S432', 'E198', 'D338', 'E404', 'E541']
-        if subst_cd in gangwon_codes:
-            return "※ 해당 변전소는 송전계통 보강이 필요하므로, 계통보강('26.6월 예정) 후 발전소 연계가능"
-    
-    elif addr_do == "경상북도":
-        gyeongbuk_codes = ['2521', 'S718', 'E204', '2733', 'E318']
-        if subst_cd in gyeongbuk_codes:
-            return "※ 해당 변전소는 송전계통 보강이 필요하므로, 계통보강('26.12월 예정) 후 발전소 연계가능"
-    
-    return None
+    """지역별 특별 안내사항 반환 (data/regional_guidance.json 규칙 엔진)"""
+    return get_guidance_engine().lookup(addr_do, subst_cd)
 
+@st.cache_data(max_entries=256, show_spinner=False)
+@METRICS.timed(STAGE_METRIC, stage="chart")
 def create_capacity_chart(facility_name, facility_type, accepted_capacity, planned_capacity, standard_capacity):
     """
     용량 차트 생성 함수 - 텍스트 겹침 방지 최적화
@@ -857,6 +838,7 @@ def create_capacity_chart(facility_name, facility_type, accepted_capacity, plann
         st.error(f"차트 생성 중 오류가 발생했습니다: {str(e)}")
         return None, "오류", 0, 0
 
+@METRICS.timed(STAGE_METRIC, stage="display_results")
 def display_results(results):
     """검색 결과 표시"""
     # results가 리스트인지 딕셔너리인지 확인
@@ -954,7 +936,7 @@ def display_results(results):
     with tab1:
         if results_data:
             # 첫 번째 결과만 상세 표시
-            facility = results_data[0]
+            facility = format_capacity_record(results_data[0])
             
             # 그래프 섹션 추가
             st.markdown("## 📊 용량 분석 차트")
@@ -977,9 +959,9 @@ def display_results(results):
                 subst_chart, subst_status, _, _ = create_capacity_chart(
                     facility.get('변전소', 'N/A'),
                     "변전소",
-                    facility.get('변전소접수기준접속용량', 0),
-                    facility.get('변전소접속계획반영접속용량', 0),
-                    facility.get('변전소접속기준용량', 0)
+                    facility.get('SUBST_PWR', 0),
+                    facility.get('G_SUBST_CAPA', 0),
+                    facility.get('SUBST_CAPA', 0)
                 )
                 if subst_chart:
                     st.plotly_chart(subst_chart, use_container_width=True)
@@ -989,9 +971,9 @@ def display_results(results):
                 mtr_chart, mtr_status, _, _ = create_capacity_chart(
                     facility.get('주변압기', 'N/A'),
                     "주변압기", 
-                    facility.get('주변압기접수기준접속용량', 0),
-                    facility.get('주변압기접속계획반영접속용량', 0),
-                    facility.get('주변압기접속기준용량', 0)
+                    facility.get('MTR_PWR', 0),
+                    facility.get('G_MTR_CAPA', 0),
+                    facility.get('MTR_CAPA', 0)
                 )
                 if mtr_chart:
                     st.plotly_chart(mtr_chart, use_container_width=True)
@@ -1001,9 +983,9 @@ def display_results(results):
                 dl_chart, dl_status, _, _ = create_capacity_chart(
                     facility.get('배전선로', 'N/A'),
                     "배전선로",
-                    facility.get('배전선로접수기준접속용량', 0),
-                    facility.get('배전선로접속계획반영접속용량', 0),
-                    facility.get('배전선로접속기준용량', 0)
+                    facility.get('DL_PWR', 0),
+                    facility.get('G_DL_CAPA', 0),
+                    facility.get('DL_CAPA', 0)
                 )
                 if dl_chart:
                     st.plotly_chart(dl_chart, use_container_width=True)
@@ -1065,7 +1047,7 @@ def display_results(results):
     with tab2:
         # 데이터프레임으로 표시
         if results_data:
-            df = pd.DataFrame(results_data)
+            df = pd.DataFrame([format_capacity_record(r) for r in results_data])
             st.dataframe(df, use_container_width=True)
         else:
             st.warning("표시할 데이터가 없습니다.")
@@ -1162,6 +1144,7 @@ def show_search_history_menu():
                     # 컬럼 오류를 방지하기 위해 간단한 표시 방식 사용
                     st.markdown("**검색 결과:**")
                     for idx, result in enumerate(results):
+                        result = format_capacity_record(result)
                         with st.container():
                             st.markdown(f"**📍 결과 {idx+1}**")
                             col1, col2 = st.columns(2)
@@ -1182,6 +1165,7 @@ def main():
     
     # 검색 히스토리 초기화
     initialize_search_history()
+    start_metrics_endpoint()
     
     # CSS 스타일 추가
     st.markdown("""
@@ -1355,6 +1339,10 @@ def main():
         show_address_based_search_menu()
     elif st.session_state.selected_menu == 3:
         show_search_history_menu()
+    elif st.session_state.selected_menu == 4:
+        show_bulk_screening_menu()
+    elif st.session_state.selected_menu == 5 and ADMIN_PANEL_ENABLED:
+        show_metrics_admin_menu()
 
 def show_main_menu():
     """메인 메뉴 화면 표시"""
@@ -1389,9 +1377,9 @@ def show_main_menu():
             st.session_state.selected_menu = 2
             st.rerun()
     
-    # 검색 기록 버튼 추가
+    # 검색 기록 / 일괄 조회 버튼 추가
     st.markdown("---")
-    history_col1, history_col2, history_col3 = st.columns([1, 2, 1])
+    history_col1, history_col2, history_col3, history_col4 = st.columns([1, 2, 2, 1])
     with history_col2:
         history_count = len(st.session_state.get('search_history', []))
         history_text = f"📝 검색 기록 조회 ({history_count}건)" if history_count > 0 else "📝 검색 기록 조회"
@@ -1400,6 +1388,18 @@ def show_main_menu():
             st.session_state.selected_menu = 3
             st.rerun()
     
+    with history_col3:
+        if st.button("📂 후보지 일괄 조회", key="menu4", use_container_width=True, type="secondary"):
+            st.session_state.selected_menu = 4
+            st.rerun()
+    
+    if ADMIN_PANEL_ENABLED:
+        _, admin_col, _ = st.columns([1, 2, 1])
+        with admin_col:
+            if st.button("🛠️ 관리자: 성능 지표", key="menu5", use_container_width=True, type="secondary"):
+                st.session_state.selected_menu = 5
+                st.rerun()
+    
     # 시스템 소개
     st.markdown("---")
     st.markdown("## ℹ️ 시스템 소개")
@@ -1446,14 +1446,16 @@ def show_transformer_capacity_menu():
         # 변압기 검색 관련 세션 상태 초기화
         if 'transformer_search_results' in st.session_state:
             del st.session_state.transformer_search_results
+        if 'transformer_batch_results' in st.session_state:
+            del st.session_state.transformer_batch_results
         st.rerun()
     
     st.markdown("---")
     st.markdown("## 🔌 배전용(공용)변압기 용량조회")
     st.markdown("**전산화번호로 배전용(공용)변압기의 접속 가능 용량을 조회합니다.**")
     
-    # KEPCO 서비스 인스턴스 생성
-    kepco_service = KEPCOService()
+    # 공유 KEPCO 서비스 인스턴스
+    kepco_service = get_kepco_service()
     
     # 전산화번호 검색 영역
     st.markdown("### 🔍 전산화번호 검색")
@@ -1485,7 +1487,7 @@ def show_transformer_capacity_menu():
         # 전산화번호 형식 검증 (8자리: 숫자4자리+영문1자리+숫자3자리)
         clean_number = pole_number.strip().upper()
         
-        if len(clean_number) == 8 and clean_number[:4].isdigit() and clean_number[4].isalpha() and clean_number[5:].isdigit():
+        if is_valid_pole_number(clean_number):
             with st.spinner(f"전산화번호 {clean_number}에 대한 변압기 정보를 조회하는 중..."):
                 transformer_data = kepco_service.query_by_transformer_number(clean_number)
                 
@@ -1499,6 +1501,47 @@ def show_transformer_capacity_menu():
         else:
             st.error("올바른 전산화번호를 입력해 주세요. (형식: 9185W431 - 숫자4자리+영문1자리+숫자3자리)")
     
+    # 일괄 조회
+    with st.expander("📋 전산화번호 일괄 조회"):
+        st.markdown("여러 전산화번호를 줄바꿈 또는 쉼표로 구분해 입력하거나, 첫 번째 컬럼에 번호가 있는 CSV 파일을 올려 주세요.")
+        batch_text = st.text_area("전산화번호 목록", placeholder="9185W431\n1234W123", key="transformer_batch_input")
+        batch_file = st.file_uploader("전산화번호 CSV", type=["csv"], key="transformer_batch_file")
+        
+        if st.button("🔍 일괄 조회", key="transformer_batch_btn", type="primary", use_container_width=True):
+            pole_numbers = parse_pole_numbers(batch_text)
+            file_error = None
+            if batch_file is not None:
+                try:
+                    file_df = pd.read_csv(batch_file, dtype=str, header=None, encoding="utf-8-sig")
+                    pole_numbers += file_df.iloc[:, 0].dropna().tolist()
+                except ValueError as e:
+                    file_error = str(e)
+            
+            if file_error is not None:
+                st.error(f"파일을 읽을 수 없습니다: {file_error}")
+            elif pole_numbers:
+                progress_bar = st.progress(0.0, text="일괄 조회 중...")
+                st.session_state.transformer_batch_results = lookup_transformers(
+                    kepco_service,
+                    pole_numbers,
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"일괄 조회 중... {done}/{total}")
+                )
+                progress_bar.progress(1.0, text="조회 완료")
+            else:
+                st.warning("조회할 전산화번호를 입력해 주세요.")
+        
+        if 'transformer_batch_results' in st.session_state:
+            batch_df = st.session_state.transformer_batch_results
+            st.markdown(f"**조회 결과: {len(batch_df)}건 (최소 상 여유용량 순)**")
+            st.dataframe(batch_df, use_container_width=True, hide_index=True)
+            st.download_button(
+                "💾 결과 CSV 다운로드",
+                data=batch_df.to_csv(index=False).encode("utf-8-sig"),
+                file_name=f"transformers_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                key="transformer_batch_download"
+            )
+    
     # 검색 결과 표시
     if 'transformer_search_results' in st.session_state and st.session_state.transformer_search_results:
         display_transformer_results(st.session_state.transformer_search_results)
@@ -1652,6 +1695,158 @@ def display_transformer_results(transformer_data: Dict):
         평일 09:00 ~ 18:00
         """)
 
+def show_bulk_screening_menu():
+    """후보지 일괄 스크리닝 메뉴 (4번 메뉴)"""
+    
+    # 뒤로가기 버튼
+    if st.button("🏠 메인 메뉴로 돌아가기"):
+        st.session_state.selected_menu = None
+        if 'screening_results' in st.session_state:
+            del st.session_state.screening_results
+        st.rerun()
+    
+    st.markdown("---")
+    st.markdown("## 📂 후보지 일괄 조회")
+    st.markdown("**여러 후보지 주소를 파일로 올려 병목 설비와 최종접속가능용량을 한 번에 조회합니다.**")
+    
+    st.info("CSV 또는 Excel 파일에 시/도, 시/군, 구/군, 읍/면/동, 리, 번지 컬럼을 포함해 주세요. (리, 번지는 선택)")
+    
+    uploaded_file = st.file_uploader("후보지 파일 업로드", type=["csv", "xlsx", "xls"], key="screening_file")
+    
+    option_col1, option_col2 = st.columns(2)
+    with option_col1:
+        concurrency = st.slider("동시 조회 수", min_value=1, max_value=16, value=4)
+    with option_col2:
+        rate = st.slider("초당 최대 요청 수", min_value=0.5, max_value=10.0, value=2.0, step=0.5)
+    
+    if uploaded_file is not None and st.button("🔍 일괄 조회 시작", type="primary", use_container_width=True):
+        content = uploaded_file.getvalue()
+        try:
+            sites = read_sites(uploaded_file, uploaded_file.name)
+        except (ValueError, ImportError, OSError) as e:
+            # ImportError: .xls(xlrd) 등 Excel 읽기 패키지가 설치되지 않은 경우
+            st.error(f"파일을 읽을 수 없습니다: {str(e)}")
+            return
+        
+        progress_bar = st.progress(0.0, text="조회 준비 중...")
+        
+        def update_progress(done, total):
+            progress_bar.progress(done / max(total, 1), text=f"조회 중... {done}/{total}")
+        
+        # 같은 파일을 다시 올리면 체크포인트부터 이어서 조회
+        st.session_state.screening_results = screen_sites(
+            get_kepco_service(),
+            sites,
+            concurrency=concurrency,
+            rate=rate,
+            checkpoint_path=checkpoint_path_for(content),
+            progress=update_progress
+        )
+        progress_bar.progress(1.0, text="조회 완료")
+    
+    if 'screening_results' in st.session_state:
+        results_df = st.session_state.screening_results
+        
+        st.markdown("---")
+        st.markdown("## 📊 일괄 조회 결과")
+        
+        metric_col1, metric_col2, metric_col3 = st.columns(3)
+        with metric_col1:
+            st.metric("후보지 수", f"{len(results_df)}개")
+        with metric_col2:
+            st.metric("접속 가능", f"{int((results_df['상태'] == '정상').sum())}개")
+        with metric_col3:
+            st.metric("포화/실패", f"{int((results_df['상태'] != '정상').sum())}개")
+        
+        st.dataframe(results_df, use_container_width=True, hide_index=True)
+        st.download_button(
+            "💾 결과 CSV 다운로드",
+            data=to_csv_bytes(results_df),
+            file_name=f"screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+def show_metrics_admin_menu():
+    """성능 지표 관리자 화면 (5번 메뉴) - 원격 호출/처리 단계 지연, 오류, 캐시 적중률"""
+    
+    # 뒤로가기 버튼
+    if st.button("🏠 메인 메뉴로 돌아가기"):
+        st.session_state.selected_menu = None
+        st.rerun()
+    
+    st.markdown("---")
+    st.markdown("## 🛠️ 성능 지표")
+    st.markdown("**이 프로세스에서 집계한 지연 시간(p50/p95/p99), 오류 수, 캐시 적중률입니다.**")
+    
+    snapshot = METRICS.snapshot()
+    upstream = [h for h in snapshot["histograms"] if h["metric"] != STAGE_METRIC]
+    stages = [h for h in snapshot["histograms"] if h["metric"] == STAGE_METRIC]
+    
+    total_calls = sum(h["count"] for h in upstream)
+    total_errors = sum(h["errors"] for h in upstream)
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    with metric_col1:
+        st.metric("집계 시간", f"{snapshot['uptime_s'] / 60:,.1f}분")
+    with metric_col2:
+        st.metric("KEPCO 호출", f"{total_calls:,}건")
+    with metric_col3:
+        st.metric("KEPCO 오류", f"{total_errors:,}건", f"{total_errors / total_calls:.1%}" if total_calls else None, delta_color="inverse")
+    
+    def histogram_table(histograms, label_columns):
+        return pd.DataFrame([
+            {
+                **{title: h["labels"].get(label, "") for title, label in label_columns},
+                "호출 수": h["count"],
+                "오류 수": h["errors"],
+                "평균(ms)": h["mean_ms"],
+                "p50(ms)": h["p50_ms"],
+                "p95(ms)": h["p95_ms"],
+                "p99(ms)": h["p99_ms"],
+                "최대(ms)": h["max_ms"]
+            }
+            for h in histograms
+        ])
+    
+    st.markdown("### 🌐 KEPCO 원격 호출")
+    if upstream:
+        st.dataframe(histogram_table(upstream, [("엔드포인트", "endpoint"), ("gbn", "gbn")]), use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 원격 호출 기록이 없습니다.")
+    
+    st.markdown("### ⚙️ 처리 단계")
+    if stages:
+        st.dataframe(histogram_table(stages, [("단계", "stage")]), use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 처리 기록이 없습니다.")
+    
+    st.markdown("### 💾 캐시 적중률")
+    if snapshot["caches"]:
+        st.dataframe(pd.DataFrame([
+            {"캐시": c["cache"], "적중": c["hits"], "미적중": c["misses"], "적중률(%)": round(c["hit_ratio"] * 100, 1)}
+            for c in snapshot["caches"]
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 캐시 조회 기록이 없습니다.")
+    
+    if snapshot["gauges"]:
+        with st.expander("기타 지표"):
+            st.dataframe(pd.DataFrame(
+                [{"지표": name, "값": value} for name, value in snapshot["gauges"].items()]
+            ), use_container_width=True, hide_index=True)
+    
+    with st.expander("Prometheus 텍스트"):
+        st.code(METRICS.render_prometheus(), language="text")
+    
+    action_col1, action_col2 = st.columns(2)
+    with action_col1:
+        if st.button("🔄 새로고침", use_container_width=True):
+            st.rerun()
+    with action_col2:
+        if st.button("🗑️ 지표 초기화", use_container_width=True):
+            METRICS.reset()
+            st.rerun()
+
 def show_address_based_search_menu():
     """배전선로/주변압기/변전소 용량조회 메뉴 (2번 메뉴) - 기존 앱 기능"""
     
@@ -1667,150 +1862,137 @@ def show_address_based_search_menu():
     st.markdown("## 🏢 배전선로/주변압기/변전소 용량조회")
     st.markdown("**주소 기반 검색을 통해 해당 지역의 전력설비 접속 용량을 조회합니다.**")
     
-    # KEPCO 서비스 인스턴스 생성
-    kepco_service = KEPCOService()
+    # 주소 선택, 조회 결과, 사이드바 히스토리는 각각 독립적으로 재실행되는 fragment
+    address_picker_fragment()
+    
+    with st.sidebar:
+        search_history_sidebar_fragment()
+    
+    search_results_fragment()
+
+
+@st.fragment
+def address_picker_fragment():
+    """주소 선택 영역 (선택 변경 시 이 영역만 재실행)"""
+    # 공유 KEPCO 서비스 인스턴스 (주소 목록은 서비스 공용 캐시에서 조회)
+    kepco_service = get_kepco_service()
+    prefetcher = get_address_prefetcher()
     
     # 시/도 선택
-    if 'sido_list' not in st.session_state:
-        with st.spinner("시/도 정보를 불러오는 중..."):
-            sido_data = kepco_service.get_address_data(-1)
-            if sido_data:
-                st.session_state.sido_list = [item.get('ADDR_DO', '') for item in sido_data]
-            else:
-                st.session_state.sido_list = [
-                    "강원특별자치도", "경기도", "경상남도", "경상북도", "광주광역시",
-                    "대구광역시", "대전광역시", "부산광역시", "서울특별시", "세종특별자치시",
-                    "울산광역시", "인천광역시", "전라남도", "전북특별자치도", "제주특별자치도",
-                    "충청남도", "충청북도"
-                ]
+    with st.spinner("시/도 정보를 불러오는 중..."):
+        sido_data = kepco_service.get_address_data(-1)
+    if sido_data:
+        sido_list = [item.get('ADDR_DO', '') for item in sido_data]
+    else:
+        sido_list = [
+            "강원특별자치도", "경기도", "경상남도", "경상북도", "광주광역시",
+            "대구광역시", "대전광역시", "부산광역시", "서울특별시", "세종특별자치시",
+            "울산광역시", "인천광역시", "전라남도", "전북특별자치도", "제주특별자치도",
+            "충청남도", "충청북도"
+        ]
         
     # 첫 번째 행: 시/도, 시/군, 구/군
     addr_col1, addr_col2, addr_col3 = st.columns(3)
     
     with addr_col1:
-        selected_sido = st.selectbox("시/도", st.session_state.sido_list, 
-                                   index=st.session_state.sido_list.index("전북특별자치도") if "전북특별자치도" in st.session_state.sido_list else 0,
+        selected_sido = st.selectbox("시/도", sido_list, 
+                                   index=sido_list.index("전북특별자치도") if "전북특별자치도" in sido_list else 0,
                                    key="addr_sido")
     
     with addr_col2:
         # 시/군 선택
-        si_key = f"si_list_{selected_sido}"
-        if si_key not in st.session_state or st.session_state.get('current_sido') != selected_sido:
-            with st.spinner("시/군 정보를 불러오는 중..."):
-                si_data = kepco_service.get_address_data(0, addr_do=selected_sido)
-                if si_data:
-                    st.session_state[si_key] = [item.get('ADDR_SI', '') for item in si_data]
-                else:
-                    st.session_state[si_key] = ["정보를 불러올 수 없습니다"]
-                st.session_state.current_sido = selected_sido
+        with st.spinner("시/군 정보를 불러오는 중..."):
+            si_data = kepco_service.get_address_data(0, addr_do=selected_sido)
+        si_list = [item.get('ADDR_SI', '') for item in si_data] if si_data else ["정보를 불러올 수 없습니다"]
+        if si_data:
+            # 사용자가 시/군을 고르는 동안 주요 시/군의 구/군 목록을 미리 조회
+            prefetcher.on_sido_selected(selected_sido, session=st.session_state.prefetch_session)
         
-        selected_si = st.selectbox("시/군", st.session_state.get(si_key, []), key="addr_si")
+        selected_si = st.selectbox("시/군", si_list, key="addr_si")
     
     with addr_col3:
         # 구/군 선택
-        gun_key = f"gun_list_{selected_sido}_{selected_si}"
-        if gun_key not in st.session_state or st.session_state.get('current_si') != selected_si:
-            with st.spinner("구/군 정보를 불러오는 중..."):
-                gun_data = kepco_service.get_address_data(1, addr_do=selected_sido, addr_si=selected_si)
-                if gun_data:
-                    st.session_state[gun_key] = [item.get('ADDR_GU', '') for item in gun_data]
-                else:
-                    st.session_state[gun_key] = ["정보를 불러올 수 없습니다"]
-                st.session_state.current_si = selected_si
+        with st.spinner("구/군 정보를 불러오는 중..."):
+            gun_data = kepco_service.get_address_data(1, addr_do=selected_sido, addr_si=selected_si)
+        gun_list = [item.get('ADDR_GU', '') for item in gun_data] if gun_data else ["정보를 불러올 수 없습니다"]
+        if gun_data:
+            prefetcher.on_si_selected(selected_sido, selected_si, session=st.session_state.prefetch_session)
         
-        selected_gun = st.selectbox("구/군", st.session_state.get(gun_key, []), key="addr_gun")
+        selected_gun = st.selectbox("구/군", gun_list, key="addr_gun")
     
     # 두 번째 행: 읍/면/동, 리, 상세번지
     addr_col4, addr_col5, addr_col6 = st.columns(3)
     
     with addr_col4:
         # 읍/면/동 선택
-        dong_key = f"dong_list_{selected_sido}_{selected_si}_{selected_gun}"
-        if dong_key not in st.session_state or st.session_state.get('current_gun') != selected_gun:
-            with st.spinner("읍/면/동 정보를 불러오는 중..."):
-                dong_data = kepco_service.get_address_data(2, addr_do=selected_sido, addr_si=selected_si, addr_gu=selected_gun)
-                if dong_data:
-                    st.session_state[dong_key] = [item.get('ADDR_LIDONG', '') for item in dong_data]
-                else:
-                    st.session_state[dong_key] = ["정보를 불러올 수 없습니다"]
-                st.session_state.current_gun = selected_gun
+        with st.spinner("읍/면/동 정보를 불러오는 중..."):
+            dong_data = kepco_service.get_address_data(2, addr_do=selected_sido, addr_si=selected_si, addr_gu=selected_gun)
+        dong_list = [item.get('ADDR_LIDONG', '') for item in dong_data] if dong_data else ["정보를 불러올 수 없습니다"]
         
-        selected_dong = st.selectbox("읍/면/동", st.session_state.get(dong_key, []), key="addr_dong")
+        selected_dong = st.selectbox("읍/면/동", dong_list, key="addr_dong")
+    
+    dong_selected = selected_dong and selected_dong not in ["정보를 불러올 수 없습니다"]
     
     with addr_col5:
         # 리 선택 (선택사항)
-        li_key = f"li_list_{selected_sido}_{selected_si}_{selected_gun}_{selected_dong}"
-        if li_key not in st.session_state or st.session_state.get('current_dong') != selected_dong:
-            if selected_dong and selected_dong not in ["정보를 불러올 수 없습니다"]:
-                with st.spinner("리 정보를 확인하는 중..."):
-                    li_data = kepco_service.get_address_data(3, addr_do=selected_sido, addr_si=selected_si, addr_gu=selected_gun, addr_lidong=selected_dong)
-                    if li_data:
-                        li_options = [item.get('ADDR_LI', '') for item in li_data if item.get('ADDR_LI')]
-                        if li_options:
-                            st.session_state[li_key] = li_options
-                        else:
-                            st.session_state[li_key] = ["(해당없음)"]
-                    else:
-                        st.session_state[li_key] = ["(해당없음)"]
-                    st.session_state.current_dong = selected_dong
-            else:
-                st.session_state[li_key] = ["(해당없음)"]
+        li_options = []
+        if dong_selected:
+            with st.spinner("리 정보를 확인하는 중..."):
+                li_data = kepco_service.get_address_data(3, addr_do=selected_sido, addr_si=selected_si, addr_gu=selected_gun, addr_lidong=selected_dong)
+            if li_data:
+                li_options = [item.get('ADDR_LI', '') for item in li_data if item.get('ADDR_LI')]
         
-        selected_li = st.selectbox("리 (선택)", st.session_state.get(li_key, ["(해당없음)"]), key="addr_li")
+        selected_li = st.selectbox("리 (선택)", li_options or ["(해당없음)"], key="addr_li")
     
     with addr_col6:
         # 상세번지 선택 - 동적 로드
-        jibun_key = f"jibun_list_{selected_sido}_{selected_si}_{selected_gun}_{selected_dong}"
-        if jibun_key not in st.session_state or st.session_state.get('current_dong') != selected_dong:
-            if selected_dong and selected_dong not in ["정보를 불러올 수 없습니다"]:
-                with st.spinner("상세번지 정보를 불러오는 중..."):
-                    jibun_data = kepco_service.get_address_data(4, addr_do=selected_sido, addr_si=selected_si, addr_gu=selected_gun, addr_lidong=selected_dong)
-                    if jibun_data:
-                        jibun_options = [item.get('ADDR_JIBUN', '') for item in jibun_data if item.get('ADDR_JIBUN')]
-                        if jibun_options:
-                            st.session_state[jibun_key] = jibun_options
-                        else:
-                            st.session_state[jibun_key] = ["553-5"]  # 기본값
-                    else:
-                        st.session_state[jibun_key] = ["553-5"]  # 기본값
-            else:
-                st.session_state[jibun_key] = ["553-5"]  # 기본값
+        jibun_options = []
+        if dong_selected:
+            with st.spinner("상세번지 정보를 불러오는 중..."):
+                jibun_data = kepco_service.get_address_data(4, addr_do=selected_sido, addr_si=selected_si, addr_gu=selected_gun, addr_lidong=selected_dong)
+            if jibun_data:
+                jibun_options = [item.get('ADDR_JIBUN', '') for item in jibun_data if item.get('ADDR_JIBUN')]
         
-        jibun_options = st.session_state.get(jibun_key, ["553-5"])
-        selected_jibun = st.selectbox("상세번지 (선택)", jibun_options, key="addr_jibun")
+        selected_jibun = st.selectbox("상세번지 (선택)", jibun_options or ["553-5"], key="addr_jibun")  # 기본값
     
     # 검색 버튼
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("🔍 주소 검색", type="primary", use_container_width=True):
         process_address_search(selected_sido, selected_si, selected_gun, selected_dong, selected_li, selected_jibun)
-    
-    # 사이드바는 간단한 정보만 표시
-    with st.sidebar:
-        st.header("📋 검색 히스토리")
-        
-        if st.session_state.search_history:
-            for i, search in enumerate(st.session_state.search_history[-5:]):  # 최근 5개만 표시
-                st.text(f"{i+1}. {search}")
-        else:
-            st.info("검색 기록이 없습니다.")
+
+
+@st.fragment
+def search_history_sidebar_fragment():
+    """사이드바 검색 히스토리 및 사용 가이드"""
+    st.header("📋 검색 히스토리")
+        
+    if st.session_state.search_history:
+        for i, search in enumerate(st.session_state.search_history[-5:]):  # 최근 5개만 표시
+            st.text(f"{i+1}. {search}")
+    else:
+        st.info("검색 기록이 없습니다.")
         
-        st.markdown("---")
-        st.markdown("### 💡 사용 가이드")
-        st.markdown("""
-        **주소별 조회:**
-        - 시/도 → 시/군 → 구/군 → 읍/면/동 순으로 선택
-        - 리와 상세번지는 선택사항입니다
-        
-        **결과 해석:**
-        - 정상: 접속 가능
-        - 포화: 접속 불가능
-        - 최종접속가능용량: 변전소/주변압기/배전선로 중 최소값
-        """)
+    st.markdown("---")
+    st.markdown("### 💡 사용 가이드")
+    st.markdown("""
+    **주소별 조회:**
+    - 시/도 → 시/군 → 구/군 → 읍/면/동 순으로 선택
+    - 리와 상세번지는 선택사항입니다
+        
+    **결과 해석:**
+    - 정상: 접속 가능
+    - 포화: 접속 불가능
+    - 최종접속가능용량: 변전소/주변압기/배전선로 중 최소값
+    """)
         
-        if st.button("🗑️ 히스토리 초기화"):
-            st.session_state.search_history = []
-            st.rerun()
-    
+    if st.button("🗑️ 히스토리 초기화"):
+        st.session_state.search_history = []
+        st.rerun(scope="fragment")
+
+
+@st.fragment
+def search_results_fragment():
+    """조회 결과 영역 (결과 내 상호작용 시 이 영역만 재실행)"""
     # 결과 표시 영역
     if 'search_results' in st.session_state:
         if st.session_state.search_results:
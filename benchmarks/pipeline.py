@@ -0,0 +1,354 @@
+"""
+조회 파이프라인 종단 간 벤치마크
+
+로컬 KEPCO 대역 서버(utils.standin_server)를 띄우고 실제 HTTP 클라이언트/서비스/정규화/차트/
+일괄 스크리닝 경로를 그대로 측정합니다. 대역 서버의 합성 데이터와 지연 주입은 시드로 고정되어
+같은 설정이면 같은 요청 순서와 응답으로 실행됩니다. 결과는 JSON으로 저장하며, --compare로
+이전 결과(예: 직전 릴리스)와 비교할 수 있습니다.
+
+측정 항목:
+    address_cascade   시/도 → 번지 주소 단계 조회 (캐시 비운 상태 / 캐시 적중 상태)
+    mesh_lookup       retrieveMeshNo 단건 조회 지연 p50/p95/p99 (저장소 미적용)
+    normalization     _format_api_response 처리량 (rows/s)
+    chart             create_capacity_chart 생성 시간 (캐시 미적중 / 적중)
+    bulk_screening    screen_sites 처리량 (동시성 1/8/64)
+
+사용법:
+    python -m benchmarks.pipeline
+    python -m benchmarks.pipeline --latency 0.02 --out benchmarks/results/v1.2.json
+    python -m benchmarks.pipeline --quick --compare benchmarks/results/v1.2.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RESULT_VERSION = 1
+DEFAULT_RESULTS_DIR = "benchmarks/results"
+
+# 벤치마크 주소: 녹화 응답(전주) 1건 + 대역 서버가 합성하는 주소 단계
+CASCADE_SIDO = ["전북특별자치도", "서울특별시", "경기도", "전라남도", "경상북도", "제주특별자치도"]
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    """지연 표본(초) → ms 단위 요약"""
+    values = np.asarray(samples, dtype=float) * 1000
+    if values.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+
+def _timed(func: Callable, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _pick(items: Optional[List[Dict]], field: str, index: int = 0) -> str:
+    return items[index % len(items)].get(field, "") if items else ""
+
+
+class PipelineBenchmark:
+    """대역 서버를 대상으로 한 파이프라인 측정 (측정마다 새 저장소/계통 인덱스 사용)"""
+
+    def __init__(self, base_url: str, workdir: str, seed: int = 0):
+        self.base_url = base_url
+        self.workdir = workdir
+        self.seed = seed
+        self._stores = 0
+
+    def new_service(self):
+        """측정 전용 서비스 (전역 속도 제한·저장소·계통 인덱스와 분리)"""
+        from utils.capacity_store import CapacityStore
+        from utils.circuit_breaker import CircuitBreaker
+        from utils.headroom_history import HeadroomHistory
+        from utils.http_client import KEPCOHttpClient
+        from utils.kepco_api import KEPCOService
+        from utils.rate_limit import RateLimiter
+        from utils.topology import TopologyIndex
+
+        self._stores += 1
+        client = KEPCOHttpClient(
+            base_url=self.base_url,
+            pool_size=64,
+            limiter=RateLimiter(rate=0),
+            # 오류 주입 시에도 측정이 회로 차단으로 끊기지 않도록 임계값을 높게 둠
+            breaker=CircuitBreaker(failure_threshold=10 ** 6),
+            backoff_base=0.01,
+            backoff_max=0.1
+        )
+        store = CapacityStore(os.path.join(self.workdir, f"capacity-{self._stores}.db"))
+        history = HeadroomHistory(os.path.join(self.workdir, f"history-{self._stores}"))
+        return KEPCOService(client=client, store=store, topology=TopologyIndex(), history=history)
+
+    def address_paths(self, service, count: int) -> List[List[tuple]]:
+        """시/도부터 번지까지 단계별 get_address_data 인자 목록 (대역 서버 응답 기준 첫 항목을 따라감)"""
+        paths = []
+        for i in range(count):
+            sido = CASCADE_SIDO[i % len(CASCADE_SIDO)]
+            steps = [(-1, "", "", "", "")]
+            si_data = service.get_address_data(0, addr_do=sido)
+            steps.append((0, sido, "", "", ""))
+            si = _pick(si_data, "ADDR_SI", i // len(CASCADE_SIDO))
+            gu_data = service.get_address_data(1, addr_do=sido, addr_si=si)
+            steps.append((1, sido, si, "", ""))
+            gu = _pick(gu_data, "ADDR_GU")
+            dong_data = service.get_address_data(2, addr_do=sido, addr_si=si, addr_gu=gu)
+            steps.append((2, sido, si, gu, ""))
+            dong = _pick(dong_data, "ADDR_LIDONG")
+            steps.append((3, sido, si, gu, dong))
+            steps.append((4, sido, si, gu, dong))
+            paths.append(steps)
+        return paths
+
+    def bench_address_cascade(self, paths_count: int) -> Dict:
+        from utils.kepco_api import ADDRESS_CACHE
+
+        service = self.new_service()
+        paths = self.address_paths(service, paths_count)
+
+        def walk(steps):
+            for args in steps:
+                service.get_address_data(*args)
+
+        cold, warm = [], []
+        for steps in paths:
+            ADDRESS_CACHE.clear()
+            cold.append(_timed(walk, steps))
+            warm.append(_timed(walk, steps))
+        return {"levels": 6, "cold": _stats(cold), "warm": _stats(warm)}
+
+    def bench_mesh_lookup(self, count: int) -> Dict:
+        service = self.new_service()
+        samples, failures = [], 0
+        for i in range(count):
+            start = time.perf_counter()
+            rows = service.retrieve_mesh_capacity(
+                addr_do=CASCADE_SIDO[i % len(CASCADE_SIDO)], addr_si=f"벤치{i}시", addr_gu="", addr_lidong=f"벤치{i}동",
+                max_age=0, allow_stale=False
+            )
+            samples.append(time.perf_counter() - start)
+            failures += rows is None
+        return {**_stats(samples), "failures": failures}
+
+    def bench_normalization(self, rows_per_response: int, repeats: int) -> Dict:
+        from utils.fixtures import synthetic_mesh_rows
+
+        service = self.new_service()
+        rows: List[Dict] = []
+        i = 0
+        while len(rows) < rows_per_response:
+            rows.extend(synthetic_mesh_rows("벤치도", f"벤치{i}시", "", "", seed=self.seed))
+            i += 1
+        response = {"rsMsg": {}, "dlt_resultList": rows[:rows_per_response]}
+
+        service._format_api_response(response)  # 첫 호출(임포트/초기화) 제외
+        samples = [_timed(service._format_api_response, response) for _ in range(repeats)]
+        best = min(samples)
+        return {
+            "rows": rows_per_response,
+            "repeats": repeats,
+            "best_ms": round(best * 1000, 3),
+            "rows_per_sec": round(rows_per_response / best, 1) if best > 0 else None
+        }
+
+    def bench_chart(self, count: int) -> Dict:
+        # app.py는 Streamlit 런타임 없이 임포트하면 경고를 남기므로 로그 수준을 낮춤
+        import streamlit.logger
+        from streamlit import config as streamlit_config
+        streamlit_config.set_option("global.showWarningOnDirectExecution", False)
+        streamlit.logger.set_log_level("error")
+        from app import create_capacity_chart
+
+        inputs = [
+            (f"벤치{i}", "변전소", 60000 + i * 37, 55000 + i * 29, 200000)
+            for i in range(count)
+        ]
+        create_capacity_chart.clear()
+        cold = [_timed(create_capacity_chart, *args) for args in inputs]
+        warm = [_timed(create_capacity_chart, *args) for args in inputs]
+        return {"cold": _stats(cold), "warm": _stats(warm)}
+
+    def bench_bulk_screening(self, sites_count: int, concurrency_levels: List[int]) -> Dict:
+        from utils.bulk_screening import SITE_COLUMNS, screen_sites
+
+        sites = pd.DataFrame(
+            [(CASCADE_SIDO[i % len(CASCADE_SIDO)], f"일괄{i}시", "", f"일괄{i}동", "", "") for i in range(sites_count)],
+            columns=SITE_COLUMNS
+        )
+        results = {}
+        for concurrency in concurrency_levels:
+            service = self.new_service()
+            start = time.perf_counter()
+            result = screen_sites(service, sites, concurrency=concurrency, rate=0)
+            elapsed = time.perf_counter() - start
+            results[str(concurrency)] = {
+                "sites": sites_count,
+                "elapsed_s": round(elapsed, 3),
+                "sites_per_sec": round(sites_count / elapsed, 1) if elapsed > 0 else None,
+                "failures": int((result["상태"] == "조회실패").sum())
+            }
+        return results
+
+
+def run_benchmarks(args) -> Dict:
+    # 주소 스냅샷이 있으면 주소 조회가 네트워크를 타지 않으므로 측정에서 제외
+    os.environ["KEPCO_ADDRESS_SNAPSHOT"] = os.path.join(tempfile.gettempdir(), "kepco-bench-no-snapshot.bin")
+    # 측정용 서비스는 임시 이력 디렉터리를 쓰고, 그 밖의 경로도 공유 이력(data/)에 기록하지 않음
+    os.environ["KEPCO_HISTORY_DIR"] = ""
+    from utils.fixtures import load_recorded_fixtures
+    from utils.standin_server import StandinServer
+
+    scale = 0.2 if args.quick else 1.0
+    sizes = {
+        "cascade_paths": max(3, int(30 * scale)),
+        "mesh_lookups": max(20, int(500 * scale)),
+        "normalization_rows": args.rows,
+        "normalization_repeats": max(3, int(20 * scale)),
+        "charts": max(5, int(50 * scale)),
+        "bulk_sites": max(16, int(256 * scale))
+    }
+
+    results: Dict = {}
+    with tempfile.TemporaryDirectory(prefix="kepco-bench-") as workdir, StandinServer(
+        fixtures=load_recorded_fixtures(args.assets),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ) as server:
+        bench = PipelineBenchmark(server.base_url, workdir, seed=args.seed)
+        steps = [
+            ("address_cascade", lambda: bench.bench_address_cascade(sizes["cascade_paths"])),
+            ("mesh_lookup", lambda: bench.bench_mesh_lookup(sizes["mesh_lookups"])),
+            ("normalization", lambda: bench.bench_normalization(sizes["normalization_rows"], sizes["normalization_repeats"])),
+            ("chart", lambda: bench.bench_chart(sizes["charts"])),
+            ("bulk_screening", lambda: bench.bench_bulk_screening(sizes["bulk_sites"], args.concurrency))
+        ]
+        for name, step in steps:
+            if args.only and name not in args.only:
+                continue
+            print(f"측정 중: {name}", file=sys.stderr)
+            results[name] = step()
+        server_stats = server.backend.stats()
+
+    return {
+        "version": RESULT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            **sizes
+        },
+        "server": server_stats,
+        "results": results
+    }
+
+
+# 비교 시 볼 지표 (값이 클수록 좋은 지표는 True)
+COMPARE_METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "best_ms": False,
+    "elapsed_s": False,
+    "rows_per_sec": True,
+    "sites_per_sec": True
+}
+
+
+def _flatten(prefix: str, value, out: Dict[str, float]):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, child, out)
+    elif isinstance(value, (int, float)) and prefix.rsplit(".", 1)[-1] in COMPARE_METRICS:
+        out[prefix] = float(value)
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """기준 결과 대비 변화율 표 (threshold 이상 나빠진 항목은 '회귀' 표시)"""
+    before, after = {}, {}
+    _flatten("", baseline.get("results", {}), before)
+    _flatten("", current.get("results", {}), after)
+
+    lines = []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        if old == 0:
+            continue
+        change = (new - old) / old
+        higher_is_better = COMPARE_METRICS[name.rsplit(".", 1)[-1]]
+        worse = -change if higher_is_better else change
+        mark = " 회귀" if worse >= threshold else ""
+        lines.append(f"{name}: {old:,.3f} → {new:,.3f} ({change:+.1%}){mark}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KEPCO 조회 파이프라인 벤치마크 (로컬 대역 서버 대상)")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: benchmarks/results/bench-<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 표시할 변화율 (기본 0.10)")
+    parser.add_argument("--latency", type=float, default=0.005, help="대역 서버 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="대역 서버 추가 지연 최댓값 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="대역 서버 오류 주입 비율")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터/지연/오류 시드")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64], help="일괄 스크리닝 동시성")
+    parser.add_argument("--rows", type=int, default=10000, help="정규화 측정 응답 행 수")
+    parser.add_argument("--only", nargs="+", help="일부 항목만 측정 (address_cascade mesh_lookup ...)")
+    parser.add_argument("--quick", action="store_true", help="표본 수를 줄여 빠르게 실행")
+    parser.add_argument("--assets", default="attached_assets", help="녹화 응답 디렉터리")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+
+    out = args.out or os.path.join(DEFAULT_RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(json.dumps(report["results"], ensure_ascii=False, indent=2))
+    print(f"벤치마크 결과 저장: {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n{args.compare} 대비:")
+        for line in compare_results(baseline, report, args.threshold):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+kepcogrid - KEPCO 접속가능 용량 조회 명령줄 도구
+
+KEPCOService를 그대로 사용하며(공용 속도 제한, 재시도, 회로 차단 포함), 결과는 한 건이
+끝날 때마다 NDJSON 또는 CSV 한 줄로 바로 출력합니다. 파이프로 다른 도구에 넘기거나
+야간 작업에서 결과를 이어 받기에 적합합니다.
+
+사용법:
+    python kepcogrid.py address                                  # 시/도 목록
+    python kepcogrid.py address --do 전북특별자치도 --si 전주시 --depth 2
+    python kepcogrid.py mesh --do 전북특별자치도 --si 전주시 --gu 덕진구 --lidong 강흥동 --li 춘포리
+    python kepcogrid.py batch sites.csv --concurrency 8 --format csv > result.csv
+    cat poles.txt | python kepcogrid.py transformer - --format csv
+
+공통 옵션:
+    --format ndjson|csv   출력 형식 (기본 ndjson)
+    --concurrency N       동시 조회 수 (기본 4)
+    --cache-dir DIR       조회 결과 저장소(capacity.db), 여유용량 이력, 주소 캐시를 DIR에 두고 실행 간 재사용
+    --max-age SEC         이 시간 이내 저장된 용량 결과는 원격 조회 없이 사용
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+ADDRESS_ARGS = ["do", "si", "gu", "lidong"]
+# gbn별 주소 목록 필드 (-1: 시/도)
+ADDRESS_FIELDS = {-1: "ADDR_DO", 0: "ADDR_SI", 1: "ADDR_GU", 2: "ADDR_LIDONG", 3: "ADDR_LI", 4: "ADDR_JIBUN"}
+ADDRESS_COLUMNS = ["gbn", "do", "si", "gu", "lidong", "name"]
+SITE_OUTPUT_COLUMNS = [
+    "sido", "si", "gu", "dong", "li", "jibun",
+    "변전소", "변전소코드", "주변압기", "배전선로", "병목설비", "최종접속가능용량", "상태", "선로수"
+]
+ADDRESS_CACHE_FILE = "address_cache.jsonl"
+
+
+class RowWriter:
+    """행 단위 즉시 출력 (버퍼링 없이 한 줄씩 flush)"""
+
+    def __init__(self, fmt: str, columns: List[str], stream: TextIO = sys.stdout):
+        self.fmt = fmt
+        self.stream = stream
+        self.count = 0
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+            self._csv.writeheader()
+            stream.flush()
+
+    def write(self, row: Dict):
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self.stream.flush()
+        self.count += 1
+
+
+def configure_cache_dir(cache_dir: Optional[str]):
+    """--cache-dir: 서비스 생성 전에 저장소 경로를 지정하고 주소 캐시 복원"""
+    if not cache_dir:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    os.environ["KEPCO_CAPACITY_DB"] = os.path.join(cache_dir, "capacity.db")
+    os.environ["KEPCO_HISTORY_DIR"] = os.path.join(cache_dir, "headroom_history")
+
+    from utils.kepco_api import ADDRESS_CACHE
+    ADDRESS_CACHE.load(os.path.join(cache_dir, ADDRESS_CACHE_FILE))
+
+
+def save_cache_dir(cache_dir: Optional[str]):
+    if not cache_dir:
+        return
+    from utils.kepco_api import ADDRESS_CACHE
+    try:
+        ADDRESS_CACHE.save(os.path.join(cache_dir, ADDRESS_CACHE_FILE))
+    except OSError as e:
+        print(f"주소 캐시 저장 오류: {str(e)}", file=sys.stderr)
+
+
+def create_service(args):
+    """CLI용 서비스"""
+    from utils.kepco_api import KEPCOService
+
+    service = KEPCOService()
+    if args.max_age is not None:
+        service.store_max_age = args.max_age
+    return service
+
+
+def _address_gbn(address: Dict[str, str]) -> int:
+    """입력된 주소 단계 수로 조회할 하위 단계 결정 (없음: 시/도, do: 시, ... lidong: 리)"""
+    depth = 0
+    for name in ADDRESS_ARGS:
+        if not address.get(name):
+            break
+        depth += 1
+    return depth - 1
+
+
+def iter_address_tree(service, gbn: int, address: Dict[str, str], depth: int, concurrency: int) -> Iterator[Dict]:
+    """주소 하위 목록을 depth 단계까지 너비 우선으로 조회하며 한 건씩 반환"""
+    level = [(gbn, address)]
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for remaining in range(depth, 0, -1):
+            futures = {
+                executor.submit(service.get_address_data, node_gbn, *(node.get(name, "") for name in ADDRESS_ARGS)): (node_gbn, node)
+                for node_gbn, node in level
+            }
+            next_level = []
+            for future in as_completed(futures):
+                node_gbn, node = futures[future]
+                items = future.result()
+                if items is None:
+                    print(f"주소 조회 실패: gbn={node_gbn} {' '.join(v for v in node.values() if v)}", file=sys.stderr)
+                    continue
+                for item in items:
+                    name = item.get(ADDRESS_FIELDS[node_gbn], "")
+                    yield {"gbn": node_gbn, **{k: node.get(k, "") for k in ADDRESS_ARGS}, "name": name}
+                    # 리/번지 목록(gbn 3, 4)은 읍/면/동까지만 인자로 받으므로 더 내려가지 않음
+                    if remaining > 1 and node_gbn < 3 and name:
+                        child = dict(node)
+                        child[ADDRESS_ARGS[node_gbn + 1]] = name
+                        next_level.append((node_gbn + 1, child))
+            level = next_level
+            if not level:
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def cmd_address(args) -> int:
+    service = create_service(args)
+    address = {name: (getattr(args, name) or "").strip() for name in ADDRESS_ARGS}
+    gbn = args.gbn if args.gbn is not None else _address_gbn(address)
+    if gbn not in ADDRESS_FIELDS:
+        print("gbn은 -1~4 범위여야 합니다", file=sys.stderr)
+        return 2
+
+    writer = RowWriter(args.format, ADDRESS_COLUMNS)
+    for row in iter_address_tree(service, gbn, address, max(1, args.depth), args.concurrency):
+        writer.write(row)
+    return 0 if writer.count else 1
+
+
+def cmd_mesh(args) -> int:
+    from utils.bulk_screening import summarize_mesh_rows
+    from utils.normalize import normalize_mesh_rows, to_capacity_records
+
+    service = create_service(args)
+    address = [(getattr(args, name) or "").strip() for name in ["do", "si", "gu", "lidong", "li", "jibun"]]
+    rows = service.retrieve_mesh_capacity("address", *address)
+    if rows is None:
+        print("용량 정보를 가져올 수 없습니다", file=sys.stderr)
+        return 1
+
+    site = dict(zip(["sido", "si", "gu", "dong", "li", "jibun"], address))
+    if args.facilities:
+        records = to_capacity_records(normalize_mesh_rows(rows))
+        writer = RowWriter(args.format, list(site) + (list(records[0]) if records else []))
+        for record in records:
+            writer.write({**site, **record})
+    else:
+        writer = RowWriter(args.format, SITE_OUTPUT_COLUMNS)
+        writer.write({**site, **summarize_mesh_rows(rows)})
+    return 0
+
+
+def _read_batch_sites(source: str, input_format: str):
+    from utils.bulk_screening import SITE_COLUMNS, read_sites
+
+    stream = sys.stdin.buffer if source == "-" else source
+    if input_format == "ndjson" or (input_format == "auto" and source.endswith((".ndjson", ".jsonl"))):
+        import pandas as pd
+
+        text = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+        with text:
+            records = [json.loads(line) for line in text if line.strip()]
+        # API와 같은 키(do, lidong)도 허용
+        records = [{"sido": r.get("sido", r.get("do", "")), "dong": r.get("dong", r.get("lidong", "")), **r} for r in records]
+        return pd.DataFrame(records, columns=SITE_COLUMNS).fillna("")
+    return read_sites(stream, "" if source == "-" else source)
+
+
+def cmd_batch(args) -> int:
+    from utils.bulk_screening import SITE_COLUMNS, iter_screening, site_key
+
+    try:
+        sites = _read_batch_sites(args.input, args.input_format)
+    except (OSError, ValueError) as e:
+        print(f"입력을 읽을 수 없습니다: {str(e)}", file=sys.stderr)
+        return 2
+
+    service = create_service(args)
+    keys = [site_key(*row) for row in sites[SITE_COLUMNS].itertuples(index=False)]
+    writer = RowWriter(args.format, SITE_OUTPUT_COLUMNS)
+    failures = 0
+    # 같은 주소는 한 번만 조회하며, 완료되는 순서대로 출력
+    for key, summary in iter_screening(service, keys, args.concurrency, args.rate, args.checkpoint):
+        failures += summary["상태"] == "조회실패"
+        writer.write({**dict(zip(SITE_COLUMNS, key)), **summary})
+
+    print(f"일괄 조회 완료: {writer.count:,}건 (실패 {failures:,}건)", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _iter_pole_numbers(values: Iterable[str]) -> Iterator[str]:
+    from utils.transformer_batch import parse_pole_numbers
+
+    for value in values:
+        if value == "-":
+            for line in sys.stdin:
+                yield from parse_pole_numbers(line)
+        else:
+            yield from parse_pole_numbers(value)
+
+
+def cmd_transformer(args) -> int:
+    from utils.transformer_batch import PHASE_FIELDS, PHASES, flatten_transformer_result, is_valid_pole_number
+
+    service = create_service(args)
+    columns = ["전산화번호", "본부", "지사", "가용", "조회상태", "최소여유상", "최소여유용량"]
+    columns += [f"{phase}_{field}" for phase in PHASES for field in PHASE_FIELDS]
+    writer = RowWriter(args.format, columns)
+
+    pole_numbers = list(dict.fromkeys(p.strip().upper() for p in _iter_pole_numbers(args.poles)))
+    failures = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {}
+        for pole_number in pole_numbers:
+            if not is_valid_pole_number(pole_number):
+                writer.write({"전산화번호": pole_number, "조회상태": "형식오류"})
+                failures += 1
+                continue
+            futures[executor.submit(service.query_by_transformer_number, pole_number)] = pole_number
+        for future in as_completed(futures):
+            row = flatten_transformer_result(futures[future], future.result())
+            failures += row["조회상태"] != "정상"
+            writer.write(row)
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="출력 형식 (기본 ndjson)")
+    common.add_argument("--concurrency", type=int, default=4, help="동시 조회 수 (기본 4)")
+    common.add_argument("--cache-dir", help="조회 결과 저장소/여유용량 이력/주소 캐시 디렉터리 (실행 간 재사용)")
+    common.add_argument("--max-age", type=float, help="이 시간(초) 이내 저장된 용량 결과는 원격 조회 없이 사용")
+
+    parser = argparse.ArgumentParser(prog="kepcogrid", description="KEPCO 신재생에너지 접속가능 용량 조회 CLI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    address = commands.add_parser("address", parents=[common], help="주소 단계 목록 조회")
+    for name in ADDRESS_ARGS:
+        address.add_argument(f"--{name}", default="")
+    address.add_argument("--gbn", type=int, help="조회 단계 직접 지정 (-1: 시/도 ~ 4: 번지, 기본: 입력 주소로 결정)")
+    address.add_argument("--depth", type=int, default=1, help="하위 단계까지 펼칠 깊이 (기본 1)")
+    address.set_defaults(func=cmd_address)
+
+    mesh = commands.add_parser("mesh", parents=[common], help="주소 1건 접속가능 용량 조회")
+    for name in ["do", "si", "gu", "lidong", "li", "jibun"]:
+        mesh.add_argument(f"--{name}", default="", required=name in ("do", "lidong"))
+    mesh.add_argument("--facilities", action="store_true", help="요약 대신 설비(배전선로)별 행 출력")
+    mesh.set_defaults(func=cmd_mesh)
+
+    batch = commands.add_parser("batch", parents=[common], help="후보지 일괄 조회 (CSV/Excel/NDJSON, - 는 표준입력)")
+    batch.add_argument("input", nargs="?", default="-", help="입력 파일 (기본: 표준입력 CSV)")
+    batch.add_argument("--input-format", choices=["auto", "csv", "ndjson"], default="auto", help="입력 형식")
+    batch.add_argument("--rate", type=float, default=0, help="초당 최대 요청 수 (0: 전역 속도 제한만 적용)")
+    batch.add_argument("--checkpoint", help="완료 결과 기록 파일 (재실행 시 이어서 조회)")
+    batch.set_defaults(func=cmd_batch)
+
+    transformer = commands.add_parser("transformer", parents=[common], help="배전용(공용)변압기 용량 조회")
+    transformer.add_argument("poles", nargs="+", help="전산화번호 (- 는 표준입력에서 읽기)")
+    transformer.set_defaults(func=cmd_transformer)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.concurrency = max(1, args.concurrency)
+    configure_cache_dir(args.cache_dir)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # head 등으로 출력이 중간에 닫힌 경우
+        sys.stderr.close()
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        save_cache_dir(args.cache_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from utils.address_prefetch import AddressPrefetcher
+
+FIELDS = {0: "ADDR_SI", 1: "ADDR_GU", 2: "ADDR_LIDONG"}
+
+
+class _Service:
+    def __init__(self, cached=False):
+        self.cached = cached
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def has_address_data(self, *request):
+        return self.cached
+
+    def get_address_data(self, gbn, addr_do="", addr_si="", addr_gu="", addr_lidong=""):
+        with self._lock:
+            self.calls.append(((gbn, addr_do, addr_si, addr_gu, addr_lidong), threading.current_thread().name))
+        return [{FIELDS[gbn]: f"{addr_do}{addr_si}{addr_gu}-{i}"} for i in range(2)]
+
+    def requests(self):
+        with self._lock:
+            return [request for request, _ in self.calls]
+
+
+def _drain(prefetcher, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while prefetcher.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_returning_to_previous_parent_prefetches_again():
+    service = _Service()
+    prefetcher = AddressPrefetcher(service, workers=1)
+    try:
+        prefetcher.on_sido_selected("A", session="s")
+        prefetcher.on_si_selected("A", "X", session="s")
+        _drain(prefetcher)
+        prefetcher.on_sido_selected("B", session="s")
+        prefetcher.on_sido_selected("A", session="s")
+        _drain(prefetcher)
+
+        service.calls.clear()
+        prefetcher.on_si_selected("A", "X", session="s")
+        _drain(prefetcher)
+        assert (1, "A", "X", "", "") in service.requests()
+    finally:
+        prefetcher.close()
+
+
+def test_same_selection_rerun_does_not_prefetch_again():
+    service = _Service()
+    prefetcher = AddressPrefetcher(service, workers=1)
+    try:
+        prefetcher.on_si_selected("A", "X", session="s")
+        _drain(prefetcher)
+        service.calls.clear()
+        prefetcher.on_si_selected("A", "X", session="s")
+        _drain(prefetcher)
+        assert service.requests() == []
+    finally:
+        prefetcher.close()
+
+
+def test_cached_follow_up_runs_on_prefetch_thread():
+    service = _Service(cached=True)
+    prefetcher = AddressPrefetcher(service, workers=1)
+    try:
+        prefetcher.on_sido_selected("A", session="s")
+        deadline = time.monotonic() + 2.0
+        while not service.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert service.calls
+        assert all(name.startswith("kepco-prefetch") for _, name in service.calls)
+    finally:
+        prefetcher.close()
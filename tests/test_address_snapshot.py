@@ -0,0 +1,79 @@
+import pytest
+
+from utils.address_snapshot import GBN_LEVELS, LEVEL_FIELDS, AddressSnapshot, crawl_address_tree, write_snapshot
+
+# 원격 API 응답 순서 그대로 (가나다/숫자 정렬 순서가 아님)
+TREE = {
+    "서울특별시": {
+        "강남구": {"강남구": {"역삼동": {"li": [], "jibun": ["2", "10", "1-1", "100"]},
+                           "개포동": {"li": [], "jibun": ["9", "11"]}}},
+        "강동구": {"강동구": {"천호동": {"li": [], "jibun": ["3"]}}}
+    },
+    "경기도": {
+        "화성시": {"화성시": {"우정읍": {"li": ["화산리", "주곡리", "운평리"], "jibun": ["12", "3"]}}}
+    }
+}
+FAILED = ("서울특별시", "강동구", "강동구", "천호동")
+
+
+class _Service:
+    """retrieveAddrInit/retrieveAddrGbn 응답을 흉내 내는 원격 서비스"""
+
+    def _fetch_address_data(self, gbn, addr_do="", addr_si="", addr_gu="", addr_lidong=""):
+        path = (addr_do, addr_si, addr_gu, addr_lidong)[:GBN_LEVELS[gbn][1]]
+        if gbn >= 3 and path == FAILED:
+            return None
+        node = TREE
+        for name in path:
+            node = node[name]
+        if gbn == 3:
+            names = node["li"]
+        elif gbn == 4:
+            names = node["jibun"]
+        else:
+            names = list(node)
+        field = LEVEL_FIELDS[GBN_LEVELS[gbn][0]]
+        return [{field: name, "ETC": "x"} for name in names]
+
+
+def _live(service, gbn, *path):
+    data = service._fetch_address_data(gbn, *path)
+    if data is None:
+        return None
+    field = LEVEL_FIELDS[GBN_LEVELS[gbn][0]]
+    return [{field: item[field]} for item in data if item.get(field)]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    service = _Service()
+    path = str(tmp_path / "address_tree.bin")
+    write_snapshot(crawl_address_tree(service, workers=2), path)
+    loaded = AddressSnapshot(path)
+    yield service, loaded
+    loaded.close()
+
+
+def test_snapshot_lookups_match_live_order(snapshot):
+    service, loaded = snapshot
+    lookups = [(-1,), (0, "서울특별시"), (1, "서울특별시", "강남구"), (2, "서울특별시", "강남구", "강남구")]
+    for sido, si_tree in TREE.items():
+        for si, gu_tree in si_tree.items():
+            for gu, dong_tree in gu_tree.items():
+                for dong in dong_tree:
+                    if (sido, si, gu, dong) != FAILED:
+                        lookups += [(3, sido, si, gu, dong), (4, sido, si, gu, dong)]
+
+    for gbn, *path in lookups:
+        padded = list(path) + [""] * (4 - len(path))
+        assert loaded.children(gbn, *padded) == _live(service, gbn, *padded), (gbn, path)
+
+    jibun = loaded.children(4, "서울특별시", "강남구", "강남구", "역삼동")
+    assert [item["ADDR_JIBUN"] for item in jibun] == ["2", "10", "1-1", "100"]
+
+
+def test_failed_and_unknown_nodes_fall_back_to_remote(snapshot):
+    _, loaded = snapshot
+    assert loaded.children(4, *FAILED) is None
+    assert loaded.children(3, *FAILED) is None
+    assert loaded.children(2, "부산광역시", "해운대구", "해운대구") is None
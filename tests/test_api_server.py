@@ -0,0 +1,97 @@
+import asyncio
+import re
+
+import pytest
+
+import api_server
+from api_server import HTTPServer
+from utils.metrics import get_metrics
+
+
+class _API:
+    def __init__(self):
+        self.metrics = get_metrics()
+        self.requests = []
+
+    async def dispatch(self, method, path, query, body):
+        self.requests.append((method, path, body))
+        return 200, {"ok": True}
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def _serve(data: bytes, eof: bool = True):
+    api = _API()
+    writer = _Writer()
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        if eof:
+            reader.feed_eof()
+        await HTTPServer(api).handle_connection(reader, writer)
+
+    asyncio.run(run())
+    return api, writer
+
+
+def _statuses(writer):
+    return [int(status) for status in re.findall(rb"HTTP/1\.1 (\d{3}) ", writer.data)]
+
+
+def test_keep_alive_requests_with_body():
+    api, writer = _serve(
+        b"POST /v1/batch HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}"
+        b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n"
+    )
+    assert _statuses(writer) == [200, 200]
+    assert api.requests == [("POST", "/v1/batch", b"{}"), ("GET", "/health", b"")]
+
+
+def test_chunked_body_is_rejected_and_not_parsed_as_next_request():
+    api, writer = _serve(
+        b"POST /v1/batch HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"2\r\n{}\r\n0\r\n\r\nGET /health HTTP/1.1\r\n\r\n"
+    )
+    assert _statuses(writer) == [411]
+    assert api.requests == []
+    assert writer.closed
+
+
+def test_too_many_headers_are_rejected(monkeypatch):
+    monkeypatch.setattr(api_server, "MAX_HEADER_COUNT", 5)
+    headers = b"".join(b"X-Filler-%d: 1\r\n" % i for i in range(10))
+    api, writer = _serve(b"GET /health HTTP/1.1\r\n" + headers + b"\r\n")
+    assert _statuses(writer) == [431]
+    assert api.requests == []
+
+
+def test_oversized_headers_are_rejected(monkeypatch):
+    monkeypatch.setattr(api_server, "MAX_HEADER_BYTES", 64)
+    api, writer = _serve(b"GET /health HTTP/1.1\r\nX-Big: " + b"a" * 100 + b"\r\n\r\n")
+    assert _statuses(writer) == [431]
+
+
+@pytest.mark.parametrize("tail", [b"Host: x\r\n", b"Content-Length: 10\r\n\r\n{}"])
+def test_stalled_headers_or_body_time_out(monkeypatch, tail):
+    monkeypatch.setattr(api_server, "REQUEST_TIMEOUT", 0.05)
+    api, writer = _serve(b"POST /v1/batch HTTP/1.1\r\n" + tail, eof=False)
+    assert _statuses(writer) == [408]
+    assert api.requests == []
+    assert writer.closed
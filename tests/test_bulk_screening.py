@@ -0,0 +1,33 @@
+import json
+
+import pandas as pd
+
+from utils.bulk_screening import SITE_COLUMNS, screen_sites
+
+
+class _Service:
+    def retrieve_mesh_capacity(self, search_condition="address", addr_lidong="", **address):
+        if addr_lidong == "오류동":
+            raise RuntimeError("연결 끊김")
+        if addr_lidong == "실패동":
+            return None
+        return [{"SUBST_CD": "1234", "SUBST_NM": "테스트", "MTR_NO": "1", "DL_NM": "테스트D/L",
+                 "G_SUBST_CAPA": 9000, "G_MTR_CAPA": 7000, "G_DL_CAPA": 3000}]
+
+
+def _sites(*dongs):
+    return pd.DataFrame([["서울특별시", "강남구", "강남구", dong, "", ""] for dong in dongs], columns=SITE_COLUMNS)
+
+
+def test_site_exception_becomes_failed_row(tmp_path):
+    checkpoint = str(tmp_path / "screening.ndjson")
+    result = screen_sites(_Service(), _sites("역삼동", "오류동", "실패동"), concurrency=2, rate=0,
+                          checkpoint_path=checkpoint)
+
+    assert result["상태"].tolist() == ["정상", "조회실패", "조회실패"]
+    assert result.loc[0, "최종접속가능용량"] == 3000
+    assert result.loc[0, "병목설비"] == "배전선로"
+
+    # 실패한 부지는 체크포인트에 남기지 않아 재실행 시 다시 조회
+    with open(checkpoint, encoding="utf-8") as f:
+        assert [json.loads(line)["key"][3] for line in f] == ["역삼동"]
@@ -0,0 +1,69 @@
+import threading
+
+from utils.capacity_crawler import CapacityCrawler, load_capacity_snapshot
+
+FIELDS = {-1: "ADDR_DO", 0: "ADDR_SI", 1: "ADDR_GU", 2: "ADDR_LIDONG", 3: "ADDR_LI", 4: "ADDR_JIBUN"}
+
+
+class _Service:
+    """시/도 2개 × 시 2개 × 구 1개 × 동 3개, 동마다 리 2개"""
+
+    def __init__(self, failing_dong=None):
+        self.calls = []
+        self.failing_dong = failing_dong
+        self._lock = threading.Lock()
+
+    def has_address_data(self, gbn, *path):
+        return False
+
+    def get_address_data(self, gbn, addr_do="", addr_si="", addr_gu="", addr_lidong=""):
+        with self._lock:
+            self.calls.append(("address", gbn, addr_do, addr_si, addr_gu, addr_lidong))
+        if gbn >= 3 and addr_lidong == self.failing_dong:
+            return None
+        names = {
+            -1: ["서울", "부산"], 0: [f"{addr_do}시{i}" for i in range(2)], 1: ["구"],
+            2: [f"{addr_si}동{i}" for i in range(3)], 3: ["리1", "리2"], 4: ["10", "2"]
+        }[gbn]
+        return [{FIELDS[gbn]: name} for name in names]
+
+    def retrieve_mesh_capacity(self, search_condition="address", addr_do="", addr_si="", addr_gu="",
+                               addr_lidong="", addr_li="", addr_jibun="", **options):
+        with self._lock:
+            self.calls.append(("mesh", addr_do, addr_si, addr_gu, addr_lidong, addr_li, addr_jibun))
+        return [{"SUBST_CD": addr_do, "MTR_NO": "1", "DL_CD": addr_lidong, "VOL_3": 100}]
+
+
+def _crawl(service, out_dir, **options):
+    return CapacityCrawler(service, out_dir=str(out_dir), workers=2, rate=0).run(**options)
+
+
+def test_capacity_lookups_start_before_address_walk_finishes(tmp_path):
+    service = _Service()
+    stats = _crawl(service, tmp_path)
+
+    kinds = [call[0] for call in service.calls]
+    assert stats == {"addresses": 24, "facilities": 12, "failed": 0}
+    assert kinds.index("mesh") < len(kinds) - 1 - kinds[::-1].index("address")
+    # 번지는 응답 순서의 첫 번지를 대표값으로 사용
+    assert {call[6] for call in service.calls if call[0] == "mesh"} == {"10"}
+
+
+def test_resume_skips_walked_dongs_and_done_addresses(tmp_path):
+    _crawl(_Service(failing_dong="서울시0동1"), tmp_path)
+
+    service = _Service()
+    stats = _crawl(service, tmp_path)
+    leaf_calls = [call for call in service.calls if call[0] == "address" and call[1] >= 3]
+    # 리/번지 조회가 실패해 기록되지 않은 동만 다시 펼치고, 그 동의 리 단위 주소만 다시 조회
+    assert {call[5] for call in leaf_calls} == {"서울시0동1"}
+    assert {call[4] for call in service.calls if call[0] == "mesh"} == {"서울시0동1"}
+    assert stats["addresses"] == 24 + 1  # 실패 당시 동 단위로 조회된 주소 1건 포함
+    assert len(load_capacity_snapshot(str(tmp_path))) == 12
+
+
+def test_sido_filter(tmp_path):
+    service = _Service()
+    stats = _crawl(service, tmp_path, sido_filter=["부산"])
+    assert stats["addresses"] == 12
+    assert {call[1] for call in service.calls if call[0] == "mesh"} == {"부산"}
@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.headroom_history import HeadroomHistory, decode_partition
+
+FEEDER = ("S1", "1", "D1")
+
+
+def _row(vol3: int) -> dict:
+    return {"SUBST_CD": FEEDER[0], "MTR_NO": FEEDER[1], "DL_CD": FEEDER[2], "G_DL_CAPA": vol3 * 2, "VOL_3": vol3}
+
+
+def _write_series(args):
+    root, offset = args
+    history = HeadroomHistory(root)
+    for ts in range(offset, 400, 4):
+        history.record_rows([_row(1000 + ts * 7)], observed_at=ts)
+
+
+def _feeder_columns(history: HeadroomHistory):
+    with open(history.partition_path("feeder", FEEDER), "rb") as f:
+        data = f.read()
+    key, columns, valid = decode_partition(data)
+    return key, columns, valid, data
+
+
+def test_round_trip(tmp_path):
+    history = HeadroomHistory(str(tmp_path))
+    for ts, vol3 in [(10, 5000), (20, 5000), (30, 1200), (40, -300), (50, 2 ** 40)]:
+        history.record_rows([_row(vol3)], observed_at=ts)
+
+    key, columns, valid, data = _feeder_columns(history)
+    assert key == FEEDER
+    assert valid == len(data)
+    assert columns[0] == [10, 30, 40, 50]  # 값이 같은 관측은 저장하지 않음
+    assert columns[2] == [5000, 1200, -300, 2 ** 40]
+    assert [v for _, v in history.series("VOL_3", FEEDER)] == [5000, 1200, -300, 2 ** 40]
+
+
+def test_interleaved_instances_share_tail(tmp_path):
+    first = HeadroomHistory(str(tmp_path))
+    second = HeadroomHistory(str(tmp_path))
+    first.record_rows([_row(1000)], observed_at=1)
+    second.record_rows([_row(2000)], observed_at=2)
+    first.record_rows([_row(3000)], observed_at=3)
+
+    assert [v for _, v in HeadroomHistory(str(tmp_path)).series("VOL_3", FEEDER)] == [1000, 2000, 3000]
+
+
+def test_concurrent_processes(tmp_path):
+    root = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_write_series, [(root, offset) for offset in range(4)]))
+
+    _, columns, valid, data = _feeder_columns(HeadroomHistory(root))
+    assert valid == len(data)
+    times, g_capa, vol3 = columns
+    assert times == sorted(set(times))
+    # 어떤 관측이 채택됐든 모든 값은 해당 시각에 기록한 값과 같아야 함
+    assert vol3 == [1000 + ts * 7 for ts in times]
+    assert g_capa == [v * 2 for v in vol3]
+
+
+def test_truncated_tail_block_is_dropped_and_repaired(tmp_path):
+    history = HeadroomHistory(str(tmp_path))
+    for ts in range(1, 6):
+        history.record_rows([_row(ts * 1000)], observed_at=ts)
+    path = history.partition_path("feeder", FEEDER)
+    size_before = os.path.getsize(path)
+    history.record_rows([_row(123456789)], observed_at=6)
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 2)  # 마지막 블록 기록 중 중단
+
+    _, columns, valid, _ = _feeder_columns(history)
+    assert valid == size_before
+    assert columns[2] == [1000, 2000, 3000, 4000, 5000]
+
+    history.record_rows([_row(7000)], observed_at=7)
+    _, columns, valid, data = _feeder_columns(history)
+    assert valid == len(data)
+    assert columns[0] == [1, 2, 3, 4, 5, 7]
+    assert columns[2] == [1000, 2000, 3000, 4000, 5000, 7000]
+
+
+def test_truncated_header_is_rewritten(tmp_path):
+    history = HeadroomHistory(str(tmp_path))
+    path = history.partition_path("feeder", FEEDER)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(b"KH")
+
+    assert history.series("VOL_3", FEEDER) == []
+    history.record_rows([_row(500)], observed_at=1)
+    assert [v for _, v in history.series("VOL_3", FEEDER)] == [500]
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+import requests
+
+from utils.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from utils.http_client import KEPCOHttpClient
+from utils.rate_limit import RateLimiter
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+
+
+class _Session:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def post(self, url, json=None, timeout=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def _client(outcomes, breaker):
+    client = KEPCOHttpClient(base_url="http://kepco.invalid/", limiter=RateLimiter(rate=0), breaker=breaker,
+                             max_retries=1, backoff_base=0, backoff_max=0)
+    client.session = _Session(outcomes)
+    return client
+
+
+def _half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    return breaker
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ChunkedEncodingError("truncated"),
+    requests.exceptions.TooManyRedirects("loop"),
+    KeyboardInterrupt()
+])
+def test_probe_failure_always_releases_half_open(error):
+    breaker = _half_open_breaker()
+    client = _client([error, error], breaker)
+
+    with pytest.raises(type(error)):
+        client.post("retrieveMeshNo", {})
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    client.session = _Session([_Response()])
+    assert client.post("retrieveMeshNo", {}).status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_retryable_error_then_success():
+    breaker = CircuitBreaker(failure_threshold=1)
+    client = _client([requests.exceptions.ChunkedEncodingError("truncated"), _Response()], breaker)
+    assert client.post("retrieveMeshNo", {}).status_code == 200
+    assert breaker.state == CLOSED
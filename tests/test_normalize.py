@@ -0,0 +1,141 @@
+import pytest
+
+from utils.kepco_api import KEPCOService
+from utils.normalize import int_columns, normalize_mesh_rows, to_level_records
+
+
+def _baseline_format(api_response):
+    """기존 KEPCOService._format_api_response (정규화 엔진 도입 전) - 비교 기준"""
+    formatted_results = []
+    for result in api_response.get("dlt_resultList", []):
+        vol_1 = int(result.get('VOL_1', 0))
+        vol_2 = int(result.get('VOL_2', 0))
+        vol_3 = int(result.get('VOL_3', 0))
+        final_capacity = min([v for v in [vol_1, vol_2, vol_3] if v > 0], default=0)
+        final_status = "정상" if final_capacity > 0 else "포화"
+
+        levels = [
+            ("SUBST", "VOL_1", vol_1, "-", "-", True),
+            ("MTR", "VOL_2", vol_2, f"#{result.get('MTR_NO', '-')}", "-",
+             result.get('MTR_CAPA') and int(result.get('MTR_CAPA', 0)) > 0),
+            ("DL", "VOL_3", vol_3, f"#{result.get('MTR_NO', '-')}", result.get('DL_NM', '-'),
+             result.get('DL_CAPA') and int(result.get('DL_CAPA', 0)) > 0)
+        ]
+        for prefix, vol_field, vol, mtr, dl, present in levels:
+            if not present:
+                continue
+            capa = int(result.get(f'{prefix}_CAPA', 0))
+            g_capa = int(result.get(f'G_{prefix}_CAPA', 0))
+            calculated = capa - g_capa if capa > 0 and g_capa > 0 else 0
+            formatted_results.append({
+                "변전소": f"{result.get('SUBST_NM', '')}변전소",
+                "주변압기": mtr,
+                "배전선로": dl,
+                "접속기준용량(kW)": capa,
+                "접수기준접속용량(kW)": int(result.get(f'{prefix}_PWR', 0)),
+                "접속계획반영접속용량(kW)": g_capa,
+                "여유용량(kW)": f"{vol:,}",
+                "접속계획반영여유용량(kW)": f"{calculated:,}",
+                "최종접속가능용량": f"{final_capacity:,}",
+                "상태": final_status,
+                "여유용량비율(%)": round((vol / max(capa, 1)) * 100, 1),
+                f"{prefix}_CAPA": capa,
+                f"G_{prefix}_CAPA": g_capa,
+                f"{prefix}_PWR": int(result.get(f'{prefix}_PWR', 0)),
+                vol_field: vol
+            })
+    return formatted_results
+
+
+def _row(**values):
+    row = {
+        "SUBST_CD": "1234", "SUBST_NM": "테스트", "MTR_NO": "1", "DL_CD": "12", "DL_NM": "테스트D/L",
+        "SUBST_CAPA": 120000, "SUBST_PWR": 40000, "G_SUBST_CAPA": 60000,
+        "MTR_CAPA": 45000, "MTR_PWR": 20000, "G_MTR_CAPA": 30000,
+        "DL_CAPA": 10000, "DL_PWR": 5000, "G_DL_CAPA": 7000,
+        "VOL_1": 80000, "VOL_2": 25000, "VOL_3": 5000
+    }
+    row.update(values)
+    return row
+
+
+MESH_RESPONSE = {"dlt_resultList": [
+    _row(),
+    _row(DL_CD="13", DL_NM="다른D/L", VOL_3=0, G_DL_CAPA=-500),
+    _row(MTR_NO="2", DL_CD="21", MTR_CAPA=0, DL_CAPA=0, VOL_2=0, VOL_3=0),
+    _row(SUBST_CD="5678", SUBST_NM="포화", VOL_1=0, VOL_2=0, VOL_3=0),
+    _row(SUBST_CD="9999", SUBST_NM="문자열", SUBST_CAPA="90000", VOL_1="1500", VOL_2="2500", VOL_3="700")
+]}
+
+
+def _as_baseline_display(record):
+    # 기존 출력은 여유용량/최종접속가능용량을 "1,234" 문자열로 만들었고, 새 레코드는 정수로 두고 렌더링 시 포맷
+    displayed = dict(record)
+    for label in ("여유용량(kW)", "접속계획반영여유용량(kW)", "최종접속가능용량"):
+        displayed[label] = f"{record[label]:,}"
+    return displayed
+
+
+def test_level_records_match_baseline_format():
+    # 공유 저장소/계통 인덱스를 열지 않도록 __init__ 없이 변환만 호출
+    records = KEPCOService.__new__(KEPCOService)._format_api_response(MESH_RESPONSE)
+    assert [_as_baseline_display(record) for record in records] == _baseline_format(MESH_RESPONSE)
+
+
+def test_final_capacity_ignores_zero_headroom_levels():
+    records = to_level_records(normalize_mesh_rows([_row(VOL_1=80000, VOL_2=0, VOL_3=5000)]))
+    assert {record["최종접속가능용량"] for record in records} == {5000}
+    assert {record["상태"] for record in records} == {"정상"}
+
+    saturated = to_level_records(normalize_mesh_rows([_row(VOL_1=0, VOL_2=0, VOL_3=0)]))
+    assert {record["최종접속가능용량"] for record in saturated} == {0}
+    assert {record["상태"] for record in saturated} == {"포화"}
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1234, 1234),
+    ("1234", 1234),
+    ("1,234", 0),
+    (None, 0),
+    ("", 0),
+    ("abc", 0),
+    (12.9, 12),
+    ("12.9", 12),
+    (float("nan"), 0),
+    ("inf", 0),
+    ("-300", -300)
+])
+def test_int_columns_coerces_like_normalizer(value, expected):
+    columns = int_columns([{"VOL_1": value}], ["VOL_1"])
+    assert columns["VOL_1"].tolist() == [expected]
+    assert normalize_mesh_rows([{"VOL_1": value}])["VOL_1"].tolist() == [expected]
+
+
+def test_missing_fields_default_to_empty_and_zero():
+    df = normalize_mesh_rows([{"SUBST_NM": None}])
+    assert df.loc[0, "SUBST_NM"] == ""
+    assert df.loc[0, "SUBST_CAPA"] == 0
+    assert df.loc[0, "FINAL_CAPA"] == 0
+    assert df.loc[0, "STATUS"] == "포화"
+
+
+@pytest.mark.parametrize("planned, final, bottleneck", [
+    ((60000, 30000, 7000), 7000, "배전선로"),
+    ((6000, 30000, 70000), 6000, "변전소"),
+    ((60000, 3000, 7000), 3000, "주변압기"),
+    ((60000, -500, 7000), 7000, "배전선로"),      # 음수는 제외
+    ((-100, -500, -50), -500, "주변압기"),        # 모두 음수면 전체 최소값
+    ((0, 30000, 7000), 0, "변전소")
+])
+def test_final_capa_and_bottleneck(planned, final, bottleneck):
+    g_subst, g_mtr, g_dl = planned
+    df = normalize_mesh_rows([_row(G_SUBST_CAPA=g_subst, G_MTR_CAPA=g_mtr, G_DL_CAPA=g_dl)])
+    assert df.loc[0, "FINAL_CAPA"] == final
+    assert df.loc[0, "BOTTLENECK"] == bottleneck
+    assert df.loc[0, "STATUS"] == ("정상" if final > 0 else "포화")
+
+
+def test_empty_response():
+    assert normalize_mesh_rows([]).empty
+    assert normalize_mesh_rows(None).empty
+    assert to_level_records(normalize_mesh_rows([])) == []
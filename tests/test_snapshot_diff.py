@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from utils import snapshot_diff
+from utils.capacity_crawler import FACILITIES_FILE
+from utils.snapshot_diff import HASH_INDEX_FILE, diff_snapshots, load_hash_index
+
+
+def _row(dl_cd, **values):
+    row = {
+        "SUBST_CD": "1234", "SUBST_NM": "테스트", "MTR_NO": "1", "DL_CD": dl_cd, "DL_NM": f"{dl_cd}D/L",
+        "G_SUBST_CAPA": 60000, "G_MTR_CAPA": 30000, "G_DL_CAPA": 7000,
+        "VOL_1": 80000, "VOL_2": 25000, "VOL_3": 5000
+    }
+    row.update(values)
+    return row
+
+
+def _write_snapshot(directory, rows):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, FACILITIES_FILE), "w", encoding="utf-8") as f:
+        for row in rows:
+            record = {"key": [row["SUBST_CD"], row["MTR_NO"], row["DL_CD"]], "row": row, "fetched_at": "2026-10-01T00:00:00"}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return str(directory)
+
+
+def _changes(old_rows, new_rows, tmp_path, **options):
+    old_dir = _write_snapshot(tmp_path / "old", old_rows)
+    new_dir = _write_snapshot(tmp_path / "new", new_rows)
+    return {tuple(change["key"]): change for change in diff_snapshots(old_dir, new_dir, **options)}
+
+
+def test_changed_added_removed(tmp_path):
+    changes = _changes(
+        [_row("11"), _row("12"), _row("13")],
+        [_row("11"), _row("12", VOL_3=4000, fetched="ignored"), _row("14")],
+        tmp_path
+    )
+    assert set(changes) == {("1234", "1", "12"), ("1234", "1", "13"), ("1234", "1", "14")}
+
+    changed = changes[("1234", "1", "12")]
+    assert changed["change"] == "changed"
+    assert changed["delta"] == {"VOL_3": -1000}
+    assert changed["before"]["VOL_3"] == 5000 and changed["after"]["VOL_3"] == 4000
+    assert changed["dl_nm"] == "12D/L"
+
+    assert changes[("1234", "1", "13")]["change"] == "removed"
+    assert changes[("1234", "1", "13")]["after"] is None
+    assert changes[("1234", "1", "14")]["change"] == "added"
+    assert changes[("1234", "1", "14")]["before"] is None
+
+
+def test_added_and_removed_can_be_excluded(tmp_path):
+    changes = _changes([_row("11"), _row("13")], [_row("11", VOL_1=1), _row("14")], tmp_path,
+                       include_added=False, include_removed=False)
+    assert set(changes) == {("1234", "1", "11")}
+
+
+@pytest.mark.parametrize("values, freed", [
+    ({"VOL_3": 6000}, True),            # 여유용량 증가
+    ({"VOL_3": 4000}, False),
+    ({"G_DL_CAPA": 6000}, True),        # 배정 용량 감소 = 여유 확대
+    ({"G_DL_CAPA": 8000}, False),
+    ({"G_SUBST_CAPA": 70000, "VOL_2": 26000}, True),
+    ({"G_MTR_CAPA": 31000, "VOL_1": 79000}, False)
+])
+def test_freed_follows_field_direction(tmp_path, values, freed):
+    changes = _changes([_row("11")], [_row("11", **values)], tmp_path)
+    assert changes[("1234", "1", "11")]["freed"] is freed
+
+
+def test_hash_index_reused_until_snapshot_changes(tmp_path, monkeypatch):
+    directory = _write_snapshot(tmp_path / "snap", [_row("11"), _row("12")])
+    first = load_hash_index(directory)
+    assert os.path.exists(os.path.join(directory, HASH_INDEX_FILE))
+
+    def fail(_):
+        raise AssertionError("색인을 다시 만들면 안 됨")
+
+    monkeypatch.setattr(snapshot_diff, "build_hash_index", fail)
+    assert load_hash_index(directory) == first
+    monkeypatch.undo()
+
+    # facilities.ndjson 크기가 바뀌면 다시 생성
+    _write_snapshot(tmp_path / "snap", [_row("11"), _row("12", VOL_3=100), _row("13")])
+    rebuilt = load_hash_index(directory)
+    assert set(rebuilt) == {("1234", "1", "11"), ("1234", "1", "12"), ("1234", "1", "13")}
+    assert rebuilt[("1234", "1", "12")][1][-1] == 100
+
+
+def test_hash_uses_normalizer_parsing(tmp_path):
+    directory = _write_snapshot(tmp_path / "snap", [_row("11", VOL_3="1,234"), _row("12", VOL_3="1234")])
+    index = load_hash_index(directory)
+    assert index[("1234", "1", "11")][1][-1] == 0
+    assert index[("1234", "1", "12")][1][-1] == 1234
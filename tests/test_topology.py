@@ -0,0 +1,38 @@
+from utils.topology import TopologyIndex
+
+ADDRESS = ("서울특별시", "강남구", "", "역삼동", "", "")
+OTHER = ("서울특별시", "강남구", "", "삼성동", "", "")
+
+
+def _row(dl_cd, vol_3):
+    return {"SUBST_CD": "1234", "SUBST_NM": "테스트", "MTR_NO": "1", "DL_CD": dl_cd, "VOL_3": vol_3}
+
+
+class _Store:
+    def __init__(self, latest):
+        self.latest = latest
+        self.scans = 0
+
+    def iter_latest_mesh_rows(self):
+        self.scans += 1
+        return iter(self.latest)
+
+
+def test_store_is_read_on_first_query_only():
+    store = _Store([(ADDRESS, [_row("11", 500)]), (OTHER, [_row("11", 500)])])
+    index = TopologyIndex.from_store(store)
+    assert store.scans == 0
+
+    assert index.neighbors(ADDRESS) == {("1234", "1", "11"): [OTHER]}
+    assert index.stats()["addresses"] == 2
+    assert store.scans == 1
+
+
+def test_rows_added_before_load_win_over_store():
+    store = _Store([(ADDRESS, [_row("11", 500)]), (OTHER, [_row("11", 500)])])
+    index = TopologyIndex.from_store(store)
+    index.add_rows(ADDRESS, [_row("22", 900)])
+
+    assert index.feeders_for_address(ADDRESS) == [("1234", "1", "22")]
+    assert index.feeders_for_address(OTHER) == [("1234", "1", "11")]
+    assert index.feeders_with_headroom("1234") == [(("1234", "1", "22"), 900), (("1234", "1", "11"), 500)]
@@ -0,0 +1,196 @@
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+# gbn별 하위 목록 필드 (선택값 → 다음 단계 gbn)
+CHILD_FIELDS = {0: "ADDR_SI", 1: "ADDR_GU", 2: "ADDR_LIDONG"}
+
+AddressRequest = Tuple[int, str, str, str, str]
+# 예약 주체: (세션, 선택 단계, 세대)
+Owner = Tuple[str, int, int]
+
+
+class AddressPrefetcher:
+    """
+    다음 주소 단계 선행 조회기
+
+    사용자가 시/도를 고르면 해당 시/도의 시/군 목록(gbn=0)과, 많이 선택된(또는 앞쪽) 시/군
+    몇 개의 구/군 목록(gbn=1)을 백그라운드에서 미리 조회해 공용 주소 캐시(ADDRESS_CACHE)를 채웁니다.
+    이미 캐시/스냅샷에 있는 목록은 건너뛰고, 대기 중인 요청 수는 max_pending으로 제한합니다.
+
+    모든 세션이 하나의 조회기를 공유하므로 선택 상태와 세대는 세션·선택 단계별로 따로 관리합니다.
+    선택이 바뀌면 그 세션에서 해당 단계 이하로 예약한 작업만 무효화하고, 다른 세션이나
+    상위 단계에서 예약한 같은 요청은 그대로 진행됩니다.
+    """
+
+    def __init__(self, service, workers: int = 2, fanout: int = 3, max_pending: int = 16, max_sessions: int = 1024):
+        self.service = service
+        self.fanout = fanout
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kepco-prefetch")
+        self._lock = threading.Lock()
+        # 요청 → (Future, 예약한 (세션, 단계, 세대) 목록)
+        self._pending: Dict[AddressRequest, Tuple[Future, Set[Owner]]] = {}
+        self._picks: Dict[Tuple[str, ...], Counter] = {}
+        # 세션 → {"generations": {단계: 세대}, "selection": {단계: 선택 경로}} (오래된 세션부터 정리)
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _session(self, session: str) -> Dict:
+        """세션 상태 (호출자가 잠금 보유)"""
+        state = self._sessions.get(session)
+        if state is None:
+            state = self._sessions[session] = {"generations": {}, "selection": {}}
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session)
+        return state
+
+    def _is_current(self, owner: Owner) -> bool:
+        session, depth, generation = owner
+        state = self._sessions.get(session)
+        return state is not None and state["generations"].get(depth, 0) == generation
+
+    def _submit(self, request: AddressRequest, owner: Owner, then=None) -> bool:
+        """선행 조회 1건 예약 (이미 캐시됐거나 진행 중이거나 한도 초과면 새로 예약하지 않음)"""
+        if self.service.has_address_data(*request):
+            # 이미 캐시된 목록이어도 후속 선행 조회는 화면(스크립트) 스레드가 아니라 조회기 스레드에서 실행
+            if then:
+                with self._lock:
+                    if self._is_current(owner):
+                        self._executor.submit(self._run_then, owner, then)
+            return False
+
+        with self._lock:
+            if not self._is_current(owner):
+                return False
+            entry = self._pending.get(request)
+            if entry is not None:
+                entry[1].add(owner)  # 다른 세션/단계가 이미 예약한 요청에 합류
+                return False
+            if len(self._pending) >= self.max_pending:
+                return False
+            future = self._executor.submit(self._run, request, then)
+            self._pending[request] = (future, {owner})
+        return True
+
+    def _live(self, request: AddressRequest) -> bool:
+        """예약한 주체 중 하나라도 아직 유효한지"""
+        with self._lock:
+            entry = self._pending.get(request)
+            return entry is not None and any(self._is_current(owner) for owner in entry[1])
+
+    def _run(self, request: AddressRequest, then):
+        try:
+            if not self._live(request):
+                return  # 취소된 세대의 요청은 실행하지 않음
+            result = self.service.get_address_data(*request)
+            if result is not None and then and self._live(request):
+                then()
+        except Exception as e:
+            print(f"주소 선행 조회 오류: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.pop(request, None)
+
+    def _run_then(self, owner: Owner, then):
+        try:
+            with self._lock:
+                current = self._is_current(owner)
+            if current:
+                then()
+        except Exception as e:
+            print(f"주소 선행 조회 오류: {str(e)}")
+
+    def record_pick(self, parent: Tuple[str, ...], value: str):
+        """사용자 선택 기록 (다음 선행 조회 시 많이 선택된 항목 우선)"""
+        with self._lock:
+            self._picks.setdefault(parent, Counter())[value] += 1
+
+    def _ranked_children(self, gbn: int, parent: Tuple[str, ...]) -> List[str]:
+        data = self.service.get_address_data(gbn, *parent) or []
+        names = [item.get(CHILD_FIELDS[gbn], "") for item in data if item.get(CHILD_FIELDS[gbn])]
+        with self._lock:
+            picks = self._picks.get(parent, Counter())
+            # 선택 횟수 내림차순, 같으면 목록 순서 유지
+            ranked = sorted(names, key=lambda name: -picks[name])
+        return ranked[:self.fanout]
+
+    def _begin(self, session: str, selection: Tuple[str, ...]) -> Optional[Owner]:
+        """
+        세션의 선택 변경 처리 - 바뀌었으면 이 단계 이하의 이전 예약을 무효화하고 새 예약 주체 반환
+
+        같은 선택으로 재실행된 경우(화면 재렌더링)는 None을 반환하고 진행 중인 선행 조회를 유지합니다.
+        """
+        depth = len(selection)
+        with self._lock:
+            state = self._session(session)
+            if state["selection"].get(depth) == selection:
+                return None
+            state["selection"][depth] = selection
+            # 상위 선택이 바뀌면 하위 단계 선택도 초기화 (A→B→A로 돌아와 같은 하위를 골라도 다시 선행 조회)
+            for level in [level for level in state["selection"] if level > depth]:
+                del state["selection"][level]
+            for level in list(state["generations"]) + [depth]:
+                if level >= depth:
+                    state["generations"][level] = state["generations"].get(level, 0) + 1
+            self._drop_stale()
+            return (session, depth, state["generations"][depth])
+
+    def _drop_stale(self):
+        """유효한 예약 주체가 없는 대기 요청 취소 (호출자가 잠금 보유)"""
+        for request, (future, owners) in list(self._pending.items()):
+            if not any(self._is_current(owner) for owner in owners) and future.cancel():
+                del self._pending[request]
+
+    def on_sido_selected(self, sido: str, session: str = ""):
+        """시/도 선택 시: 시/군 목록과 상위 시/군의 구/군 목록 선행 조회"""
+        owner = self._begin(session, (sido,))
+        if owner is None:
+            return
+        self.record_pick((), sido)
+
+        def prefetch_gu():
+            for si in self._ranked_children(0, (sido,)):
+                self._submit((1, sido, si, "", ""), owner)
+
+        self._submit((0, sido, "", "", ""), owner, then=prefetch_gu)
+
+    def on_si_selected(self, sido: str, si: str, session: str = ""):
+        """시/군 선택 시: 구/군 목록과 상위 구/군의 읍/면/동 목록 선행 조회"""
+        owner = self._begin(session, (sido, si))
+        if owner is None:
+            return
+        self.record_pick((sido,), si)
+
+        def prefetch_dong():
+            for gu in self._ranked_children(1, (sido, si)):
+                self._submit((2, sido, si, gu, ""), owner)
+
+        self._submit((1, sido, si, "", ""), owner, then=prefetch_dong)
+
+    def cancel(self, session: Optional[str] = None):
+        """
+        대기 중인 선행 조회 취소 (실행 중인 요청은 결과만 캐시에 남음)
+
+        session을 지정하면 그 세션의 예약만, 생략하면 모든 세션의 예약을 무효화합니다.
+        """
+        with self._lock:
+            sessions = [session] if session is not None else list(self._sessions)
+            for name in sessions:
+                state = self._sessions.get(name)
+                if state is not None:
+                    state["generations"] = {level: value + 1 for level, value in state["generations"].items()}
+                    state["selection"].clear()
+            self._drop_stale()
+
+    def pending(self) -> int:
+        """진행 중인 선행 조회 수"""
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,293 @@
+"""
+주소 계층 오프라인 스냅샷 (retrieveAddrInit → retrieveAddrGbn gbn 0~4)
+
+파일 구조 (리틀 엔디언):
+    헤더   : magic(8) | 노드 수(uint32) | 문자열 영역 길이(uint32) | 레벨별 노드 수(uint32 x 7)
+    노드   : 이름 오프셋(uint32) | 이름 길이(uint16) | 레벨(uint8) | 패딩 | 첫 자식 인덱스(uint32) | 자식 수(uint32)
+             (첫 자식 인덱스가 0xFFFFFFFF이면 하위 목록을 수집하지 못한 노드)
+    정렬표 : 노드 인덱스(uint32 x 노드 수) - 각 자식 구간을 (레벨, 이름) 순으로 나열
+    문자열 : UTF-8 이름을 이어 붙인 영역
+
+노드는 BFS 순서로 저장되며, 한 노드의 자식은 원격 API가 돌려준 순서 그대로 연속 배치됩니다.
+이름 탐색은 같은 구간의 정렬표로 이진 탐색하므로 mmap 상태 그대로 조회할 수 있고,
+여러 워커 프로세스가 같은 페이지를 공유합니다.
+
+사용법:
+    python -m utils.address_snapshot --out data/address_tree.bin
+"""
+import argparse
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b"KEPADDR2"
+HEADER = struct.Struct("<8sII7I")
+NODE = struct.Struct("<IHBxII")
+ORDER = struct.Struct("<I")
+
+# 레벨: 0=루트, 1=시/도, 2=시/군, 3=구/군, 4=읍/면/동, 5=리, 6=번지
+LEVEL_COUNT = 7
+LEVEL_FIELDS = {1: "ADDR_DO", 2: "ADDR_SI", 3: "ADDR_GU", 4: "ADDR_LIDONG", 5: "ADDR_LI", 6: "ADDR_JIBUN"}
+
+# gbn → (조회할 자식 레벨, 경로 깊이)
+GBN_LEVELS = {-1: (1, 0), 0: (2, 1), 1: (3, 2), 2: (4, 3), 3: (5, 4), 4: (6, 4)}
+
+DEFAULT_SNAPSHOT_PATH = "data/address_tree.bin"
+
+# 첫 자식 인덱스 자리에 기록하는 '하위 목록 미수집' 표시
+MISSING = 0xFFFFFFFF
+
+
+def crawl_address_tree(service, sido_filter: Optional[List[str]] = None, workers: int = 4) -> Dict:
+    """
+    주소 계층 전체를 한 번 순회하여 중첩 딕셔너리로 반환
+
+    조회에 실패했거나(--sido로) 수집하지 않은 노드의 하위 목록은 None으로 남겨,
+    스냅샷에서 빈 목록이 아니라 '없음'으로 기록되고 조회 시 원격으로 넘어가도록 합니다.
+    시/도 목록은 필터와 관계없이 전체를 유지합니다.
+
+    Returns:
+        {시/도: {시/군: {구/군: {읍/면/동: {"li": [...], "jibun": [...]}}}}} (미수집 하위는 None)
+    """
+    def names(gbn, *path) -> Optional[List[str]]:
+        data = service._fetch_address_data(gbn, *(list(path) + [""] * (4 - len(path))))
+        if data is None:
+            return None
+        field = LEVEL_FIELDS[GBN_LEVELS[gbn][0]]
+        return [item.get(field, "") for item in data if item.get(field)]
+
+    sido_list = names(-1)
+    if sido_list is None:
+        raise RuntimeError("시/도 목록 조회 실패")
+    tree: Dict = {sido: None for sido in sido_list}
+    failed = 0
+
+    def expand(paths, gbn, attach):
+        nonlocal failed
+        for path, children in zip(paths, executor.map(lambda p: names(gbn, *p), paths)):
+            if children is None:
+                failed += 1
+            attach(path, None if children is None else {name: None for name in children})
+
+    def paths_at(depth):
+        """깊이 depth의 노드 경로 목록 (상위 목록이 수집된 노드만)"""
+        items = [((), tree)]
+        for _ in range(depth - 1):
+            items = [(path + (name,), child) for path, subtree in items for name, child in subtree.items()
+                     if child is not None]
+        return [path + (name,) for path, subtree in items for name in subtree]
+
+    def attach_at(path, value):
+        node = tree
+        for name in path[:-1]:
+            node = node[name]
+        node[path[-1]] = value
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        si_paths = [(sido,) for sido in sido_list if not sido_filter or sido in sido_filter]
+        expand(si_paths, 0, attach_at)
+        print(f"시/군 {sum(len(v) for v in tree.values() if v):,}개 수집")
+
+        gu_paths = paths_at(2)
+        expand(gu_paths, 1, attach_at)
+        print(f"구/군 {len(gu_paths):,}개 경로 수집")
+
+        dong_paths = paths_at(3)
+        expand(dong_paths, 2, attach_at)
+        print(f"읍/면/동 {len(dong_paths):,}개 경로 수집")
+
+        leaf_paths = paths_at(4)
+        li_lists = list(executor.map(lambda p: names(3, *p), leaf_paths))
+        jibun_lists = list(executor.map(lambda p: names(4, *p), leaf_paths))
+        for path, li_list, jibun_list in zip(leaf_paths, li_lists, jibun_lists):
+            if li_list is None or jibun_list is None:
+                failed += 1
+                attach_at(path, None)
+            else:
+                attach_at(path, {"li": li_list, "jibun": jibun_list})
+        print(f"리/번지 {len(leaf_paths):,}개 경로 수집")
+
+    if failed:
+        print(f"조회 실패 {failed:,}건 - 해당 노드는 스냅샷에서 제외되어 원격으로 조회됩니다")
+    return tree
+
+
+def write_snapshot(tree: Dict, path: str) -> Dict[int, int]:
+    """중첩 딕셔너리 주소 트리를 스냅샷 파일로 기록하고 레벨별 노드 수 반환"""
+
+    def child_items(level: int, subtree) -> List[Tuple[int, str, object]]:
+        # 원격 응답 순서 유지 (중복만 제거)
+        if level == 4:
+            items = [(5, name, {}) for name in dict.fromkeys(subtree.get("li", []))]
+            items += [(6, name, {}) for name in dict.fromkeys(subtree.get("jibun", []))]
+            return items
+        return [(level + 1, name, child) for name, child in subtree.items()]
+
+    # BFS로 노드 배치 (자식은 연속 구간)
+    nodes = [[0, "", 0, 0]]  # [레벨, 이름, 첫 자식, 자식 수]
+    queue = [(0, 0, tree)]
+    while queue:
+        next_queue = []
+        for index, level, subtree in queue:
+            if subtree is None:
+                nodes[index][2] = MISSING  # 미수집: 조회 시 None 반환
+                continue
+            items = child_items(level, subtree)
+            nodes[index][2] = len(nodes)
+            nodes[index][3] = len(items)
+            for child_level, name, child in items:
+                next_queue.append((len(nodes), child_level, child))
+                nodes.append([child_level, name, 0, 0])
+        queue = next_queue
+
+    strings = bytearray()
+    packed = bytearray()
+    order = bytearray()
+    level_counts = [0] * LEVEL_COUNT
+    for level, name, child_start, child_count in nodes:
+        encoded = name.encode("utf-8")
+        packed += NODE.pack(len(strings), len(encoded), level, child_start, child_count)
+        strings += encoded
+        level_counts[level] += 1
+
+    # 정렬표: 루트 자리(0)는 비워 두고, 자식 구간마다 (레벨, 이름) 순 노드 인덱스 기록
+    sorted_order = [0] * len(nodes)
+    for _, _, child_start, child_count in nodes:
+        if child_start == MISSING or not child_count:
+            continue
+        span = range(child_start, child_start + child_count)
+        sorted_order[child_start:child_start + child_count] = sorted(span, key=lambda i: (nodes[i][0], nodes[i][1]))
+    for index in sorted_order:
+        order += ORDER.pack(index)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(nodes), len(strings), *level_counts))
+        f.write(packed)
+        f.write(order)
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+    return {level: count for level, count in enumerate(level_counts)}
+
+
+class AddressSnapshot:
+    """메모리 맵 기반 주소 스냅샷 (읽기 전용)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.node_count, strings_len, *level_counts = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"주소 스냅샷 형식이 아닙니다: {path}")
+
+        self.level_counts = level_counts
+        self._nodes_offset = HEADER.size
+        self._order_offset = self._nodes_offset + self.node_count * NODE.size
+        self._strings_offset = self._order_offset + self.node_count * ORDER.size
+
+    def _node(self, index: int) -> Tuple[int, int, int, int, int]:
+        return NODE.unpack_from(self._mm, self._nodes_offset + index * NODE.size)
+
+    def _name(self, name_off: int, name_len: int) -> str:
+        start = self._strings_offset + name_off
+        return self._mm[start:start + name_len].decode("utf-8")
+
+    def _sorted_child(self, position: int) -> int:
+        return ORDER.unpack_from(self._mm, self._order_offset + position * ORDER.size)[0]
+
+    def _find_child(self, index: int, level: int, name: str) -> Optional[int]:
+        """자식 구간의 정렬표에서 (레벨, 이름) 이진 탐색"""
+        _, _, _, lo, count = self._node(index)
+        if lo == MISSING:
+            return None
+        hi = end = lo + count
+        target = (level, name)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name_off, name_len, mid_level, _, _ = self._node(self._sorted_child(mid))
+            if (mid_level, self._name(name_off, name_len)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < end:
+            found = self._sorted_child(lo)
+            name_off, name_len, found_level, _, _ = self._node(found)
+            if found_level == level and self._name(name_off, name_len) == name:
+                return found
+        return None
+
+    def children(self, gbn: int, addr_do: str = "", addr_si: str = "", addr_gu: str = "", addr_lidong: str = "") -> Optional[List[Dict]]:
+        """get_address_data와 같은 형식으로 하위 주소 목록 반환 (스냅샷에 없으면 None)"""
+        if gbn not in GBN_LEVELS:
+            return None
+
+        child_level, depth = GBN_LEVELS[gbn]
+        index = 0
+        for level, name in enumerate([addr_do, addr_si, addr_gu, addr_lidong][:depth], start=1):
+            index = self._find_child(index, level, name)
+            if index is None:
+                return None
+
+        _, _, _, child_start, child_count = self._node(index)
+        if child_start == MISSING:
+            return None
+        field = LEVEL_FIELDS[child_level]
+        result = []
+        for child in range(child_start, child_start + child_count):
+            name_off, name_len, level, _, _ = self._node(child)
+            if level == child_level:
+                result.append({field: self._name(name_off, name_len)})
+        return result
+
+    def close(self):
+        self._mm.close()
+
+
+_snapshot: Optional[AddressSnapshot] = None
+_snapshot_loaded = False
+_snapshot_lock = threading.Lock()
+
+
+def get_address_snapshot() -> Optional[AddressSnapshot]:
+    """프로세스 전역 스냅샷 반환 (파일이 없으면 None)"""
+    global _snapshot, _snapshot_loaded
+
+    if not _snapshot_loaded:
+        with _snapshot_lock:
+            if not _snapshot_loaded:
+                path = os.getenv("KEPCO_ADDRESS_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+                if os.path.exists(path):
+                    try:
+                        _snapshot = AddressSnapshot(path)
+                    except (OSError, ValueError, struct.error) as e:
+                        print(f"주소 스냅샷 로드 오류: {str(e)}")
+                _snapshot_loaded = True
+
+    return _snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KEPCO 주소 계층 스냅샷 생성")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT_PATH, help="스냅샷 파일 경로")
+    parser.add_argument("--sido", action="append", help="특정 시/도만 수집 (여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 요청 수")
+    args = parser.parse_args()
+
+    from utils.kepco_api import KEPCOService
+
+    tree = crawl_address_tree(KEPCOService(), sido_filter=args.sido, workers=args.workers)
+    level_counts = write_snapshot(tree, args.out)
+    print(f"스냅샷 저장 완료: {args.out}")
+    for level, field in LEVEL_FIELDS.items():
+        print(f"  {field}: {level_counts[level]:,}개")
+
+
+if __name__ == "__main__":
+    main()
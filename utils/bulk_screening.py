@@ -0,0 +1,197 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.normalize import normalize_mesh_rows
+from utils.rate_limit import RateLimiter
+from utils.regional_guidance import get_guidance_engine
+
+SITE_COLUMNS = ["sido", "si", "gu", "dong", "li", "jibun"]
+
+# 업로드 파일의 한글 헤더 → 내부 컬럼명
+COLUMN_ALIASES = {
+    "시/도": "sido", "시도": "sido",
+    "시/군": "si", "시군": "si",
+    "구/군": "gu", "구군": "gu",
+    "읍/면/동": "dong", "읍면동": "dong", "동": "dong",
+    "리": "li",
+    "번지": "jibun", "상세번지": "jibun", "지번": "jibun"
+}
+
+SiteKey = Tuple[str, str, str, str, str, str]
+
+
+def read_sites(file, filename: str = "") -> pd.DataFrame:
+    """CSV/Excel 후보지 파일을 (sido, si, gu, dong, li, jibun) 컬럼의 DataFrame으로 읽기"""
+    name = (filename or getattr(file, "name", "")).lower()
+    if name.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(file, dtype=str)
+    else:
+        df = pd.read_csv(file, dtype=str, encoding="utf-8-sig")
+
+    df = df.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip(), str(c).strip()))
+    missing = [c for c in ["sido", "si", "gu", "dong"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+
+    for column in SITE_COLUMNS:
+        if column not in df.columns:
+            df[column] = ""
+    return df[SITE_COLUMNS].fillna("")
+
+
+def site_key(sido: str, si: str, gu: str, dong: str, li: str = "", jibun: str = "") -> SiteKey:
+    """조회 중복 제거용 정규화 주소 키"""
+    li = "" if li == "(해당없음)" else li
+    return tuple(str(v).strip() for v in (sido, si, gu, dong, li, jibun))
+
+
+def summarize_mesh_rows(rows: Optional[List[Dict]]) -> Dict:
+    """retrieveMeshNo 결과를 부지 1건 요약으로 변환 (병목 설비와 최종접속가능용량)"""
+    if not rows:
+        return {
+            "변전소": "", "변전소코드": "", "주변압기": "", "배전선로": "",
+            "병목설비": "", "최종접속가능용량": 0, "상태": "결과없음", "선로수": 0
+        }
+
+    return summarize_normalized(normalize_mesh_rows(rows))
+
+
+def summarize_normalized(df: pd.DataFrame) -> Dict:
+    """이미 정규화된 결과(normalize_mesh_rows)의 부지 요약 - 같은 응답을 두 번 정규화하지 않을 때 사용"""
+    if df.empty:
+        return summarize_mesh_rows([])
+
+    best = df.loc[df["FINAL_CAPA"].idxmin()]
+    return {
+        "변전소": best["SUBST_NM"],
+        "변전소코드": best["SUBST_CD"],
+        "주변압기": f"TR-{best['MTR_NO']}" if best["MTR_NO"] else "-",
+        "배전선로": best["DL_NM"] or "-",
+        "병목설비": best["BOTTLENECK"],
+        "최종접속가능용량": int(best["FINAL_CAPA"]),
+        "상태": best["STATUS"],
+        "선로수": len(df)
+    }
+
+
+def _load_checkpoint(path: str) -> Dict[SiteKey, Dict]:
+    completed = {}
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    completed[tuple(record["key"])] = record["summary"]
+                except (ValueError, KeyError):
+                    continue  # 중단 시 잘린 마지막 줄은 무시
+    return completed
+
+
+def iter_screening(
+    service,
+    keys: List[SiteKey],
+    concurrency: int = 4,
+    rate: float = 2.0,
+    checkpoint_path: Optional[str] = None
+) -> Iterator[Tuple[SiteKey, Dict]]:
+    """
+    고유 주소 키별 용량 조회를 병렬 실행하고 완료되는 순서대로 (키, 요약) 반환
+
+    checkpoint_path가 있으면 완료 결과를 한 줄씩 기록하고, 재실행 시 기록된 키는 건너뜁니다.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    completed = _load_checkpoint(checkpoint_path)
+    for key in unique_keys:
+        if key in completed:
+            yield key, completed[key]
+
+    pending = [key for key in unique_keys if key not in completed]
+    if not pending:
+        return
+
+    limiter = RateLimiter(rate=rate, burst=concurrency)
+    write_lock = threading.Lock()
+    checkpoint = None
+    if checkpoint_path:
+        os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    def lookup(key: SiteKey) -> Dict:
+        limiter.acquire()
+        sido, si, gu, dong, li, jibun = key
+        rows = service.retrieve_mesh_capacity(
+            search_condition="address",
+            addr_do=sido, addr_si=si, addr_gu=gu, addr_lidong=dong, addr_li=li, addr_jibun=jibun
+        )
+        summary = summarize_mesh_rows(rows)
+        if rows is None:
+            summary["상태"] = "조회실패"
+        return summary
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(lookup, key): key for key in pending}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # 한 부지의 오류로 전체 일괄 조회가 멈추지 않도록 실패 행으로 기록
+                    print(f"후보지 조회 오류 ({' '.join(part for part in key if part)}): {str(e)}")
+                    summary = summarize_mesh_rows(None)
+                    summary["상태"] = "조회실패"
+                # 조회 실패는 기록하지 않아 재실행 시 다시 시도
+                if checkpoint and summary["상태"] != "조회실패":
+                    with write_lock:
+                        checkpoint.write(json.dumps({"key": key, "summary": summary}, ensure_ascii=False) + "\n")
+                        checkpoint.flush()
+                yield key, summary
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+
+def screen_sites(
+    service,
+    sites: pd.DataFrame,
+    concurrency: int = 4,
+    rate: float = 2.0,
+    checkpoint_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> pd.DataFrame:
+    """후보지 목록 일괄 스크리닝 - 입력 행마다 병목 설비와 최종접속가능용량 1행 반환"""
+    keys = [site_key(*row) for row in sites[SITE_COLUMNS].itertuples(index=False)]
+    total = len(set(keys))
+
+    summaries = {}
+    for done, (key, summary) in enumerate(iter_screening(service, keys, concurrency, rate, checkpoint_path), start=1):
+        summaries[key] = summary
+        if progress:
+            progress(done, total)
+
+    result = sites[SITE_COLUMNS].copy().reset_index(drop=True)
+    summary_df = pd.DataFrame([summaries[key] for key in keys])
+    result = pd.concat([result, summary_df], axis=1)
+    if "변전소코드" in result.columns:
+        result["안내사항"] = get_guidance_engine().apply(result, region_col="sido", code_col="변전소코드")
+    return result
+
+
+def checkpoint_path_for(content: bytes, directory: str = "data/checkpoints") -> str:
+    """업로드 파일 내용 기준 체크포인트 경로 (같은 파일 재업로드 시 이어서 실행)"""
+    digest = hashlib.sha1(content).hexdigest()[:16]
+    return os.path.join(directory, f"screening_{digest}.ndjson")
+
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """결과 DataFrame을 엑셀 호환 CSV 바이트로 변환"""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8-sig")
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+def _estimate_size(value: Any) -> int:
+    """캐시 값의 대략적인 메모리 크기 (JSON 직렬화 길이 기준)"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class TTLCache:
+    """스레드 안전 TTL + LRU 캐시 (항목 수/메모리 상한, 적중률 통계 포함)"""
+
+    def __init__(
+        self,
+        ttl: float = 86400,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        size_of: Callable[[Any], int] = _estimate_size
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._size_of = size_of
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        캐시 조회 (만료된 항목은 default 반환)
+
+        만료된 항목은 바로 지우지 않고 LRU 순서대로 밀려나게 두어,
+        원격 장애 시 get_stale로 마지막 값을 제공할 수 있게 합니다.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, size = entry
+            if expires_at < time.monotonic():
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """캐시 저장 (상한 초과 시 가장 오래 사용되지 않은 항목부터 제거)"""
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """만료 여부와 관계없이 남아 있는 값 조회 (통계에 반영하지 않음)"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[1] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        """전체 캐시 비우기"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0
+            }
+
+    def save(self, path: str):
+        """
+        만료되지 않은 항목을 JSON Lines 파일로 저장 (CLI처럼 짧게 실행되는 프로세스 간 재사용)
+
+        키와 값은 JSON으로 직렬화 가능해야 하며, 튜플 키는 load 시 튜플로 복원됩니다.
+        """
+        now_monotonic, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            entries = [
+                (key, value, now_wall + (expires_at - now_monotonic))
+                for key, (value, expires_at, _) in self._data.items()
+                if expires_at >= now_monotonic
+            ]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, value, expires_at in entries:
+                f.write(json.dumps({"key": key, "value": value, "expires_at": expires_at}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """save로 저장한 파일에서 만료되지 않은 항목 복원 (복원 건수 반환, 파일이 없으면 0)"""
+        if not os.path.exists(path):
+            return 0
+
+        loaded = 0
+        now_wall = time.time()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                remaining = entry["expires_at"] - now_wall
+                if remaining <= 0:
+                    continue
+                key = entry["key"]
+                self.set(tuple(key) if isinstance(key, list) else key, entry["value"], ttl=remaining)
+                loaded += 1
+        return loaded
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
@@ -0,0 +1,302 @@
+"""
+전국 접속가능 용량 스냅샷 수집기
+
+주소 트리의 모든 읍/면/동(리) 단위에 대해 retrieveMeshNo를 호출하고,
+같은 SUBST_CD/MTR_NO/DL_CD로 귀결되는 주소들을 하나의 설비 행으로 묶어 저장합니다.
+
+출력 디렉터리 구조:
+    facilities.ndjson : 설비별 1줄 {"key": [SUBST_CD, MTR_NO, DL_CD], "row": {...}, "fetched_at": ...}
+    addresses.ndjson  : 완료된 주소별 1줄 {"address": [...], "facilities": [[...], ...]} (체크포인트 겸용)
+    walk.ndjson       : 리/번지까지 펼친 읍/면/동별 1줄 {"dong": [...], "leaves": [[...], ...]} (주소 순회 체크포인트)
+
+주소 순회(시/도 → … → 리/번지)도 조회와 같은 워커 풀·속도 제한으로 실행하며, 조회 단위 주소가
+나오는 즉시 용량 조회를 시작합니다. 재실행 시 walk.ndjson에 있는 읍/면/동은 리/번지 조회를 생략합니다.
+
+같은 디렉터리로 다시 실행하면 완료된 주소를 건너뛰고 이어서 수집하며, 이미 기록된 설비 행은
+갱신하지 않습니다. 새 시점의 스냅샷(snapshot_diff 비교용)은 --dated로 날짜별 하위 디렉터리에 수집합니다.
+
+사용법:
+    python -m utils.capacity_crawler --out data/capacity_snapshot --workers 4 --rate 2
+    python -m utils.capacity_crawler --out data/capacity_snapshot --dated   # data/capacity_snapshot/YYYY-MM-DD
+
+--substation-index 경로를 지정하면 수집이 끝난 뒤 변전소별 대표 주소 색인에 새 변전소를 추가합니다
+(기존 항목은 유지).
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from utils.rate_limit import RateLimiter
+from utils.substation_index import build_index_entries, merge_index_entries, read_index_data, write_substation_index
+
+DEFAULT_SNAPSHOT_DIR = "data/capacity_snapshot"
+FACILITIES_FILE = "facilities.ndjson"
+ADDRESSES_FILE = "addresses.ndjson"
+WALK_FILE = "walk.ndjson"
+
+AddressKey = Tuple[str, str, str, str, str, str]
+FacilityKey = Tuple[str, str, str]
+
+
+def facility_key(row: Dict) -> FacilityKey:
+    """dlt_resultList 행의 설비 키 (변전소, 주변압기, 배전선로)"""
+    return (str(row.get("SUBST_CD", "")), str(row.get("MTR_NO", "")), str(row.get("DL_CD", "")))
+
+
+# 주소 경로 깊이 → (하위 목록 gbn, 필드) - 깊이 4(읍/면/동)는 리/번지로 펼침
+WALK_LEVELS = {0: (-1, "ADDR_DO"), 1: (0, "ADDR_SI"), 2: (1, "ADDR_GU"), 3: (2, "ADDR_LIDONG")}
+
+
+def _names(service, gbn: int, field: str, *path) -> List[str]:
+    data = service.get_address_data(gbn, *path)
+    return [item.get(field, "") for item in (data or []) if item.get(field)]
+
+
+def _leaf_addresses(dong_path: Tuple[str, ...], li_list: List[str], jibun_list: List[str]) -> List[AddressKey]:
+    """읍/면/동의 조회 단위 주소 (리가 없으면 동 단위, 번지는 첫 번지를 대표값으로 사용)"""
+    jibun = jibun_list[0] if jibun_list else ""
+    return [(*dong_path, li, jibun) for li in dict.fromkeys(li_list or [""])]
+
+
+def iter_leaf_addresses(service, sido_filter: Optional[List[str]] = None) -> Iterator[AddressKey]:
+    """
+    주소 트리의 조회 단위(읍/면/동 또는 리)를 순회
+
+    리가 없는 동은 동 단위로, 번지는 해당 동의 첫 번지를 대표값으로 사용합니다.
+    주소 스냅샷이 있으면 네트워크 없이 순회합니다.
+    """
+    for sido in _names(service, -1, "ADDR_DO"):
+        if sido_filter and sido not in sido_filter:
+            continue
+        for si in _names(service, 0, "ADDR_SI", sido):
+            for gu in _names(service, 1, "ADDR_GU", sido, si):
+                for dong in _names(service, 2, "ADDR_LIDONG", sido, si, gu):
+                    li_list = _names(service, 3, "ADDR_LI", sido, si, gu, dong)
+                    jibun_list = _names(service, 4, "ADDR_JIBUN", sido, si, gu, dong)
+                    yield from _leaf_addresses((sido, si, gu, dong), li_list, jibun_list)
+
+
+def _read_ndjson(path: str) -> Iterator[Dict]:
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # 중단 시 잘린 마지막 줄은 무시
+
+
+class CapacityCrawler:
+    """체크포인트 기반 전국 용량 수집기"""
+
+    def __init__(self, service, out_dir: str = DEFAULT_SNAPSHOT_DIR, workers: int = 4, rate: float = 2.0):
+        self.service = service
+        self.out_dir = out_dir
+        self.workers = workers
+        # 모든 워커가 공유하는 전역 요청 속도 제한
+        self.limiter = RateLimiter(rate=rate, burst=workers)
+        self._lock = threading.Lock()
+
+        os.makedirs(out_dir, exist_ok=True)
+        self.facilities_path = os.path.join(out_dir, FACILITIES_FILE)
+        self.addresses_path = os.path.join(out_dir, ADDRESSES_FILE)
+        self.walk_path = os.path.join(out_dir, WALK_FILE)
+
+        # 이전 실행 결과 복원
+        self.done: Set[AddressKey] = {tuple(r["address"]) for r in _read_ndjson(self.addresses_path)}
+        self.seen_facilities: Set[FacilityKey] = {tuple(r["key"]) for r in _read_ndjson(self.facilities_path)}
+        self.walked: Dict[Tuple[str, ...], List[AddressKey]] = {
+            tuple(r["dong"]): [tuple(leaf) for leaf in r["leaves"]] for r in _read_ndjson(self.walk_path)
+        }
+
+    def _address_names(self, gbn: int, field: str, *path) -> Optional[List[str]]:
+        """하위 주소 이름 목록 (원격 조회가 필요할 때만 속도 제한, 실패 시 None)"""
+        request = (gbn, *path, *[""] * (4 - len(path)))
+        if not self.service.has_address_data(*request):
+            self.limiter.acquire()
+        data = self.service.get_address_data(*request)
+        if data is None:
+            return None
+        return [item.get(field, "") for item in data if item.get(field)]
+
+    def _children(self, path: Tuple[str, ...]) -> Optional[List[str]]:
+        gbn, field = WALK_LEVELS[len(path)]
+        return self._address_names(gbn, field, *path)
+
+    def _leaves(self, dong_path: Tuple[str, ...]) -> Tuple[List[AddressKey], bool]:
+        """읍/면/동을 리/번지까지 펼친 조회 단위 주소와 (체크포인트에 남길) 성공 여부"""
+        li_list = self._address_names(3, "ADDR_LI", *dong_path)
+        jibun_list = self._address_names(4, "ADDR_JIBUN", *dong_path)
+        return _leaf_addresses(dong_path, li_list or [], jibun_list or []), li_list is not None and jibun_list is not None
+
+    def _fetch(self, address: AddressKey) -> Optional[List[Dict]]:
+        self.limiter.acquire()
+        sido, si, gu, dong, li, jibun = address
+        return self.service.retrieve_mesh_capacity(
+            search_condition="address",
+            addr_do=sido, addr_si=si, addr_gu=gu, addr_lidong=dong, addr_li=li, addr_jibun=jibun,
+            max_age=0,  # 스냅샷은 항상 원격에서 새로 조회
+            allow_stale=False
+        )
+
+    def _record(self, address: AddressKey, rows: List[Dict], facilities_file, addresses_file):
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        keys = []
+        with self._lock:
+            for row in rows:
+                key = facility_key(row)
+                keys.append(key)
+                if key not in self.seen_facilities:
+                    self.seen_facilities.add(key)
+                    facilities_file.write(json.dumps({"key": key, "row": row, "fetched_at": fetched_at}, ensure_ascii=False) + "\n")
+            facilities_file.flush()
+
+            # 주소 기록은 설비 기록 이후에 남겨야 중단 시에도 일관성 유지
+            addresses_file.write(json.dumps({"address": address, "facilities": keys}, ensure_ascii=False) + "\n")
+            addresses_file.flush()
+            self.done.add(address)
+
+    def run(self, sido_filter: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        수집 실행 (이미 완료된 주소는 건너뜀)
+
+        주소 순회와 용량 조회를 같은 워커 풀·속도 제한으로 실행하며, 전체 주소 목록을 만들기 전에
+        처음 찾은 조회 단위부터 바로 용량 조회를 시작합니다.
+        """
+        print(f"완료 {len(self.done):,}건 건너뜀, 리/번지 순회 완료 읍/면/동 {len(self.walked):,}곳")
+
+        failed = 0
+        fetched = 0
+        queued: Set[AddressKey] = set()
+        # 대기 작업 (우선순위, 순번, 종류, 경로): 용량 조회를 먼저, 주소 순회는 깊은 단계부터 실행해
+        # 조회 단위 주소가 나오는 대로 바로 조회하고 워커 풀에는 일정 수만 넣어 둠
+        backlog: List[Tuple[int, int, str, Tuple[str, ...]]] = []
+        order = itertools.count()
+        futures: Dict[Future, Tuple[str, Tuple[str, ...]]] = {}
+        tasks = {"fetch": self._fetch, "walk": self._children, "leaves": self._leaves}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        def schedule(kind: str, path: Tuple[str, ...]):
+            priority = 0 if kind == "fetch" else 5 - len(path)
+            heapq.heappush(backlog, (priority, next(order), kind, path))
+
+        def schedule_fetches(addresses: List[AddressKey]):
+            for address in addresses:
+                if address not in self.done and address not in queued:
+                    queued.add(address)
+                    schedule("fetch", address)
+
+        def schedule_walk(path: Tuple[str, ...]):
+            if len(path) < 4:
+                schedule("walk", path)
+            elif path in self.walked:
+                schedule_fetches(self.walked[path])
+            else:
+                schedule("leaves", path)
+
+        try:
+            with open(self.facilities_path, "a", encoding="utf-8") as facilities_file, \
+                    open(self.addresses_path, "a", encoding="utf-8") as addresses_file, \
+                    open(self.walk_path, "a", encoding="utf-8") as walk_file:
+                schedule_walk(())
+                while backlog or futures:
+                    while backlog and len(futures) < self.workers * 2:
+                        _, _, kind, path = heapq.heappop(backlog)
+                        futures[executor.submit(tasks[kind], path)] = (kind, path)
+
+                    finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        kind, path = futures.pop(future)
+                        if kind == "fetch":
+                            rows = future.result()
+                            fetched += 1
+                            if rows is None:
+                                failed += 1  # 실패한 주소는 기록하지 않아 재실행 시 다시 조회
+                            else:
+                                self._record(path, rows, facilities_file, addresses_file)
+                            if fetched % 100 == 0:
+                                print(f"  {fetched:,}건 조회 (설비 {len(self.seen_facilities):,}개)")
+                        elif kind == "walk":
+                            names = future.result()
+                            if names is None:
+                                print(f"주소 목록 조회 실패: {' '.join(path) or '시/도'}")
+                                continue
+                            for name in names:
+                                if not path and sido_filter and name not in sido_filter:
+                                    continue
+                                schedule_walk(path + (name,))
+                        else:
+                            leaves, complete = future.result()
+                            # 리/번지 목록을 모두 받은 동만 기록 (실패한 동은 재실행 시 다시 펼침)
+                            if complete:
+                                self.walked[path] = leaves
+                                walk_file.write(json.dumps({"dong": path, "leaves": leaves}, ensure_ascii=False) + "\n")
+                                walk_file.flush()
+                            schedule_fetches(leaves)
+        finally:
+            # 중단(Ctrl+C) 시 대기 중인 요청은 취소하고, 이미 기록된 체크포인트부터 재개
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return {"addresses": len(self.done), "facilities": len(self.seen_facilities), "failed": failed}
+
+
+def load_capacity_snapshot(out_dir: str = DEFAULT_SNAPSHOT_DIR) -> Dict[FacilityKey, Dict]:
+    """
+    수집 결과 로드
+
+    Returns:
+        {(SUBST_CD, MTR_NO, DL_CD): {"row": {...}, "fetched_at": ..., "addresses": [주소, ...]}}
+    """
+    snapshot = {}
+    for record in _read_ndjson(os.path.join(out_dir, FACILITIES_FILE)):
+        snapshot[tuple(record["key"])] = {"row": record["row"], "fetched_at": record.get("fetched_at"), "addresses": []}
+
+    for record in _read_ndjson(os.path.join(out_dir, ADDRESSES_FILE)):
+        for key in record["facilities"]:
+            entry = snapshot.get(tuple(key))
+            if entry is not None:
+                entry["addresses"].append(tuple(record["address"]))
+
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KEPCO 전국 접속가능 용량 스냅샷 수집")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT_DIR,
+                        help="출력 디렉터리 (기존 디렉터리면 이어서 수집하며 설비 행은 갱신하지 않음)")
+    parser.add_argument("--dated", action="store_true",
+                        help="--out 아래 오늘 날짜(YYYY-MM-DD) 디렉터리에 새 스냅샷 수집")
+    parser.add_argument("--sido", action="append", help="특정 시/도만 수집 (여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 요청 수")
+    parser.add_argument("--rate", type=float, default=2.0, help="초당 최대 요청 수")
+    parser.add_argument("--substation-index", default="",
+                        help="변전소 대표 주소 색인 경로 - 지정하면 기존 항목을 유지한 채 새 변전소를 추가 "
+                             "(예: data/substation_addresses.json, 기본값은 갱신하지 않음)")
+    args = parser.parse_args()
+
+    if args.dated:
+        args.out = os.path.join(args.out, datetime.now().strftime("%Y-%m-%d"))
+
+    from utils.kepco_api import KEPCOService
+
+    crawler = CapacityCrawler(KEPCOService(), out_dir=args.out, workers=args.workers, rate=args.rate)
+    stats = crawler.run(sido_filter=args.sido)
+    print(f"수집 완료: 주소 {stats['addresses']:,}건, 설비 {stats['facilities']:,}개, 실패 {stats['failed']:,}건")
+
+    if args.substation_index:
+        existing = read_index_data(args.substation_index)
+        entries = merge_index_entries(existing.get("substations", []), build_index_entries(load_capacity_snapshot(args.out)))
+        added = len(entries) - len(existing.get("substations", []))
+        write_substation_index(entries, args.substation_index, source=existing.get("source") or "capacity_crawler")
+        print(f"변전소 색인 저장 완료: {args.substation_index} ({len(entries):,}개, 신규 {added:,}개)")
+
+
+if __name__ == "__main__":
+    main()
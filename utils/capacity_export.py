@@ -0,0 +1,136 @@
+"""
+접속가능 용량 스냅샷 컬럼형(Parquet) 내보내기
+
+정규화된 retrieveMeshNo 레코드를 정수/범주형 컬럼으로 변환하여
+시/도 및 스냅샷 날짜 기준으로 파티션된 Parquet 데이터셋으로 저장합니다.
+
+사용법:
+    python -m utils.capacity_export --db data/capacity.db --out data/parquet
+    python -m utils.capacity_export --snapshot data/capacity_snapshot --out data/parquet
+
+pandas/DuckDB에서 바로 읽을 수 있습니다:
+    pd.read_parquet("data/parquet", filters=[("sido", "==", "전북특별자치도")])
+"""
+import argparse
+import json
+import re
+import sqlite3
+from typing import Dict, List
+
+import pandas as pd
+
+# 정수형으로 저장할 용량 필드 (*_CAPA, *_PWR, VOL_*, G_*)
+INT_FIELD_PATTERN = re.compile(r"^(.*_CAPA|.*_PWR|VOL_\d+|G_.*)$")
+CATEGORY_FIELDS = ["SUBST_CD", "DL_CD", "MTR_NO"]
+ADDRESS_COLUMNS = ["addr_do", "addr_si", "addr_gu", "addr_lidong", "addr_li", "addr_jibun"]
+PARTITION_COLUMNS = ["sido", "snapshot_date"]
+
+
+def to_typed_frame(records: List[Dict]) -> pd.DataFrame:
+    """
+    레코드 목록을 타입이 지정된 DataFrame으로 변환
+
+    records의 각 항목은 dlt_resultList 원본 필드와 addr_* 주소 컬럼, fetched_at을 포함합니다.
+    """
+    df = pd.DataFrame.from_records(records)
+    if df.empty:
+        return df
+
+    for column in df.columns:
+        if INT_FIELD_PATTERN.match(column):
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+
+    for column in CATEGORY_FIELDS:
+        if column in df.columns:
+            df[column] = df[column].astype(str).astype("category")
+
+    df["fetched_at"] = pd.to_datetime(df["fetched_at"])
+    df["sido"] = df["addr_do"].astype(str)
+    df["snapshot_date"] = df["fetched_at"].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def load_store_records(db_path: str, latest_only: bool = True) -> List[Dict]:
+    """SQLite 용량 저장소에서 원본 레코드 로드"""
+    query = f"SELECT {', '.join(ADDRESS_COLUMNS)}, raw, fetched_at FROM capacity_records r"
+    if latest_only:
+        query += f"""
+            WHERE fetched_at = (
+                SELECT l.fetched_at FROM capacity_lookups l
+                WHERE {' AND '.join(f'l.{c} = r.{c}' for c in ADDRESS_COLUMNS)}
+            )
+        """
+
+    conn = sqlite3.connect(db_path)
+    try:
+        records = []
+        for *address, raw, fetched_at in conn.execute(query):
+            record = json.loads(raw)
+            record.update(zip(ADDRESS_COLUMNS, address))
+            record["fetched_at"] = fetched_at
+            records.append(record)
+        return records
+    finally:
+        conn.close()
+
+
+def load_snapshot_records(snapshot_dir: str) -> List[Dict]:
+    """전국 수집 스냅샷(capacity_crawler)에서 설비별 대표 주소 레코드 로드"""
+    from utils.capacity_crawler import load_capacity_snapshot
+
+    records = []
+    for entry in load_capacity_snapshot(snapshot_dir).values():
+        address = entry["addresses"][0] if entry["addresses"] else ("",) * len(ADDRESS_COLUMNS)
+        record = dict(entry["row"])
+        record.update(zip(ADDRESS_COLUMNS, address))
+        record["fetched_at"] = entry["fetched_at"]
+        records.append(record)
+    return records
+
+
+def export_parquet(df: pd.DataFrame, out_dir: str):
+    """
+    시/도, 스냅샷 날짜로 파티션된 Parquet 데이터셋으로 저장
+
+    같은 디렉터리에 다시 내보내면 이번 데이터에 포함된 파티션만 새 파일로 교체하고,
+    다른 파티션(다른 시/도·날짜)은 그대로 둡니다.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet 내보내기에는 pyarrow가 필요합니다: pip install pyarrow")
+
+    df.to_parquet(
+        out_dir,
+        engine="pyarrow",
+        partition_cols=PARTITION_COLUMNS,
+        index=False,
+        existing_data_behavior="delete_matching"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KEPCO 용량 데이터 Parquet 내보내기")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", default="data/capacity.db", help="SQLite 용량 저장소 경로")
+    source.add_argument("--snapshot", help="전국 수집 스냅샷 디렉터리")
+    parser.add_argument("--out", default="data/parquet", help="출력 디렉터리")
+    parser.add_argument("--all", action="store_true", help="최신 조회분뿐 아니라 전체 이력을 내보내기")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        records = load_snapshot_records(args.snapshot)
+    else:
+        records = load_store_records(args.db, latest_only=not args.all)
+
+    df = to_typed_frame(records)
+    if df.empty:
+        print("내보낼 레코드가 없습니다.")
+        return
+
+    export_parquet(df, args.out)
+    print(f"Parquet 저장 완료: {args.out} ({len(df):,}행, 시/도 {df['sido'].nunique()}개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_DB_PATH = "data/capacity.db"
+
+AddressKey = Tuple[str, str, str, str, str, str]
+
+# dlt_resultList 숫자 필드 (문자열로 오는 값도 정수로 저장)
+NUMERIC_FIELDS = [
+    "SUBST_CAPA", "SUBST_PWR", "G_SUBST_CAPA",
+    "MTR_CAPA", "MTR_PWR", "G_MTR_CAPA",
+    "DL_CAPA", "DL_PWR", "G_DL_CAPA",
+    "VOL_1", "VOL_2", "VOL_3"
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS capacity_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    addr_do TEXT NOT NULL,
+    addr_si TEXT NOT NULL,
+    addr_gu TEXT NOT NULL,
+    addr_lidong TEXT NOT NULL,
+    addr_li TEXT NOT NULL,
+    addr_jibun TEXT NOT NULL,
+    subst_cd TEXT,
+    subst_nm TEXT,
+    mtr_no TEXT,
+    dl_cd TEXT,
+    dl_nm TEXT,
+    {", ".join(f"{field.lower()} INTEGER" for field in NUMERIC_FIELDS)},
+    raw TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS capacity_lookups (
+    addr_do TEXT NOT NULL,
+    addr_si TEXT NOT NULL,
+    addr_gu TEXT NOT NULL,
+    addr_lidong TEXT NOT NULL,
+    addr_li TEXT NOT NULL,
+    addr_jibun TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (addr_do, addr_si, addr_gu, addr_lidong, addr_li, addr_jibun)
+);
+CREATE INDEX IF NOT EXISTS idx_capacity_subst ON capacity_records (subst_cd);
+CREATE INDEX IF NOT EXISTS idx_capacity_subst_mtr ON capacity_records (subst_cd, mtr_no);
+CREATE INDEX IF NOT EXISTS idx_capacity_dl ON capacity_records (dl_cd);
+CREATE INDEX IF NOT EXISTS idx_capacity_address ON capacity_records
+    (addr_do, addr_si, addr_gu, addr_lidong, addr_li, addr_jibun, fetched_at);
+"""
+
+ADDRESS_COLUMNS = ["addr_do", "addr_si", "addr_gu", "addr_lidong", "addr_li", "addr_jibun"]
+ADDRESS_WHERE = "addr_do = ? AND addr_si = ? AND addr_gu = ? AND addr_lidong = ? AND addr_li = ? AND addr_jibun = ?"
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CapacityStore:
+    """retrieveMeshNo 결과 로컬 저장소 (SQLite, 변전소/주변압기/배전선로/주소 인덱스)"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def save_mesh_rows(self, address: AddressKey, rows: List[Dict], fetched_at: Optional[datetime] = None):
+        """주소 1건의 조회 결과 전체를 조회 시각과 함께 저장"""
+        fetched_at = (fetched_at or datetime.now()).isoformat()
+        records = []
+        for row in rows:
+            records.append((
+                *address,
+                str(row.get("SUBST_CD", "")), row.get("SUBST_NM", ""), str(row.get("MTR_NO", "")),
+                str(row.get("DL_CD", "")), row.get("DL_NM", ""),
+                *[_to_int(row.get(field)) for field in NUMERIC_FIELDS],
+                json.dumps(row, ensure_ascii=False),
+                fetched_at
+            ))
+
+        columns = (
+            "addr_do, addr_si, addr_gu, addr_lidong, addr_li, addr_jibun, "
+            "subst_cd, subst_nm, mtr_no, dl_cd, dl_nm, "
+            + ", ".join(field.lower() for field in NUMERIC_FIELDS)
+            + ", raw, fetched_at"
+        )
+        placeholders = ", ".join("?" * (13 + len(NUMERIC_FIELDS)))
+
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO capacity_records ({columns}) VALUES ({placeholders})", records)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO capacity_lookups VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*address, len(rows), fetched_at)
+            )
+
+    def get_mesh_rows(self, address: AddressKey, max_age: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        주소의 가장 최근 조회 결과 반환
+
+        max_age(초)보다 오래된 결과거나 저장된 적이 없으면 None을 반환합니다.
+        """
+        with self._lock:
+            lookup = self._conn.execute(
+                f"SELECT fetched_at FROM capacity_lookups WHERE {ADDRESS_WHERE}", address
+            ).fetchone()
+            if lookup is None:
+                return None
+
+            if max_age is not None:
+                fetched_at = datetime.fromisoformat(lookup["fetched_at"])
+                if datetime.now() - fetched_at > timedelta(seconds=max_age):
+                    return None
+
+            rows = self._conn.execute(
+                f"SELECT raw FROM capacity_records WHERE {ADDRESS_WHERE} AND fetched_at = ? ORDER BY id",
+                (*address, lookup["fetched_at"])
+            ).fetchall()
+
+        return [json.loads(row["raw"]) for row in rows]
+
+    def _latest(self, where: str, params: Tuple) -> List[Dict]:
+        # 주소별 최신 조회분만 반환
+        query = f"""
+            SELECT r.* FROM capacity_records r
+            JOIN capacity_lookups l
+              ON r.addr_do = l.addr_do AND r.addr_si = l.addr_si AND r.addr_gu = l.addr_gu
+             AND r.addr_lidong = l.addr_lidong AND r.addr_li = l.addr_li AND r.addr_jibun = l.addr_jibun
+             AND r.fetched_at = l.fetched_at
+            WHERE {where}
+            ORDER BY r.id
+        """
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def query_by_substation(self, subst_cd: str, mtr_no: Optional[str] = None) -> List[Dict]:
+        """변전소(및 주변압기) 기준 최신 레코드 조회"""
+        if mtr_no is None:
+            return self._latest("r.subst_cd = ?", (subst_cd,))
+        return self._latest("r.subst_cd = ? AND r.mtr_no = ?", (subst_cd, mtr_no))
+
+    def query_by_feeder(self, dl_cd: str) -> List[Dict]:
+        """배전선로 코드 기준 최신 레코드 조회"""
+        return self._latest("r.dl_cd = ?", (dl_cd,))
+
+    def iter_latest_mesh_rows(self) -> Iterator[Tuple[AddressKey, List[Dict]]]:
+        """주소별 최신 조회 결과 전체 순회 (주소, 원본 행 목록)"""
+        current, rows = None, []
+        for record in self._latest("1 = 1", ()):
+            address = tuple(record[column] for column in ADDRESS_COLUMNS)
+            if address != current and current is not None:
+                yield current, rows
+                rows = []
+            current = address
+            rows.append(json.loads(record["raw"]))
+        if current is not None:
+            yield current, rows
+
+    def count(self) -> int:
+        """저장된 레코드 수"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM capacity_records").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared_store: Optional[CapacityStore] = None
+_shared_store_loaded = False
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_store() -> Optional[CapacityStore]:
+    """프로세스 전역 저장소 반환 (KEPCO_CAPACITY_DB를 빈 값으로 두면 비활성화)"""
+    global _shared_store, _shared_store_loaded
+
+    if not _shared_store_loaded:
+        with _shared_store_lock:
+            if not _shared_store_loaded:
+                path = os.getenv("KEPCO_CAPACITY_DB", DEFAULT_DB_PATH)
+                if path:
+                    try:
+                        _shared_store = CapacityStore(path)
+                    except sqlite3.Error as e:
+                        print(f"용량 저장소 초기화 오류: {str(e)}")
+                _shared_store_loaded = True
+
+    return _shared_store
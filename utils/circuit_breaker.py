@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Dict
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """회로가 열려 있어 원격 호출을 하지 않음 (기존 RequestException 처리 경로로 전달)"""
+
+
+class CircuitBreaker:
+    """
+    원격 API 회로 차단기
+
+    연속 failure_threshold회 실패하면 recovery_timeout초 동안 요청을 즉시 거부(OPEN)하고,
+    이후 1건의 시험 요청(HALF_OPEN)이 성공하면 다시 정상(CLOSED)으로 돌아갑니다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """요청 전 호출 - 회로가 열려 있으면 CircuitOpenError 발생"""
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN:
+                remaining = self.recovery_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"KEPCO API 일시 차단 중 ({remaining:.0f}초 후 재시도)")
+                self._state = HALF_OPEN
+                self._probing = False
+            # HALF_OPEN: 시험 요청은 한 번에 1건만 허용
+            if self._probing:
+                raise CircuitOpenError("KEPCO API 복구 확인 중")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    print(f"KEPCO API 회로 차단 ({self._failures}회 연속 실패, {self.recovery_timeout:.0f}초)")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {"state": self.state, "consecutive_failures": self._failures}
@@ -0,0 +1,198 @@
+"""
+KEPCO 응답 녹화본 재생 및 시드 고정 합성 데이터
+
+attached_assets의 브라우저 캡처(요청 페이로드/응답 JSON)를 읽어 엔드포인트별 녹화 응답으로
+사용하고, 녹화본에 없는 주소·설비는 시드 기반으로 항상 같은 값을 합성합니다.
+개발용 모의 응답(KEPCOService)과 로컬 대역 서버(standin_server)가 함께 사용합니다.
+"""
+import json
+import os
+import random
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_ASSETS_DIR = "attached_assets"
+
+# gbn별 응답 목록 필드
+GBN_FIELDS = {0: "ADDR_SI", 1: "ADDR_GU", 2: "ADDR_LIDONG", 3: "ADDR_LI", 4: "ADDR_JIBUN"}
+GBN_SUFFIXES = {0: "시", 1: "구", 2: "동", 3: "리"}
+
+_ENDPOINT_RE = re.compile(r"/ew/cpct/(\w+)")
+# JSON({"do": "..."}) 및 캡처 도구가 축약한 JS 객체 표기({do: "...", …})의 키/값
+_JS_PAIR_RE = re.compile(r"(\w+)\"?\s*:\s*\"([^\"]*)\"")
+
+MeshKey = Tuple[str, str, str, str]
+AddressKey = Tuple[int, str, str, str, str]
+
+
+def _decode_json_after(text: str, marker: str) -> Optional[Dict]:
+    """marker 다음에 처음 나오는 JSON 객체 디코드"""
+    start = text.find(marker)
+    if start < 0:
+        return None
+    brace = text.find("{", start)
+    if brace < 0:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text[brace:])
+        return value
+    except ValueError:
+        return None
+
+
+def _payload_fields(section: str) -> Dict[str, str]:
+    """페이로드 영역에서 키/값 추출 (JSON 또는 축약 JS 표기 모두 지원)"""
+    start = section.find("페이로드")
+    end = section.find("응답", start)
+    if start < 0:
+        return {}
+    payload = section[start:end if end > 0 else None]
+    fields = dict(_JS_PAIR_RE.findall(payload))
+    gbn = re.search(r"\"?gbn\"?\s*:\s*(\d+)", payload)
+    if gbn:
+        fields["gbn"] = gbn.group(1)
+    return fields
+
+
+class RecordedFixtures:
+    """엔드포인트별 녹화 응답"""
+
+    def __init__(self):
+        self.addr_init: Optional[Dict] = None
+        self.addr_gbn: Dict[AddressKey, Dict] = {}
+        self.mesh: Dict[MeshKey, Dict] = {}
+        self.dl: Dict[Tuple[str, str], Dict] = {}
+
+    def add_section(self, section: str):
+        endpoint = _ENDPOINT_RE.search(section)
+        response = _decode_json_after(section, "응답")
+        if not endpoint or response is None:
+            return
+
+        endpoint = endpoint.group(1)
+        fields = _payload_fields(section)
+        if endpoint == "retrieveAddrInit":
+            self.addr_init = response
+        elif endpoint == "retrieveAddrGbn" and "gbn" in fields:
+            key = (int(fields["gbn"]), fields.get("addr_do", ""), fields.get("addr_si", ""),
+                   fields.get("addr_gu", ""), fields.get("addr_lidong", ""))
+            self.addr_gbn[key] = response
+        elif endpoint == "retrieveMeshNo":
+            key = (fields.get("do", ""), fields.get("si", ""), fields.get("gu", ""), fields.get("lidong", ""))
+            self.mesh[key] = response
+        elif endpoint == "retrieveDl":
+            self.dl[(fields.get("subst_cd", ""), fields.get("dl_cd", ""))] = response
+
+    def __len__(self) -> int:
+        return int(self.addr_init is not None) + len(self.addr_gbn) + len(self.mesh) + len(self.dl)
+
+
+def load_recorded_fixtures(assets_dir: str = DEFAULT_ASSETS_DIR) -> RecordedFixtures:
+    """캡처 텍스트 파일들에서 녹화 응답 로드 (요청 URL 기준으로 구간 분리)"""
+    fixtures = RecordedFixtures()
+    if not os.path.isdir(assets_dir):
+        return fixtures
+
+    for name in sorted(os.listdir(assets_dir)):
+        if not name.endswith(".txt"):
+            continue
+        with open(os.path.join(assets_dir, name), "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+
+        starts = [m.start() for m in re.finditer(r"요청 URL", text)]
+        for i, start in enumerate(starts):
+            fixtures.add_section(text[start:starts[i + 1] if i + 1 < len(starts) else None])
+
+    return fixtures
+
+
+_shared_fixtures: Optional[RecordedFixtures] = None
+_shared_fixtures_lock = threading.Lock()
+
+
+def get_recorded_fixtures() -> RecordedFixtures:
+    """프로세스 전역 녹화 응답 (KEPCO_FIXTURES_DIR, 최초 1회 로드)"""
+    global _shared_fixtures
+
+    if _shared_fixtures is None:
+        with _shared_fixtures_lock:
+            if _shared_fixtures is None:
+                _shared_fixtures = load_recorded_fixtures(os.getenv("KEPCO_FIXTURES_DIR", DEFAULT_ASSETS_DIR))
+
+    return _shared_fixtures
+
+
+def _rng(seed: int, *key) -> random.Random:
+    # 문자열 시드는 실행마다 같은 난수열을 보장 (hash 무작위화와 무관)
+    return random.Random("|".join([str(seed), *map(str, key)]))
+
+
+def synthetic_address_children(gbn: int, addr_do: str, addr_si: str, addr_gu: str, addr_lidong: str, seed: int = 0) -> List[Dict]:
+    """녹화본에 없는 주소 단계의 하위 목록 합성"""
+    rng = _rng(seed, "addr", gbn, addr_do, addr_si, addr_gu, addr_lidong)
+    field = GBN_FIELDS[gbn]
+    if gbn == 4:
+        jibuns = {f"{rng.randint(1, 999)}-{rng.randint(1, 30)}" for _ in range(rng.randint(3, 12))}
+        return [{field: jibun} for jibun in sorted(jibuns)]
+    if gbn == 3 and rng.random() < 0.5:
+        return []  # 리가 없는 동
+    parent = (addr_lidong or addr_gu or addr_si or addr_do)[:2]
+    return [{field: f"{parent}{i}{GBN_SUFFIXES[gbn]}"} for i in range(1, rng.randint(2, 6) + 1)]
+
+
+def synthetic_mesh_rows(addr_do: str, addr_si: str, addr_gu: str, addr_lidong: str, seed: int = 0) -> List[Dict]:
+    """녹화본에 없는 주소의 retrieveMeshNo 행 합성 (실제 응답과 같은 필드/타입 구성)"""
+    rng = _rng(seed, "mesh", addr_do, addr_si, addr_gu, addr_lidong)
+    subst_cd = f"{rng.randint(1000, 9999)}"
+    subst_nm = (addr_si or addr_do)[:2]
+    mtr_no = str(rng.randint(1, 4))
+    subst_capa, mtr_capa = 200000, 50000
+
+    rows = []
+    for _ in range(rng.randint(1, 3)):
+        dl_capa = rng.choice([10000, 12000, 15000])
+        subst_pwr = rng.randint(60000, 210000)
+        mtr_pwr = rng.randint(15000, 55000)
+        dl_pwr = rng.randint(3000, 16000)
+        rows.append({
+            "JS_MTR_PWR": 0,
+            "SUBST_CAPA": subst_capa,
+            "VOL_1": max(subst_capa - subst_pwr, 0),
+            "VOL_2": max(mtr_capa - mtr_pwr, 0),
+            "VOL_3": max(dl_capa - dl_pwr, 0),
+            "JS_SUBST_PWR": 0,
+            "G_SUBST_CAPA": str(max(subst_pwr - rng.randint(0, 8000), 0)),
+            "G_MTR_CAPA": str(max(mtr_pwr - rng.randint(0, 4000), 0)),
+            "MTR_CAPA": mtr_capa,
+            "SUBST_PWR": str(subst_pwr),
+            "DL_PWR": dl_pwr,
+            "SUBST_NM": subst_nm,
+            "MTR_PWR": str(mtr_pwr),
+            "G_DL_CAPA": str(max(dl_pwr - rng.randint(0, 1500), 0)),
+            "SUBST_CD": subst_cd,
+            "DL_NM": f"{subst_nm}{rng.randint(1, 40)}",
+            "JS_DL_PWR": 0,
+            "DL_CAPA": dl_capa,
+            "DL_CD": f"{rng.randint(1, 40):02d}",
+            "MTR_NO": mtr_no
+        })
+    return rows
+
+
+def synthetic_dl_states(subst_cd: str, dl_cd: str, seed: int = 0) -> List[Dict]:
+    """녹화본에 없는 배전선로의 retrieveDl 접수 현황 합성"""
+    rng = _rng(seed, "dl", subst_cd, dl_cd)
+    states = []
+    for state in ("01", "02", "03"):
+        count = rng.randint(0, 25) if rng.random() < 0.6 else 0
+        states.append({"CNT": count, "STATE": state, "PWR": count * rng.randint(50, 150)})
+    return states
+
+
+def mesh_rows_for(addr_do: str, addr_si: str, addr_gu: str, addr_lidong: str, seed: int = 0) -> List[Dict]:
+    """녹화 응답이 있으면 그대로, 없으면 시드 기반 합성 행 반환"""
+    recorded = get_recorded_fixtures().mesh.get((addr_do, addr_si, addr_gu, addr_lidong))
+    if recorded is not None:
+        return recorded.get("dlt_resultList", [])
+    return synthetic_mesh_rows(addr_do, addr_si, addr_gu, addr_lidong, seed)
@@ -0,0 +1,431 @@
+"""
+설비별 여유용량 이력 저장소 (시계열)
+
+변전소·주변압기·배전선로마다 파일 하나(파티션)를 두고, 여유용량이 바뀔 때만 관측을 덧붙입니다.
+dlt_resultList 한 행에는 세 단계 값이 함께 들어 있으므로 단계별로 나눠 저장합니다.
+
+    변전소   substation/<SUBST_CD>.hist            : G_SUBST_CAPA, VOL_1
+    주변압기 transformer/<SUBST_CD>/<MTR_NO>.hist  : G_MTR_CAPA, VOL_2
+    배전선로 feeder/<SUBST_CD>/<MTR_NO>_<DL_CD>.hist : G_DL_CAPA, VOL_3
+
+파일 형식 (추가 전용):
+    헤더  : MAGIC, 키 JSON 길이(varint), 키 JSON
+    블록  : 관측 수 n(varint) + 열별 n개 값 [시각(초), 필드1, 필드2]
+            각 값은 같은 열의 직전 값(이전 블록 포함)과의 차이를 zigzag varint로 기록
+
+값이 그대로인 관측은 저장하지 않으므로 이력은 계단 함수이며, 구간 조회 결과에는 구간 시작 시점에
+유효했던 값이 첫 항목으로 포함됩니다. 직전 관측보다 이른 시각의 관측은 무시합니다.
+"""
+import argparse
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 단일 프로세스 기록만 지원
+    fcntl = None
+
+from utils.capacity_crawler import FACILITIES_FILE, _read_ndjson
+from utils.normalize import int_columns
+
+DEFAULT_HISTORY_DIR = "data/headroom_history"
+MAGIC = b"KHH1"
+
+# 단계 → (키 필드, 저장 필드)
+LEVELS = {
+    "substation": (("SUBST_CD",), ("G_SUBST_CAPA", "VOL_1")),
+    "transformer": (("SUBST_CD", "MTR_NO"), ("G_MTR_CAPA", "VOL_2")),
+    "feeder": (("SUBST_CD", "MTR_NO", "DL_CD"), ("G_DL_CAPA", "VOL_3"))
+}
+# 필드 → 저장 단계
+FIELD_LEVELS = {field: level for level, (_, fields) in LEVELS.items() for field in fields}
+HISTORY_FIELDS = list(FIELD_LEVELS)
+
+PartitionKey = Tuple[str, ...]
+# 파티션 열: [시각 목록, 필드1 목록, 필드2 목록]
+Columns = List[List[int]]
+
+_UNSAFE = re.compile(r"[^0-9A-Za-z가-힣-]")
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def encode_block(points: List[Tuple[int, ...]], previous: Tuple[int, ...]) -> bytes:
+    """관측 목록을 열 단위 델타 블록으로 인코딩 (previous: 각 열의 직전 값)"""
+    out = bytearray()
+    _encode_varint(len(points), out)
+    for column, last in enumerate(previous):
+        for point in points:
+            _encode_varint(_zigzag(point[column] - last), out)
+            last = point[column]
+    return bytes(out)
+
+
+def _decode_header(data: bytes) -> Tuple[Optional[PartitionKey], int]:
+    """(키, 헤더 길이) - 헤더가 잘렸으면 (None, 0)"""
+    if len(data) < len(MAGIC):
+        if MAGIC.startswith(data):
+            return None, 0
+        raise ValueError("이력 파일 형식이 아닙니다")
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("이력 파일 형식이 아닙니다")
+    try:
+        length, pos = _decode_varint(data, len(MAGIC))
+    except IndexError:
+        return None, 0
+    if pos + length > len(data):
+        return None, 0
+    return tuple(json.loads(data[pos:pos + length].decode("utf-8"))), pos + length
+
+
+def decode_partition(data: bytes) -> Tuple[Optional[PartitionKey], Columns, int]:
+    """
+    파티션 파일 디코딩
+
+    Returns:
+        (키, 열, 온전한 데이터 길이) - 기록 중 중단돼 잘린 마지막 블록은 버리고,
+        그 앞까지의 길이를 돌려주므로 추가 전에 그 길이로 잘라낼 수 있습니다.
+    """
+    key, pos = _decode_header(data)
+    columns: Columns = [[], [], []]
+    if key is None:
+        return None, columns, 0
+
+    end = len(data)
+    valid = pos
+    while pos < end:
+        try:
+            count, pos = _decode_varint(data, pos)
+            block = []
+            for column in columns:
+                last = column[-1] if column else 0
+                values = []
+                for _ in range(count):
+                    delta, pos = _decode_varint(data, pos)
+                    last += _unzigzag(delta)
+                    values.append(last)
+                block.append(values)
+        except IndexError:
+            break  # 잘린 블록
+        for column, values in zip(columns, block):
+            column.extend(values)
+        valid = pos
+    return key, columns, valid
+
+
+def _timestamp(value) -> int:
+    if value is None:
+        return int(datetime.now().timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp())
+
+
+class HeadroomHistory:
+    """
+    설비별 여유용량 이력
+
+    여러 프로세스(앱, API 서버, CLI, 수집기)가 같은 디렉터리에 기록할 수 있도록
+    추가는 파티션 파일 잠금(fcntl) 안에서 파일의 마지막 값을 다시 읽어 델타를 계산합니다.
+    """
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        self.root = root
+
+    def partition_path(self, level: str, key: PartitionKey) -> str:
+        parts = [_UNSAFE.sub("_", part) or "_" for part in key]
+        if level == "substation":
+            return os.path.join(self.root, level, f"{parts[0]}.hist")
+        return os.path.join(self.root, level, parts[0], "_".join(parts[1:]) + ".hist")
+
+    def _read(self, path: str) -> Optional[Tuple[PartitionKey, Columns]]:
+        try:
+            with open(path, "rb") as f:
+                key, columns, _ = decode_partition(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"이력 파일 읽기 오류 ({path}): {str(e)}")
+            return None
+        return (key, columns) if key is not None else None
+
+    def _append(self, level: str, key: PartitionKey, points: List[Tuple[int, ...]]) -> int:
+        """값이 바뀐 관측만 파티션 끝에 추가 (파일 잠금 안에서 꼬리 값 확인)"""
+        path = self.partition_path(level, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                data = f.read()
+                stored_key, columns, valid = decode_partition(data)
+                if stored_key is not None and stored_key != key:
+                    raise ValueError(f"파티션 키 불일치: {stored_key}")
+
+                previous = tuple(column[-1] for column in columns) if columns[0] else None
+                tail = previous
+                changed = []
+                for point in sorted(points):
+                    if tail is not None and (point[0] <= tail[0] or point[1:] == tail[1:]):
+                        continue
+                    changed.append(point)
+                    tail = point
+                if not changed:
+                    return 0
+
+                if valid < len(data):
+                    # 이전 기록이 중간에 끊겨 남은 잘린 블록 제거
+                    f.truncate(valid)
+                out = bytearray()
+                if stored_key is None:
+                    encoded_key = json.dumps(list(key), ensure_ascii=False).encode("utf-8")
+                    out += MAGIC
+                    _encode_varint(len(encoded_key), out)
+                    out += encoded_key
+                out += encode_block(changed, previous or (0, 0, 0))
+                f.write(bytes(out))  # 추가 모드라 항상 파일 끝에 기록
+                f.flush()
+                return len(changed)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def record_rows(self, rows: Iterable[Dict], observed_at=None) -> int:
+        """
+        dlt_resultList 행들의 여유용량을 기록
+
+        Args:
+            rows: 조회 결과 행 (원본 또는 정규화된 레코드 모두 가능)
+            observed_at: 관측 시각 (datetime, ISO 문자열, epoch 초, 기본값 현재)
+
+        Returns:
+            새로 기록된 관측 수 (값이 바뀐 파티션만)
+        """
+        return self.record_observations((row, observed_at) for row in rows)
+
+    def record_observations(self, observations: Iterable[Tuple[Dict, object]]) -> int:
+        """(행, 관측 시각) 목록 기록 - 같은 파티션의 관측은 모아서 블록 하나로 추가"""
+        observations = list(observations)
+        rows = [row for row, _ in observations]
+        timestamps = [_timestamp(observed_at) for _, observed_at in observations]
+
+        pending: Dict[Tuple[str, PartitionKey], List[Tuple[int, ...]]] = {}
+        for level, (key_fields, fields) in LEVELS.items():
+            # 값 변환은 정규화 엔진과 같은 규칙으로 단계별 열 단위 한 번
+            columns = int_columns(rows, list(fields))
+            values = zip(*(columns[field].tolist() for field in fields))
+            for row, ts, point in zip(rows, timestamps, values):
+                key = tuple(str(row.get(field, "")) for field in key_fields)
+                if not key[0]:
+                    continue
+                pending.setdefault((level, key), []).append((ts, *point))
+
+        written = 0
+        for (level, key), points in pending.items():
+            try:
+                written += self._append(level, key, points)
+            except (OSError, ValueError) as e:
+                print(f"이력 기록 오류 ({level} {key}): {str(e)}")
+        return written
+
+    def ingest_snapshot(self, snapshot_dir: str) -> int:
+        """capacity_crawler 스냅샷(facilities.ndjson)을 수집 시각 기준으로 기록"""
+        records = _read_ndjson(os.path.join(snapshot_dir, FACILITIES_FILE))
+        return self.record_observations((record.get("row") or {}, record.get("fetched_at")) for record in records)
+
+    # 조회
+    def load(self, level: str, key: PartitionKey) -> Optional[Columns]:
+        loaded = self._read(self.partition_path(level, tuple(str(part) for part in key)))
+        return loaded[1] if loaded else None
+
+    def series(
+        self,
+        field: str,
+        key: PartitionKey,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Tuple[datetime, int]]:
+        """
+        설비 한 곳의 필드 이력 [(시각, 값), ...]
+
+        예: series("VOL_3", (SUBST_CD, MTR_NO, DL_CD), start=datetime.now() - timedelta(days=90))
+        start 이전 마지막 값이 있으면 start 시각으로 첫 항목에 넣습니다.
+        """
+        level = FIELD_LEVELS[field]
+        columns = self.load(level, key)
+        if not columns:
+            return []
+
+        times, values = columns[0], columns[1 + LEVELS[level][1].index(field)]
+        start_ts = _timestamp(start) if start is not None else None
+        end_ts = _timestamp(end) if end is not None else None
+
+        result = []
+        for i, ts in enumerate(times):
+            if end_ts is not None and ts > end_ts:
+                break
+            if start_ts is not None and ts < start_ts:
+                # 구간 시작 시점에 유효한 값 (다음 관측이 start 이후일 때만)
+                if i + 1 == len(times) or times[i + 1] > start_ts:
+                    result.append((datetime.fromtimestamp(start_ts), values[i]))
+                continue
+            result.append((datetime.fromtimestamp(ts), values[i]))
+        return result
+
+    def iter_partitions(self, level: str) -> Iterator[Tuple[PartitionKey, Columns]]:
+        """단계의 모든 파티션 순회"""
+        base = os.path.join(self.root, level)
+        for directory, _, files in os.walk(base):
+            for name in files:
+                if name.endswith(".hist"):
+                    loaded = self._read(os.path.join(directory, name))
+                    if loaded and loaded[1][0]:
+                        yield loaded
+
+    def drops(
+        self,
+        field: str = "VOL_3",
+        since: Optional[datetime] = None,
+        threshold: float = 0.5,
+        until: Optional[datetime] = None
+    ) -> List[Dict]:
+        """
+        since 이후 여유용량이 threshold 비율 이상 줄어든 설비
+
+        기준값은 since 시점에 유효했던 값(그 이후 처음 관측된 설비는 첫 관측값), 비교값은 until
+        시점(기본값 최신)의 값입니다. 기준값이 0 이하인 설비는 제외합니다. 감소율 내림차순.
+        """
+        since = since or datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        since_ts = _timestamp(since)
+        until_ts = _timestamp(until) if until is not None else None
+        level = FIELD_LEVELS[field]
+        column = 1 + LEVELS[level][1].index(field)
+
+        results = []
+        for key, columns in self.iter_partitions(level):
+            times, values = columns[0], columns[column]
+            if until_ts is not None and times[0] > until_ts:
+                continue
+            if times[-1] < since_ts:
+                continue  # 기간 중 변화 없음
+
+            base_index = 0
+            last_index = len(times) - 1
+            for i, ts in enumerate(times):
+                if ts <= since_ts:
+                    base_index = i
+                if until_ts is not None and ts > until_ts:
+                    last_index = i - 1
+                    break
+
+            before, after = values[base_index], values[last_index]
+            if before <= 0:
+                continue
+            ratio = (before - after) / before
+            if ratio >= threshold:
+                results.append({
+                    "key": list(key),
+                    "field": field,
+                    "before": before,
+                    "after": after,
+                    "drop_ratio": round(ratio, 4),
+                    "changed_at": datetime.fromtimestamp(times[last_index]).isoformat(timespec="seconds")
+                })
+
+        results.sort(key=lambda item: item["drop_ratio"], reverse=True)
+        return results
+
+
+_shared_history: Optional[HeadroomHistory] = None
+_shared_history_loaded = False
+_shared_history_lock = threading.Lock()
+
+
+def get_shared_history() -> Optional[HeadroomHistory]:
+    """프로세스 전역 이력 저장소 반환 (KEPCO_HISTORY_DIR을 빈 값으로 두면 비활성화)"""
+    global _shared_history, _shared_history_loaded
+
+    if not _shared_history_loaded:
+        with _shared_history_lock:
+            if not _shared_history_loaded:
+                root = os.getenv("KEPCO_HISTORY_DIR", DEFAULT_HISTORY_DIR)
+                if root:
+                    _shared_history = HeadroomHistory(root)
+                _shared_history_loaded = True
+
+    return _shared_history
+
+
+def _parse_month(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="설비별 여유용량 이력")
+    parser.add_argument("--dir", default=os.getenv("KEPCO_HISTORY_DIR") or DEFAULT_HISTORY_DIR, help="이력 디렉터리")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="용량 스냅샷을 이력에 기록")
+    ingest.add_argument("snapshot", nargs="+", help="스냅샷 디렉터리 (오래된 것부터)")
+
+    series = sub.add_parser("series", help="설비 한 곳의 필드 이력")
+    series.add_argument("key", nargs="+", help="SUBST_CD [MTR_NO [DL_CD]]")
+    series.add_argument("--field", default="VOL_3", choices=HISTORY_FIELDS)
+    series.add_argument("--days", type=int, default=90, help="최근 N일")
+
+    drops = sub.add_parser("drops", help="여유용량이 크게 줄어든 설비")
+    drops.add_argument("--field", default="VOL_3", choices=HISTORY_FIELDS)
+    drops.add_argument("--month", type=_parse_month, help="기준 월 YYYY-MM (기본값 이번 달)")
+    drops.add_argument("--threshold", type=float, default=0.5, help="감소 비율 (0~1)")
+    args = parser.parse_args()
+
+    history = HeadroomHistory(args.dir)
+    if args.command == "ingest":
+        for snapshot in args.snapshot:
+            print(f"{snapshot}: 관측 {history.ingest_snapshot(snapshot):,}건 기록")
+    elif args.command == "series":
+        start = datetime.now() - timedelta(days=args.days)
+        for ts, value in history.series(args.field, tuple(args.key), start=start):
+            print(f"{ts.isoformat(timespec='seconds')}\t{value}")
+    else:
+        since = args.month or datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        until = (since + timedelta(days=32)).replace(day=1) if args.month else None
+        for item in history.drops(args.field, since=since, threshold=args.threshold, until=until):
+            print(json.dumps(item, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from utils.metrics import get_metrics
+from utils.rate_limit import get_shared_limiter
+
+DEFAULT_BASE_URL = "https://online.kepco.co.kr/ew/cpct/"
+
+# 모든 KEPCO 요청에 공통으로 사용하는 헤더 (gzip 압축 및 keep-alive 재사용)
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json; charset=UTF-8",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Origin": "https://online.kepco.co.kr",
+    "Referer": "https://online.kepco.co.kr/EWM092D00"
+}
+
+# 엔드포인트별 타임아웃 (초)
+DEFAULT_TIMEOUT = 10
+ENDPOINT_TIMEOUTS = {
+    "retrieveAddrInit": 10,
+    "retrieveAddrGbn": 10,
+    "retrieveMeshNo": 15
+}
+
+# 재시도 대상 응답 코드 (NetFunnel 제한 429 및 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 재시도 대상 예외 (그 밖의 RequestException은 재시도 없이 실패로 기록 후 전달)
+RETRY_EXCEPTIONS = (
+    requests.Timeout,
+    requests.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError
+)
+
+
+class KEPCOHttpClient:
+    """KEPCO 온라인 API 공용 HTTP 클라이언트 (커넥션 풀 기반)"""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = 10,
+        limiter=None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0
+    ):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.pool_size = pool_size
+        # 모든 요청(재시도 포함)은 전역 토큰 버킷을 통과
+        self.limiter = limiter if limiter is not None else get_shared_limiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        # 동일 호스트에 대한 연결을 재사용하고, 풀이 가득 차면 새 소켓 대신 대기
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """지수 백오프 + full jitter (Retry-After 헤더가 있으면 그 이상 대기)"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if response is not None:
+            try:
+                delay = max(delay, min(self.backoff_max, float(response.headers.get("Retry-After", 0))))
+            except ValueError:
+                pass
+        return delay
+
+    def post(self, endpoint: str, payload: Optional[Dict] = None, timeout: Optional[float] = None) -> requests.Response:
+        """
+        엔드포인트에 POST 요청
+
+        429/5xx/타임아웃/연결 오류는 지수 백오프로 재시도합니다. 재시도 후에도 실패하면
+        마지막 응답을 반환하거나 requests.RequestException을 발생시키며, 연속 실패가 쌓여
+        회로가 열린 동안에는 CircuitOpenError(RequestException)로 즉시 실패합니다.
+        """
+        if timeout is None:
+            timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+
+        self.breaker.before_request()
+
+        # 어떤 경로로 끝나든(예외 포함) 회로에 성공/실패를 한 번 기록해야
+        # 시험 요청(HALF_OPEN) 상태가 풀리지 않고 남는 일이 없음
+        succeeded = False
+        try:
+            response = None
+            error = None
+            for attempt in range(self.max_retries + 1):
+                if attempt > 0:
+                    time.sleep(self._backoff(attempt - 1, response))
+
+                self.limiter.acquire()
+                try:
+                    response = self.session.post(
+                        f"{self.base_url}{endpoint}",
+                        json=payload,
+                        timeout=timeout
+                    )
+                    error = None
+                except RETRY_EXCEPTIONS as e:
+                    response, error = None, e
+                    continue
+
+                if response.status_code not in RETRY_STATUS_CODES:
+                    succeeded = True
+                    return response
+
+            if error is not None:
+                raise error
+            return response
+        finally:
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def close(self):
+        """커넥션 풀 정리"""
+        self.session.close()
+
+
+_shared_client: Optional[KEPCOHttpClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> KEPCOHttpClient:
+    """프로세스 전역 공유 클라이언트 반환 (Streamlit 재실행/세션 간 공유)"""
+    global _shared_client
+
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = KEPCOHttpClient(
+                    base_url=os.getenv("KEPCO_BASE_URL", DEFAULT_BASE_URL),
+                    pool_size=int(os.getenv("KEPCO_POOL_SIZE", "10")),
+                    breaker=CircuitBreaker(
+                        failure_threshold=int(os.getenv("KEPCO_BREAKER_THRESHOLD", "5")),
+                        recovery_timeout=float(os.getenv("KEPCO_BREAKER_RECOVERY", "30"))
+                    ),
+                    max_retries=int(os.getenv("KEPCO_MAX_RETRIES", "3"))
+                )
+                get_metrics().register_collector("http_client", _collect_breaker_gauges)
+
+    return _shared_client
+
+
+# 회로 상태 게이지 값 (0: 정상, 1: 시험 중, 2: 차단)
+BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _collect_breaker_gauges() -> Dict[str, float]:
+    stats = _shared_client.breaker.stats()
+    return {
+        "kepco_circuit_state": BREAKER_STATE_VALUES.get(stats["state"], 0),
+        "kepco_circuit_consecutive_failures": stats["consecutive_failures"]
+    }
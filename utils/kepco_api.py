@@ -1,17 +1,77 @@
+import asyncio
+import functools
 import json
 import os
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
-import random
+
+from utils.address_snapshot import get_address_snapshot
+from utils.cache import TTLCache
+from utils.capacity_store import CapacityStore, get_shared_store
+from utils.fixtures import mesh_rows_for, synthetic_mesh_rows
+from utils.headroom_history import HeadroomHistory, get_shared_history
+from utils.http_client import KEPCOHttpClient, get_shared_client
+from utils.metrics import UPSTREAM_METRIC, get_metrics
+from utils.normalize import normalize_mesh_rows, to_level_records
+from utils.substation_index import get_substation_index
+from utils.singleflight import SingleFlight, payload_key
+from utils.topology import TopologyIndex, get_shared_topology
+
+# 주소 계층(시/도~번지) 공용 캐시 - 모든 세션/사용자가 공유 (주소 체계는 거의 변하지 않음)
+ADDRESS_CACHE = TTLCache(
+    ttl=float(os.getenv("KEPCO_ADDRESS_CACHE_TTL", "86400")),
+    max_entries=int(os.getenv("KEPCO_ADDRESS_CACHE_MAX_ENTRIES", "20000")),
+    max_bytes=int(os.getenv("KEPCO_ADDRESS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
+
+# 동일 주소 동시 용량 조회 병합 (여러 사용자/배치 행이 같은 retrieveMeshNo 요청을 한 번만 전송)
+MESH_FLIGHT = SingleFlight()
+
+METRICS = get_metrics()
+
+
+def _collect_gauges() -> Dict[str, float]:
+    address_cache = ADDRESS_CACHE.stats()
+    flight = MESH_FLIGHT.stats()
+    return {
+        "kepcogrid_address_cache_entries": address_cache["entries"],
+        "kepcogrid_address_cache_bytes": address_cache["bytes"],
+        "kepcogrid_address_cache_evictions": address_cache["evictions"],
+        "kepcogrid_mesh_flight_executed": flight["executed"],
+        "kepcogrid_mesh_flight_shared": flight["shared"],
+        "kepcogrid_mesh_flight_in_flight": flight["in_flight"]
+    }
+
+
+METRICS.register_collector("kepco_api", _collect_gauges)
 
 class KEPCOService:
     """한전 신재생에너지 접속가능 용량 조회 서비스"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[KEPCOHttpClient] = None,
+        store: Optional[CapacityStore] = None,
+        topology: Optional[TopologyIndex] = None,
+        history: Optional[HeadroomHistory] = None
+    ):
         self.api_key = os.getenv("KEPCO_API_KEY", "")
-        self.base_url = "https://online.kepco.co.kr/ew/cpct/"
+        # 커넥션 풀은 프로세스 전역으로 공유 (인스턴스마다 새로 연결하지 않음)
+        self.client = client or get_shared_client()
+        self.base_url = self.client.base_url
+        # 용량 조회 결과 로컬 저장소 (최근 결과는 원격 호출 없이 재사용)
+        self.store = store or get_shared_store()
+        self.store_max_age = float(os.getenv("KEPCO_STORE_MAX_AGE", "21600"))
+        # 변전소/주변압기/배전선로 ↔ 주소 계통 인덱스 (원격 조회 결과로 계속 갱신)
+        self.topology = topology or get_shared_topology(self.store)
+        # 설비별 여유용량 이력 (원격 조회 결과에서 값이 바뀐 설비만 추가)
+        self.history = history or get_shared_history()
         self.mock_data_path = "data/mock_data.json"
+        # 모의 응답: 지연 없음이 기본, 같은 시드·입력이면 항상 같은 결과
+        self.mock_latency = float(os.getenv("KEPCO_MOCK_LATENCY", "0"))
+        self.mock_seed = int(os.getenv("KEPCO_MOCK_SEED", "0"))
         
     def query_connection_capacity(
         self, 
@@ -57,22 +117,13 @@ class KEPCOService:
         """실제 KEPCO API 호출"""
         
         try:
-            # 변전소별 주소 매핑 (실제 KEPCO 시스템에서는 변전소명으로 직접 검색이 불가능하므로 주소 기반 검색 사용)
-            substation_address_map = self._get_substation_address_mapping()
-            
-            # 선택된 변전소에 해당하는 주소 정보 가져오기
-            address_info = substation_address_map.get(substation, None)
+            # 변전소 대표 주소 (실제 KEPCO 시스템에서는 변전소명으로 직접 검색이 불가능하므로 주소 기반 검색 사용)
+            address_info = get_substation_index().address_of(substation)
             
             if not address_info:
-                # 기본 주소 사용 (전주변전소)
-                address_info = {
-                    "do": "전북특별자치도",
-                    "si": "전주시", 
-                    "gu": "덕진구",
-                    "lidong": "강흥동",
-                    "li": "춘포리",
-                    "jibun": "553-5"
-                }
+                # 색인에 없는 변전소는 엉뚱한 지역을 조회하지 않도록 원격 호출 없이 종료
+                print(f"변전소 대표 주소를 찾을 수 없습니다: {substation}")
+                return None
             
             search_params = {
                 "searchCondition": "address",
@@ -93,146 +144,29 @@ class KEPCOService:
     
     def _get_address_init(self) -> Optional[Dict]:
         """주소 초기화 API 호출"""
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            response = requests.post(
-                f"{self.base_url}retrieveAddrInit",
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return None
-                
-        except requests.RequestException:
-            return None
+        return self._post_json("retrieveAddrInit")
     
     def _retrieve_mesh_no(self, search_params: Dict) -> Optional[Dict]:
         """최종 용량 정보 조회 API"""
-        try:
-            headers = {
-                "Content-Type": "application/json; charset=UTF-8",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            payload = {
-                "dma_reqParam": search_params
-            }
-            
-            response = requests.post(
-                f"{self.base_url}retrieveMeshNo",
-                headers=headers,
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return None
-                
-        except requests.RequestException:
-            return None
+        payload = {
+            "dma_reqParam": search_params
+        }
+        return self._post_json("retrieveMeshNo", payload)
+    
+    def _post_json(self, endpoint: str, payload: Optional[Dict] = None) -> Optional[Dict]:
+        """원격 API 호출 후 JSON 응답 전체 반환 (실패 시 None) - 다른 원격 호출과 같은 지연 지표로 기록"""
+        with METRICS.timer(UPSTREAM_METRIC, endpoint=endpoint, gbn="") as timer:
+            try:
+                response = self.client.post(endpoint, payload)
+                result = response.json() if response.status_code == 200 else None
+            except requests.RequestException:
+                result = None
+            timer.error = result is None
+        return result
     
     def _format_api_response(self, api_response: Dict) -> List[Dict]:
-        """KEPCO API 응답을 표준 형식으로 변환"""
-        formatted_results = []
-        
-        if "dlt_resultList" in api_response:
-            for result in api_response["dlt_resultList"]:
-                # 여유용량 값들 추출 (최종접속가능용량 계산용)
-                vol_1 = int(result.get('VOL_1', 0))  # 변전소 여유용량
-                vol_2 = int(result.get('VOL_2', 0))  # 주변압기 여유용량
-                vol_3 = int(result.get('VOL_3', 0))  # 배전선로 여유용량
-                
-                # 최종 접속가능용량은 변전소→주변압기→배전선로 중 최소값
-                final_capacity = min([v for v in [vol_1, vol_2, vol_3] if v > 0], default=0)
-                final_status = "정상" if final_capacity > 0 else "포화"
-                
-                # 변전소 정보
-                subst_capa = int(result.get('SUBST_CAPA', 0))
-                g_subst_capa = int(result.get('G_SUBST_CAPA', 0))
-                subst_calculated_capacity = subst_capa - g_subst_capa if subst_capa > 0 and g_subst_capa > 0 else 0
-                
-                formatted_result = {
-                    "변전소": f"{result.get('SUBST_NM', '')}변전소",
-                    "주변압기": "-",
-                    "배전선로": "-",
-                    "접속기준용량(kW)": subst_capa,
-                    "접수기준접속용량(kW)": int(result.get('SUBST_PWR', 0)),
-                    "접속계획반영접속용량(kW)": g_subst_capa,
-                    "여유용량(kW)": f"{vol_1:,}",
-                    "접속계획반영여유용량(kW)": f"{subst_calculated_capacity:,}",
-                    "최종접속가능용량": f"{final_capacity:,}",
-                    "상태": final_status,
-                    "여유용량비율(%)": round((vol_1 / max(subst_capa, 1)) * 100, 1),
-                    # 원본 API 필드 보존
-                    "SUBST_CAPA": subst_capa,
-                    "G_SUBST_CAPA": g_subst_capa,
-                    "SUBST_PWR": int(result.get('SUBST_PWR', 0)),
-                    "VOL_1": vol_1
-                }
-                formatted_results.append(formatted_result)
-                
-                # 주변압기 정보가 있는 경우 추가
-                if result.get('MTR_CAPA') and int(result.get('MTR_CAPA', 0)) > 0:
-                    mtr_capa = int(result.get('MTR_CAPA', 0))
-                    g_mtr_capa = int(result.get('G_MTR_CAPA', 0))
-                    mtr_calculated_capacity = mtr_capa - g_mtr_capa if mtr_capa > 0 and g_mtr_capa > 0 else 0
-                    
-                    mtr_result = {
-                        "변전소": f"{result.get('SUBST_NM', '')}변전소",
-                        "주변압기": f"#{result.get('MTR_NO', '-')}",
-                        "배전선로": "-",
-                        "접속기준용량(kW)": mtr_capa,
-                        "접수기준접속용량(kW)": int(result.get('MTR_PWR', 0)),
-                        "접속계획반영접속용량(kW)": g_mtr_capa,
-                        "여유용량(kW)": f"{vol_2:,}",
-                        "접속계획반영여유용량(kW)": f"{mtr_calculated_capacity:,}",
-                        "최종접속가능용량": f"{final_capacity:,}",
-                        "상태": final_status,
-                        "여유용량비율(%)": round((vol_2 / max(mtr_capa, 1)) * 100, 1),
-                        # 원본 API 필드 보존
-                        "MTR_CAPA": mtr_capa,
-                        "G_MTR_CAPA": g_mtr_capa,
-                        "MTR_PWR": int(result.get('MTR_PWR', 0)),
-                        "VOL_2": vol_2
-                    }
-                    formatted_results.append(mtr_result)
-                
-                # 배전선로 정보가 있는 경우 추가
-                if result.get('DL_CAPA') and int(result.get('DL_CAPA', 0)) > 0:
-                    dl_capa = int(result.get('DL_CAPA', 0))
-                    g_dl_capa = int(result.get('G_DL_CAPA', 0))
-                    dl_calculated_capacity = dl_capa - g_dl_capa if dl_capa > 0 and g_dl_capa > 0 else 0
-                    
-                    dl_result = {
-                        "변전소": f"{result.get('SUBST_NM', '')}변전소",
-                        "주변압기": f"#{result.get('MTR_NO', '-')}",
-                        "배전선로": result.get('DL_NM', '-'),
-                        "접속기준용량(kW)": dl_capa,
-                        "접수기준접속용량(kW)": int(result.get('DL_PWR', 0)),
-                        "접속계획반영접속용량(kW)": g_dl_capa,
-                        "여유용량(kW)": f"{vol_3:,}",
-                        "접속계획반영여유용량(kW)": f"{dl_calculated_capacity:,}",
-                        "최종접속가능용량": f"{final_capacity:,}",
-                        "상태": final_status,
-                        "여유용량비율(%)": round((vol_3 / max(dl_capa, 1)) * 100, 1),
-                        # 원본 API 필드 보존
-                        "DL_CAPA": dl_capa,
-                        "G_DL_CAPA": g_dl_capa,
-                        "DL_PWR": int(result.get('DL_PWR', 0)),
-                        "VOL_3": vol_3
-                    }
-                    formatted_results.append(dl_result)
-        
-        return formatted_results
+        """KEPCO API 응답을 표준 형식으로 변환 (설비 단계별 행)"""
+        return to_level_records(normalize_mesh_rows(api_response.get("dlt_resultList", [])))
     
     def query_by_address(
         self,
@@ -376,88 +310,13 @@ class KEPCOService:
         capacity_range: Tuple[int, int],
         connection_types: List[str]
     ) -> List[Dict]:
-        """주소 기반 개발용 모의 응답 생성"""
+        """주소 기반 개발용 모의 응답 생성 (녹화 응답 재생, 없으면 주소별로 고정된 합성 행)"""
         
-        # 지연 시뮬레이션 (실제 API 호출과 유사한 경험)
-        time.sleep(1.5)
+        self._simulate_latency()
         
-        # 전북 전주시 덕진구 강흥동 예시 데이터
-        if "전주" in si and "덕진" in gu and "강흥" in dong:
-            # 최종접속가능용량은 변전소(98,496), 주변압기(10,741), 배전선로(0) 중 최소값 = 0
-            final_capacity = 0
-            final_status = "포화"
-            
-            return [
-                {
-                    "변전소": "전주변전소",
-                    "주변압기": "-",
-                    "배전선로": "-",
-                    "접속기준용량(kW)": 200000,
-                    "접수기준접속용량(kW)": 101504,
-                    "접속계획반영접속용량(kW)": 94381,
-                    "여유용량(kW)": "98,496",
-                    "접속계획반영여유용량(kW)": "105,619",
-                    "최종접속가능용량": f"{final_capacity:,}",
-                    "상태": final_status,
-                    "여유용량비율(%)": 49.2,
-                    # 원본 API 필드
-                    "SUBST_CAPA": 200000,
-                    "G_SUBST_CAPA": 94381,
-                    "SUBST_PWR": 101504,
-                    "VOL_1": 98496
-                },
-                {
-                    "변전소": "전주변전소",
-                    "주변압기": "#3",
-                    "배전선로": "-",
-                    "접속기준용량(kW)": 50000,
-                    "접수기준접속용량(kW)": 39259,
-                    "접속계획반영접속용량(kW)": 35665,
-                    "여유용량(kW)": "10,741",
-                    "접속계획반영여유용량(kW)": "14,335",
-                    "최종접속가능용량": f"{final_capacity:,}",
-                    "상태": final_status,
-                    "여유용량비율(%)": 21.5,
-                    # 원본 API 필드
-                    "MTR_CAPA": 50000,
-                    "G_MTR_CAPA": 35665,
-                    "MTR_PWR": 39259,
-                    "VOL_2": 10741
-                },
-                {
-                    "변전소": "전주변전소",
-                    "주변압기": "#3",
-                    "배전선로": "이서",
-                    "접속기준용량(kW)": 12000,
-                    "접수기준접속용량(kW)": 14915,
-                    "접속계획반영접속용량(kW)": 14314,
-                    "여유용량(kW)": "0",
-                    "접속계획반영여유용량(kW)": "-2,314",
-                    "최종접속가능용량": f"{final_capacity:,}",
-                    "상태": final_status,
-                    "여유용량비율(%)": 0.0,
-                    # 원본 API 필드
-                    "DL_CAPA": 12000,
-                    "G_DL_CAPA": 14314,
-                    "DL_PWR": 14915,
-                    "VOL_3": 0
-                }
-            ]
-        else:
-            # 다른 지역의 예시 데이터
-            return [
-                {
-                    "변전소": f"{si.replace('시', '')}변전소",
-                    "주변압기": "-",
-                    "배전선로": "-",
-                    "접속기준용량(kW)": random.randint(80000, 150000),
-                    "접수기준접속용량(kW)": random.randint(60000, 120000),
-                    "접속계획반영접속용량(kW)": random.randint(55000, 110000),
-                    "여유용량(kW)": f"{random.randint(5000, 25000):,}/{random.randint(8000, 30000):,}",
-                    "상태": "정상",
-                    "여유용량비율(%)": round(random.uniform(5.0, 25.0), 1)
-                }
-            ]
+        # 전북 전주시 덕진구 강흥동은 attached_assets의 실제 retrieveMeshNo 응답을 그대로 사용
+        mesh_rows = mesh_rows_for(sido, si, gu, dong, seed=self.mock_seed)
+        return to_level_records(normalize_mesh_rows(mesh_rows))
     
     def _generate_mock_response(
         self, 
@@ -469,15 +328,11 @@ class KEPCOService:
     ) -> List[Dict]:
         """개발용 모의 응답 생성 - 변전소별 주소 매핑 기반"""
         
-        # 지연 시뮬레이션 (실제 API 호출과 유사한 경험)
-        time.sleep(1.5)
-        
-        # 변전소별 주소 매핑을 통한 실제 주소 기반 검색 시뮬레이션
-        substation_address_map = self._get_substation_address_mapping()
-        address_info = substation_address_map.get(substation, None)
+        # 변전소 대표 주소를 통한 실제 주소 기반 검색 시뮬레이션
+        address_info = get_substation_index().address_of(substation)
         
         if address_info:
-            # 매핑된 주소로 주소 기반 검색 시뮬레이션
+            # 매핑된 주소로 주소 기반 검색 시뮬레이션 (지연은 주소 기반 모의 응답에서 한 번만 적용)
             return self._generate_mock_response_by_address(
                 address_info["do"],
                 address_info["si"], 
@@ -489,168 +344,17 @@ class KEPCOService:
                 connection_types or []
             )
         else:
-            # 매핑되지 않은 변전소의 경우 일반적인 데이터 생성
-            final_capacity = random.randint(5000, 25000)
-            status = "정상" if final_capacity > 1000 else "포화"
-            
-            return [
-                {
-                    "변전소": substation,
-                    "변전소코드": f"SUBST_{random.randint(1000, 9999)}",
-                    "주변압기": "-",
-                    "배전선로": "-",
-                    "배전선로코드": "",
-                    "변전소접속기준용량": f"{random.randint(80000, 150000):,} kW",
-                    "주변압기접속기준용량": "0 kW",
-                    "배전선로접속기준용량": "0 kW",
-                    "변전소접수기준접속용량": f"{random.randint(60000, 120000):,} kW",
-                    "주변압기접수기준접속용량": "0 kW",
-                    "배전선로접수기준접속용량": "0 kW",
-                    "변전소여유용량": f"{final_capacity:,} kW",
-                    "주변압기여유용량": "0 kW",
-                    "배전선로여유용량": "0 kW",
-                    "변전소접속계획반영접속용량": f"{random.randint(55000, 110000):,} kW",
-                    "주변압기접속계획반영접속용량": "0 kW",
-                    "배전선로접속계획반영접속용량": "0 kW",
-                    "최종접속가능용량": final_capacity,
-                    "상태": status,
-                    # 원본 API 데이터
-                    "SUBST_CAPA": random.randint(80000, 150000),
-                    "SUBST_PWR": random.randint(60000, 120000),
-                    "MTR_CAPA": 0,
-                    "MTR_PWR": 0,
-                    "DL_CAPA": 0,
-                    "DL_PWR": 0,
-                    "VOL_1": final_capacity,
-                    "VOL_2": 0,
-                    "VOL_3": 0,
-                    "G_SUBST_CAPA": random.randint(55000, 110000),
-                    "G_MTR_CAPA": 0,
-                    "G_DL_CAPA": 0
-                }
-            ]
+            # 매핑되지 않은 변전소는 변전소명 기준으로 고정된 합성 행 생성
+            self._simulate_latency()
+            mesh_rows = synthetic_mesh_rows(region, substation, "", "", seed=self.mock_seed)
+            for row in mesh_rows:
+                row["SUBST_NM"] = substation.replace("변전소", "")
+            return to_level_records(normalize_mesh_rows(mesh_rows))
     
-    def _get_substation_address_mapping(self) -> Dict[str, Dict[str, str]]:
-        """변전소별 주소 매핑 정보"""
-        return {
-            # 전북본부
-            "전주변전소": {
-                "do": "전북특별자치도",
-                "si": "전주시",
-                "gu": "덕진구", 
-                "lidong": "강흥동",
-                "li": "춘포리",
-                "jibun": "553-5"
-            },
-            "익산변전소": {
-                "do": "전북특별자치도",
-                "si": "익산시",
-                "gu": "익산시",
-                "lidong": "영등동",
-                "li": "",
-                "jibun": "100"
-            },
-            "군산변전소": {
-                "do": "전북특별자치도", 
-                "si": "군산시",
-                "gu": "군산시",
-                "lidong": "경암동",
-                "li": "",
-                "jibun": "200"
-            },
-            "정읍변전소": {
-                "do": "전북특별자치도",
-                "si": "정읍시", 
-                "gu": "정읍시",
-                "lidong": "시기동",
-                "li": "",
-                "jibun": "300"
-            },
-            
-            # 서울본부  
-            "강남변전소": {
-                "do": "서울특별시",
-                "si": "강남구",
-                "gu": "강남구",
-                "lidong": "역삼동",
-                "li": "",
-                "jibun": "100"
-            },
-            "강북변전소": {
-                "do": "서울특별시",
-                "si": "강북구", 
-                "gu": "강북구",
-                "lidong": "미아동",
-                "li": "",
-                "jibun": "200"
-            },
-            "강서변전소": {
-                "do": "서울특별시",
-                "si": "강서구",
-                "gu": "강서구", 
-                "lidong": "화곡동",
-                "li": "",
-                "jibun": "300"
-            },
-            "강동변전소": {
-                "do": "서울특별시",
-                "si": "강동구",
-                "gu": "강동구",
-                "lidong": "천호동", 
-                "li": "",
-                "jibun": "400"
-            },
-            "용산변전소": {
-                "do": "서울특별시",
-                "si": "용산구",
-                "gu": "용산구",
-                "lidong": "한강로동",
-                "li": "",
-                "jibun": "500"
-            },
-            
-            # 경기본부
-            "수원변전소": {
-                "do": "경기도",
-                "si": "수원시",
-                "gu": "영통구",
-                "lidong": "매탄동",
-                "li": "",
-                "jibun": "100"
-            },
-            "성남변전소": {
-                "do": "경기도", 
-                "si": "성남시",
-                "gu": "분당구",
-                "lidong": "정자동",
-                "li": "",
-                "jibun": "200"
-            },
-            "고양변전소": {
-                "do": "경기도",
-                "si": "고양시",
-                "gu": "일산동구", 
-                "lidong": "장항동",
-                "li": "",
-                "jibun": "300"
-            },
-            "안양변전소": {
-                "do": "경기도",
-                "si": "안양시",
-                "gu": "만안구",
-                "lidong": "안양동",
-                "li": "",
-                "jibun": "400"
-            },
-            "의정부변전소": {
-                "do": "경기도",
-                "si": "의정부시",
-                "gu": "의정부시",
-                "lidong": "의정부동",
-                "li": "",
-                "jibun": "500"
-            }
-        }
+    def _simulate_latency(self):
+        """모의 응답 지연 (KEPCO_MOCK_LATENCY초, 기본 0 - 데모에서만 실제 API와 비슷한 체감용으로 설정)"""
+        if self.mock_latency > 0:
+            time.sleep(self.mock_latency)
     
     def _load_mock_data(self) -> Dict:
         """모의 데이터 로드"""
@@ -696,18 +400,51 @@ class KEPCOService:
     
     def get_address_data(self, gbn: int, addr_do: str = "", addr_si: str = "", addr_gu: str = "", addr_lidong: str = "") -> Optional[List[Dict]]:
         """주소 데이터 조회 (시/도, 시/군, 구/군, 동/면, 리, 번지)"""
+        # 오프라인 스냅샷이 있으면 네트워크 없이 바로 응답
+        snapshot = get_address_snapshot()
+        if snapshot is not None:
+            snapshot_result = snapshot.children(gbn, addr_do, addr_si, addr_gu, addr_lidong)
+            if snapshot_result is not None:
+                METRICS.cache_access("address", True)
+                return snapshot_result
+        
+        cache_key = (gbn, addr_do, addr_si, addr_gu, addr_lidong)
+        cached = ADDRESS_CACHE.get(cache_key)
+        METRICS.cache_access("address", cached is not None)
+        if cached is not None:
+            return cached
+        
+        result = self._fetch_address_data(gbn, addr_do, addr_si, addr_gu, addr_lidong)
+        if result is not None:
+            ADDRESS_CACHE.set(cache_key, result)
+            return result
+        
+        # 원격 장애(회로 차단 포함) 시 만료된 캐시라도 제공
+        return ADDRESS_CACHE.get_stale(cache_key)
+    
+    def has_address_data(self, gbn: int, addr_do: str = "", addr_si: str = "", addr_gu: str = "", addr_lidong: str = "") -> bool:
+        """주소 목록이 스냅샷이나 캐시에 있어 원격 호출 없이 응답 가능한지 여부"""
+        snapshot = get_address_snapshot()
+        if snapshot is not None and snapshot.children(gbn, addr_do, addr_si, addr_gu, addr_lidong) is not None:
+            return True
+        return (gbn, addr_do, addr_si, addr_gu, addr_lidong) in ADDRESS_CACHE
+    
+    def _fetch_address_data(self, gbn: int, addr_do: str, addr_si: str, addr_gu: str, addr_lidong: str) -> Optional[List[Dict]]:
+        """주소 데이터 원격 조회 (캐시 미적용)"""
+        if gbn == -1:
+            labels = {"endpoint": "retrieveAddrInit", "gbn": ""}
+        else:
+            labels = {"endpoint": "retrieveAddrGbn", "gbn": str(gbn)}
+        
+        with METRICS.timer(UPSTREAM_METRIC, **labels) as timer:
+            result = self._request_address_data(gbn, addr_do, addr_si, addr_gu, addr_lidong)
+            timer.error = result is None
+        return result
+    
+    def _request_address_data(self, gbn: int, addr_do: str, addr_si: str, addr_gu: str, addr_lidong: str) -> Optional[List[Dict]]:
         try:
-            headers = {
-                "Content-Type": "application/json; charset=UTF-8",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
             if gbn == -1:  # 시/도 데이터 조회
-                response = requests.post(
-                    f"{self.base_url}retrieveAddrInit",
-                    headers=headers,
-                    timeout=10
-                )
+                response = self.client.post("retrieveAddrInit")
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -726,12 +463,7 @@ class KEPCOService:
                     }
                 }
                 
-                response = requests.post(
-                    f"{self.base_url}retrieveAddrGbn",
-                    headers=headers,
-                    json=payload,
-                    timeout=10
-                )
+                response = self.client.post("retrieveAddrGbn", payload)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -744,35 +476,68 @@ class KEPCOService:
             return None
     
     def retrieve_mesh_capacity(self, search_condition: str = "address", addr_do: str = "", addr_si: str = "", 
-                              addr_gu: str = "", addr_lidong: str = "", addr_li: str = "", addr_jibun: str = "") -> Optional[List[Dict]]:
-        """신·재생e 접속가능 용량 조회"""
-        try:
-            headers = {
-                "Content-Type": "application/json; charset=UTF-8",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Accept": "application/json",
-                "Origin": "https://online.kepco.co.kr",
-                "Referer": "https://online.kepco.co.kr/EWM092D00"
-            }
-            
-            payload = {
-                "dma_reqParam": {
-                    "searchCondition": search_condition,
-                    "do": addr_do,
-                    "si": addr_si,
-                    "gu": addr_gu,
-                    "lidong": addr_lidong,
-                    "li": addr_li,
-                    "jibun": addr_jibun
-                }
+                              addr_gu: str = "", addr_lidong: str = "", addr_li: str = "", addr_jibun: str = "",
+                              max_age: Optional[float] = None, allow_stale: bool = True) -> Optional[List[Dict]]:
+        """
+        신·재생e 접속가능 용량 조회 (max_age초 이내 저장 결과가 있으면 로컬에서 반환)
+        
+        원격 조회가 실패하면 allow_stale일 때 기간과 관계없이 마지막 저장 결과를 반환합니다.
+        """
+        address = (addr_do, addr_si, addr_gu, addr_lidong, addr_li, addr_jibun)
+        max_age = self.store_max_age if max_age is None else max_age
+        
+        if self.store is not None and max_age > 0:
+            stored_rows = self.store.get_mesh_rows(address, max_age=max_age)
+            METRICS.cache_access("mesh_store", stored_rows is not None)
+            if stored_rows is not None:
+                return stored_rows
+        
+        payload = self._mesh_payload(search_condition, *address)
+        rows = MESH_FLIGHT.do(
+            payload_key("retrieveMeshNo", payload),
+            lambda: self._fetch_and_store_mesh(payload, address)
+        )
+        if rows is None and allow_stale and self.store is not None:
+            # 원격 장애(회로 차단 포함) 시 오래된 저장 결과라도 제공
+            rows = self.store.get_mesh_rows(address)
+        return rows
+    
+    def _mesh_payload(self, search_condition: str, addr_do: str, addr_si: str, addr_gu: str,
+                      addr_lidong: str, addr_li: str, addr_jibun: str) -> Dict:
+        """retrieveMeshNo 요청 본문"""
+        return {
+            "dma_reqParam": {
+                "searchCondition": search_condition,
+                "do": addr_do,
+                "si": addr_si,
+                "gu": addr_gu,
+                "lidong": addr_lidong,
+                "li": addr_li,
+                "jibun": addr_jibun
             }
-            
-            response = requests.post(
-                f"{self.base_url}retrieveMeshNo",
-                headers=headers,
-                json=payload,
-                timeout=15
-            )
+        }
+    
+    def _fetch_and_store_mesh(self, payload: Dict, address: Tuple[str, ...]) -> Optional[List[Dict]]:
+        # 병합된 호출 1건만 실행되므로 저장도 1회만 수행
+        rows = self._post_mesh(payload)
+        if rows is not None:
+            if self.store is not None:
+                self.store.save_mesh_rows(address, rows)
+            self.topology.add_rows(address, rows)
+            if self.history is not None:
+                self.history.record_rows(rows)
+        return rows
+    
+    def _post_mesh(self, payload: Dict) -> Optional[List[Dict]]:
+        """신·재생e 접속가능 용량 원격 조회 (저장소 미적용)"""
+        with METRICS.timer(UPSTREAM_METRIC, endpoint="retrieveMeshNo", gbn="") as timer:
+            rows = self._request_mesh(payload)
+            timer.error = rows is None
+        return rows
+    
+    def _request_mesh(self, payload: Dict) -> Optional[List[Dict]]:
+        try:
+            response = self.client.post("retrieveMeshNo", payload)
             
             if response.status_code == 200:
                 data = response.json()
@@ -784,3 +549,50 @@ class KEPCOService:
         except requests.RequestException as e:
             print(f"용량 조회 오류: {str(e)}")
             return None
+
+
+class AsyncKEPCOService:
+    """KEPCOService 비동기 버전 (세마포어로 동시 요청 수 제한)"""
+    
+    def __init__(self, service: Optional[KEPCOService] = None, max_concurrency: int = 8):
+        # 파싱/캐시/커넥션 풀은 동기 서비스와 그대로 공유
+        self.service = service or KEPCOService()
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="kepco-async")
+    
+    async def _run(self, func, *args, **kwargs):
+        """동기 메서드를 전용 스레드 풀에서 실행"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def run(self, func, *args, **kwargs):
+        """조회 후처리까지 묶은 동기 함수를 같은 스레드 풀·동시 실행 제한으로 실행 (이벤트 루프 차단 방지)"""
+        return await self._run(func, *args, **kwargs)
+    
+    async def get_address_data(self, gbn: int, addr_do: str = "", addr_si: str = "", addr_gu: str = "", addr_lidong: str = "") -> Optional[List[Dict]]:
+        """주소 데이터 비동기 조회"""
+        return await self._run(self.service.get_address_data, gbn, addr_do, addr_si, addr_gu, addr_lidong)
+    
+    async def retrieve_mesh_capacity(self, search_condition: str = "address", addr_do: str = "", addr_si: str = "",
+                                     addr_gu: str = "", addr_lidong: str = "", addr_li: str = "", addr_jibun: str = "") -> Optional[List[Dict]]:
+        """신·재생e 접속가능 용량 비동기 조회"""
+        return await self._run(
+            self.service.retrieve_mesh_capacity,
+            search_condition, addr_do, addr_si, addr_gu, addr_lidong, addr_li, addr_jibun
+        )
+    
+    async def query_by_transformer_number(self, pole_number: str) -> Optional[Dict]:
+        """전산화번호로 배전용(공용)변압기 용량 비동기 조회"""
+        return await self._run(self.service.query_by_transformer_number, pole_number)
+    
+    def close(self):
+        """스레드 풀 정리"""
+        self._executor.shutdown(wait=False)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
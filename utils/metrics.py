@@ -0,0 +1,282 @@
+"""
+프로세스 내 성능 지표 (지연 히스토그램, 오류 수, 캐시 적중률)
+
+KEPCO 원격 호출은 엔드포인트별로, 정규화·차트·결과 화면은 처리 단계별로 지연을 기록합니다.
+히스토그램은 고정 버킷(누적 카운트)이라 관측 수와 관계없이 메모리가 일정하며,
+p50/p95/p99는 버킷 안에서 선형 보간해 계산합니다(Prometheus histogram_quantile과 같은 방식).
+
+노출:
+    - render_prometheus(): Prometheus 텍스트 형식 (start_metrics_server 또는 API 서버의 /metrics)
+    - snapshot(): 앱 관리자 화면용 dict
+"""
+import bisect
+import functools
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 지표 이름
+UPSTREAM_METRIC = "kepco_upstream_request_seconds"
+STAGE_METRIC = "kepcogrid_stage_seconds"
+CACHE_METRIC = "kepcogrid_cache_requests_total"
+
+# 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f"{key}=\"{value}\"")
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """고정 버킷 지연 히스토그램 (잠금은 레지스트리가 담당)"""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "errors", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """버킷 선형 보간 분위수 (초, 관측이 없으면 0)"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if i == len(self.bounds):
+                    return self.max  # +Inf 버킷은 최댓값으로 대체
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = min(self.bounds[i], self.max)
+                return lower + (upper - lower) * max(rank - cumulative, 0) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+
+class _Timer:
+    """timer() 컨텍스트 값 - 예외 없이 실패한 호출은 error = True로 표시"""
+
+    __slots__ = ("error",)
+
+    def __init__(self):
+        self.error = False
+
+
+class MetricsRegistry:
+    """지표 저장소 (스레드 안전)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._cache_counts: Dict[Tuple[str, str], int] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self.started_at = time.time()
+
+    # 기록
+    def observe(self, metric: str, seconds: float, error: bool = False, **labels):
+        key = (metric, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds, error)
+
+    def timer(self, metric: str, **labels) -> "_TimerContext":
+        """with 블록 실행 시간 기록 (예외가 나면 오류로 집계 후 그대로 전달)"""
+        return _TimerContext(self, metric, labels)
+
+    def timed(self, metric: str, **labels):
+        """함수 실행 시간 기록 데코레이터"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(metric, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def cache_access(self, cache: str, hit: bool):
+        key = (cache, "hit" if hit else "miss")
+        with self._lock:
+            self._cache_counts[key] = self._cache_counts.get(key, 0) + 1
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, float]]):
+        """조회 시점에 값을 읽는 게이지 등록 (같은 이름이면 교체) - {"지표명": 값} 반환 함수"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._cache_counts.clear()
+            self.started_at = time.time()
+
+    # 조회
+    def _gauges(self) -> Dict[str, float]:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges = {}
+        for name, collector in collectors:
+            try:
+                for metric, value in collector().items():
+                    gauges[metric] = float(value)
+            except Exception as e:
+                print(f"지표 수집 오류 ({name}): {str(e)}")
+        return gauges
+
+    def snapshot(self) -> Dict:
+        """관리자 화면용 요약 (지연은 ms)"""
+        with self._lock:
+            histograms = []
+            for (metric, labels), h in sorted(self._histograms.items()):
+                histograms.append({
+                    "metric": metric,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "errors": h.errors,
+                    "error_rate": round(h.errors / h.count, 4) if h.count else 0.0,
+                    "mean_ms": round(h.sum / h.count * 1000, 3) if h.count else 0.0,
+                    "p50_ms": round(h.quantile(0.50) * 1000, 3),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 3),
+                    "p99_ms": round(h.quantile(0.99) * 1000, 3),
+                    "max_ms": round(h.max * 1000, 3)
+                })
+
+            caches = []
+            for cache in sorted({cache for cache, _ in self._cache_counts}):
+                hits = self._cache_counts.get((cache, "hit"), 0)
+                misses = self._cache_counts.get((cache, "miss"), 0)
+                caches.append({
+                    "cache": cache,
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0
+                })
+            started_at = self.started_at
+
+        return {
+            "uptime_s": round(time.time() - started_at, 1),
+            "histograms": histograms,
+            "caches": caches,
+            "gauges": self._gauges()
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        lines: List[str] = []
+        with self._lock:
+            by_metric: Dict[str, List[Tuple[LabelKey, Histogram]]] = {}
+            for (metric, labels), h in sorted(self._histograms.items()):
+                by_metric.setdefault(metric, []).append((labels, h))
+
+            for metric, series in by_metric.items():
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, h in series:
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(h.bounds) + [math.inf], h.counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == math.inf else repr(bound)
+                        lines.append(f"{metric}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {h.sum!r}")
+                    lines.append(f"{metric}_count{_format_labels(labels)} {h.count}")
+                errors_metric = metric.replace("_seconds", "") + "_errors_total"
+                lines.append(f"# TYPE {errors_metric} counter")
+                for labels, h in series:
+                    lines.append(f"{errors_metric}{_format_labels(labels)} {h.errors}")
+
+            if self._cache_counts:
+                lines.append(f"# TYPE {CACHE_METRIC} counter")
+                for (cache, result), value in sorted(self._cache_counts.items()):
+                    lines.append(f"{CACHE_METRIC}{_format_labels((('cache', cache), ('result', result)))} {value}")
+
+        for metric, value in sorted(self._gauges().items()):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+class _TimerContext:
+    __slots__ = ("registry", "metric", "labels", "timer", "start")
+
+    def __init__(self, registry: MetricsRegistry, metric: str, labels: Dict):
+        self.registry = registry
+        self.metric = metric
+        self.labels = labels
+
+    def __enter__(self) -> _Timer:
+        self.timer = _Timer()
+        self.start = time.perf_counter()
+        return self.timer
+
+    def __exit__(self, exc_type, exc, tb):
+        error = exc_type is not None or self.timer.error
+        self.registry.observe(self.metric, time.perf_counter() - self.start, error=error, **self.labels)
+        return False
+
+
+_shared_metrics: Optional[MetricsRegistry] = None
+_shared_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """프로세스 전역 지표 저장소"""
+    global _shared_metrics
+
+    if _shared_metrics is None:
+        with _shared_metrics_lock:
+            if _shared_metrics is None:
+                _shared_metrics = MetricsRegistry()
+
+    return _shared_metrics
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """GET /metrics 로 Prometheus 텍스트를 제공하는 백그라운드 서버 시작"""
+    registry = registry or get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="kepco-metrics", daemon=True).start()
+    return server
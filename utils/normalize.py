@@ -0,0 +1,212 @@
+"""
+retrieveMeshNo 응답(dlt_resultList) 정규화 엔진
+
+응답 목록 전체를 한 번에 타입이 지정된 DataFrame으로 변환하고,
+여유용량/병목 설비/상태를 컬럼 단위로 계산합니다.
+화면 표시용 문자열("98,496 kW" 등)은 렌더링 시점에 format_capacity_record로만 생성합니다.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.metrics import STAGE_METRIC, get_metrics
+
+TEXT_FIELDS = ["SUBST_CD", "SUBST_NM", "MTR_NO", "DL_CD", "DL_NM"]
+INT_FIELDS = [
+    "SUBST_CAPA", "SUBST_PWR", "G_SUBST_CAPA",
+    "MTR_CAPA", "MTR_PWR", "G_MTR_CAPA",
+    "DL_CAPA", "DL_PWR", "G_DL_CAPA",
+    "VOL_1", "VOL_2", "VOL_3"
+]
+
+# 설비 단계별 (이름, 접속기준용량, 접수기준접속용량, 접속계획반영접속용량, 여유용량) 필드
+LEVELS = [
+    ("변전소", "SUBST_CAPA", "SUBST_PWR", "G_SUBST_CAPA", "VOL_1"),
+    ("주변압기", "MTR_CAPA", "MTR_PWR", "G_MTR_CAPA", "VOL_2"),
+    ("배전선로", "DL_CAPA", "DL_PWR", "G_DL_CAPA", "VOL_3")
+]
+LEVEL_NAMES = np.array([level[0] for level in LEVELS], dtype=object)
+
+# 화면 표시 라벨 → 원본 필드 (format_capacity_record에서 사용)
+DISPLAY_FIELDS = {
+    "변전소접속기준용량": "SUBST_CAPA",
+    "주변압기접속기준용량": "MTR_CAPA",
+    "배전선로접속기준용량": "DL_CAPA",
+    "변전소접수기준접속용량": "SUBST_PWR",
+    "주변압기접수기준접속용량": "MTR_PWR",
+    "배전선로접수기준접속용량": "DL_PWR",
+    "변전소여유용량": "VOL_1",
+    "주변압기여유용량": "VOL_2",
+    "배전선로여유용량": "VOL_3",
+    "변전소접속계획반영접속용량": "G_SUBST_CAPA",
+    "주변압기접속계획반영접속용량": "G_MTR_CAPA",
+    "배전선로접속계획반영접속용량": "G_DL_CAPA"
+}
+
+
+def int_columns(rows: List[Dict], fields: List[str]) -> Dict[str, np.ndarray]:
+    """
+    행 목록의 정수 필드를 열 단위로 한 번에 변환
+
+    pd.to_numeric(errors="coerce") 규칙: 숫자가 아니면("1,234", None 포함) 0, 소수는 버림, 무한대는 0.
+    정규화 엔진과 스냅샷 비교·여유용량 이력이 같은 값을 보도록 정수 변환은 이 함수로만 합니다.
+    """
+    if not rows or not fields:
+        return {field: np.zeros(len(rows), dtype="int64") for field in fields}
+
+    values = pd.Series([row.get(field) for row in rows for field in fields], dtype=object)
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy()
+    if numbers.dtype.kind == "f":
+        numbers = np.where(np.isfinite(numbers), numbers, 0)
+    matrix = numbers.astype("int64").reshape(len(rows), len(fields))
+    return {field: matrix[:, i] for i, field in enumerate(fields)}
+
+
+def _text_column(rows: List[Dict], field: str) -> np.ndarray:
+    values = [row.get(field) for row in rows]
+    return np.array(["" if value is None or value != value else str(value) for value in values], dtype=object)
+
+
+@get_metrics().timed(STAGE_METRIC, stage="normalize")
+def normalize_mesh_rows(rows: Optional[List[Dict]]) -> pd.DataFrame:
+    """
+    dlt_resultList를 정규화된 DataFrame으로 변환
+
+    추가 컬럼:
+        *_PLAN_VOL : 접속계획 반영 여유용량 (접속기준용량 - 접속계획반영접속용량, 둘 다 있을 때만)
+        FINAL_CAPA : 최종접속가능용량 - 접속계획 반영 접속용량 중 최소값 (병목 지점)
+        BOTTLENECK : FINAL_CAPA가 나온 설비 단계
+        STATUS     : 정상 / 포화
+        VOL_FINAL  : 접수기준 여유용량(VOL_1~3) 중 0보다 큰 값의 최소값, 없으면 0
+                     (단계별 레코드의 최종접속가능용량 - 기존 화면 값과 같은 규칙)
+
+    TEXT_FIELDS/INT_FIELDS 외의 응답 필드는 사용하지 않으므로 DataFrame에 담지 않습니다.
+    """
+    rows = rows or []
+    # 열을 모두 numpy 배열로 계산한 뒤 DataFrame은 마지막에 한 번만 생성 (열 단위 삽입 비용 회피)
+    columns = {field: _text_column(rows, field) for field in TEXT_FIELDS}
+    columns.update(int_columns(rows, INT_FIELDS))
+
+    for name, capa, _, g_capa, _ in LEVELS:
+        prefix = capa.split("_")[0]
+        columns[f"{prefix}_PLAN_VOL"] = np.where(
+            (columns[capa] > 0) & (columns[g_capa] > 0), columns[capa] - columns[g_capa], 0
+        )
+
+    # 최종 접속가능용량: 음수를 제외한 접속계획 반영 접속용량 중 최소값 (모두 음수면 전체 최소값)
+    planned = np.column_stack([columns[level[3]] for level in LEVELS]).astype("float64")
+    masked = np.where(planned >= 0, planned, np.inf)
+    all_negative = np.isinf(masked).all(axis=1)
+    masked[all_negative] = planned[all_negative]
+    bottleneck = masked.argmin(axis=1) if len(rows) else np.array([], dtype=int)
+
+    columns["FINAL_CAPA"] = masked.min(axis=1).astype("int64") if len(rows) else np.array([], dtype="int64")
+    columns["BOTTLENECK"] = LEVEL_NAMES[bottleneck]
+    columns["STATUS"] = np.where(columns["FINAL_CAPA"] > 0, "정상", "포화").astype(object)
+
+    # 접수기준 여유용량 중 0보다 큰 값의 최소값 (없으면 0) - 기존 _format_api_response와 같은 규칙
+    vols = np.column_stack([columns[level[4]] for level in LEVELS]).astype("float64")
+    vol_final = np.where(vols > 0, vols, np.inf).min(axis=1) if len(rows) else np.array([])
+    columns["VOL_FINAL"] = np.where(np.isinf(vol_final), 0, vol_final).astype("int64")
+
+    df = pd.DataFrame(columns)
+    return df
+
+
+def to_capacity_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    정규화 결과를 화면/기록용 레코드로 변환 (숫자는 정수 그대로 유지)
+
+    표시용 문자열이 필요하면 format_capacity_record를 사용합니다.
+    """
+    if df.empty:
+        return []
+
+    records = pd.DataFrame({
+        "변전소": df["SUBST_NM"],
+        "변전소코드": df["SUBST_CD"],
+        "주변압기": np.where(df["MTR_NO"] != "", "TR-" + df["MTR_NO"], "-"),
+        "배전선로": df["DL_NM"].replace("", "-"),
+        "배전선로코드": df["DL_CD"],
+        "최종접속가능용량": df["FINAL_CAPA"],
+        "병목설비": df["BOTTLENECK"],
+        "상태": df["STATUS"]
+    })
+    records = pd.concat([records, df[INT_FIELDS]], axis=1)
+    return records.to_dict("records")
+
+
+def format_capacity_record(record: Dict) -> Dict:
+    """레코드에 화면 표시용 문자열 필드 추가 (렌더링 시점에만 호출)"""
+    formatted = dict(record)
+    for label, field in DISPLAY_FIELDS.items():
+        value = record.get(field)
+        if isinstance(value, (int, np.integer)):
+            formatted[label] = f"{int(value):,} kW"
+    return formatted
+
+
+def to_level_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    정규화 결과를 설비 단계별 행(변전소/주변압기/배전선로)으로 펼친 레코드 반환
+
+    주변압기·배전선로 행은 해당 설비의 접속기준용량이 있을 때만 포함됩니다.
+    값은 모두 정수(비율은 소수)로 두고, 천 단위 구분 등 표시 형식은 렌더링 시점에 적용합니다.
+    (기존 출력의 여유용량/접속계획반영여유용량/최종접속가능용량 "1,234" 문자열이 정수로 바뀐 것 외에는 같은 값)
+    """
+    if df.empty:
+        return []
+
+    # 열을 한 번씩만 파이썬 리스트로 꺼내고, 행 순서대로 변전소 → 주변압기 → 배전선로 레코드 생성
+    subst_names = (df["SUBST_NM"] + "변전소").tolist()
+    mtr_names = ("#" + df["MTR_NO"].replace("", "-")).tolist()
+    dl_names = df["DL_NM"].replace("", "-").tolist()
+    final = df["VOL_FINAL"].to_numpy()
+    finals = final.tolist()
+    statuses = np.where(final > 0, "정상", "포화").tolist()
+
+    levels = []
+    for order, (name, capa, pwr, g_capa, vol) in enumerate(LEVELS):
+        prefix = capa.split("_")[0]
+        capa_values = df[capa].to_numpy()
+        vol_values = df[vol].to_numpy()
+        levels.append((
+            capa, pwr, g_capa, vol,
+            capa_values.tolist(),
+            df[pwr].tolist(),
+            df[g_capa].tolist(),
+            vol_values.tolist(),
+            df[f"{prefix}_PLAN_VOL"].tolist(),
+            np.round(vol_values / np.maximum(capa_values, 1) * 100, 1).tolist(),
+            # 주변압기·배전선로는 설비가 있을 때만
+            (capa_values > 0).tolist() if order > 0 else None,
+            mtr_names if order > 0 else None,
+            dl_names if order > 1 else None
+        ))
+
+    records = []
+    for i in range(len(df)):
+        for (capa, pwr, g_capa, vol, capas, pwrs, g_capas, vols, plan_vols, ratios,
+             exists, mtrs, dls) in levels:
+            if exists is not None and not exists[i]:
+                continue
+            records.append({
+                "변전소": subst_names[i],
+                "주변압기": mtrs[i] if mtrs is not None else "-",
+                "배전선로": dls[i] if dls is not None else "-",
+                "접속기준용량(kW)": capas[i],
+                "접수기준접속용량(kW)": pwrs[i],
+                "접속계획반영접속용량(kW)": g_capas[i],
+                "여유용량(kW)": vols[i],
+                "접속계획반영여유용량(kW)": plan_vols[i],
+                "최종접속가능용량": finals[i],
+                "상태": statuses[i],
+                "여유용량비율(%)": ratios[i],
+                # 원본 API 필드 보존
+                capa: capas[i],
+                g_capa: g_capas[i],
+                pwr: pwrs[i],
+                vol: vols[i]
+            })
+    return records
@@ -0,0 +1,146 @@
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class RateLimiter:
+    """토큰 버킷 방식 요청 속도 제한 (스레드 안전)"""
+
+    def __init__(self, rate: float = 2.0, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self) -> bool:
+        """토큰이 있으면 즉시 사용하고 True 반환"""
+        if self.rate <= 0:
+            return True
+
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """토큰을 얻을 때까지 대기"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """
+    프로세스 간 공유 토큰 버킷 (같은 호스트의 Streamlit/배치 작업이 하나의 한도를 나눠 씀)
+
+    버킷 상태(토큰 수, 갱신 시각)를 작은 파일에 두고 fcntl 파일 잠금으로 보호합니다.
+    fcntl을 쓸 수 없는 환경(Windows 등)에서는 프로세스 내부 RateLimiter로 동작합니다.
+    """
+
+    _STATE = struct.Struct("<dd")
+
+    def __init__(self, path: str, rate: float = 5.0, burst: int = 5):
+        self.path = path
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._local_lock = threading.Lock()
+        self._fallback: Optional[RateLimiter] = None
+
+        if fcntl is None:
+            self._fallback = RateLimiter(rate=rate, burst=burst)
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            print(f"공유 속도 제한 파일 오류, 프로세스 단위로 제한합니다: {str(e)}")
+            self._fallback = RateLimiter(rate=rate, burst=burst)
+
+    def _take(self) -> float:
+        """토큰 1개 사용을 시도하고, 부족하면 기다려야 할 시간(초) 반환"""
+        with self._local_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                data = os.pread(self._fd, self._STATE.size, 0)
+                now = time.time()
+                if len(data) == self._STATE.size:
+                    tokens, updated_at = self._STATE.unpack(data)
+                    tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+                else:
+                    tokens = float(self.burst)
+
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.pwrite(self._fd, self._STATE.pack(tokens, now), 0)
+                return wait
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def try_acquire(self) -> bool:
+        """토큰이 있으면 즉시 사용하고 True 반환"""
+        if self.rate <= 0:
+            return True
+        if self._fallback is not None:
+            return self._fallback.try_acquire()
+        return self._take() == 0.0
+
+    def acquire(self):
+        """토큰을 얻을 때까지 대기"""
+        if self.rate <= 0:
+            return
+        if self._fallback is not None:
+            self._fallback.acquire()
+            return
+
+        while True:
+            wait = self._take()
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+
+_shared_limiter: Optional[SharedRateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter() -> SharedRateLimiter:
+    """KEPCO 요청 전역 속도 제한 (KEPCO_RATE_LIMIT=0이면 제한 없음)"""
+    global _shared_limiter
+
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = SharedRateLimiter(
+                    path=os.getenv("KEPCO_RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "kepco_rate_limit.bin")),
+                    rate=float(os.getenv("KEPCO_RATE_LIMIT", "5")),
+                    burst=int(os.getenv("KEPCO_RATE_BURST", "5"))
+                )
+
+    return _shared_limiter
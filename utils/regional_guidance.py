@@ -0,0 +1,124 @@
+"""
+지역별 특별 안내사항 규칙 엔진
+
+규칙은 data/regional_guidance.json(버전 포함)에 두고, 로드 시 한 번만
+(시/도, 변전소코드) → 안내문 dict 색인으로 컴파일합니다. 규칙 변경은 파일만 교체하면
+실행 중인 프로세스에도 반영됩니다.
+
+우선순위:
+    1. global 규칙의 변전소코드 (지역 무관)
+    2. 지역 규칙의 변전소코드 (지역 내에서는 먼저 나온 규칙 우선)
+    3. 지역 default 안내문
+"""
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+import pandas as pd
+
+DEFAULT_RULES_PATH = "data/regional_guidance.json"
+
+
+class GuidanceEngine:
+    """컴파일된 지역별 안내사항 색인"""
+
+    def __init__(self, rules: Dict):
+        self.version = str(rules.get("version", ""))
+        messages = rules.get("messages", {})
+
+        def text(message: str) -> str:
+            # 메시지 키가 아니면 안내문 자체로 간주
+            return messages.get(message, message)
+
+        global_codes: Dict[str, str] = {}
+        for rule in rules.get("global", []):
+            for code in frozenset(rule["subst_codes"]):
+                global_codes.setdefault(code, text(rule["message"]))
+
+        region_codes: Dict[str, Dict[str, str]] = {}
+        region_default: Dict[str, str] = {}
+        for region, region_rules in rules.get("regions", {}).items():
+            codes = region_codes.setdefault(region, {})
+            for rule in region_rules.get("rules", []):
+                for code in frozenset(rule["subst_codes"]):
+                    codes.setdefault(code, text(rule["message"]))
+            if region_rules.get("default"):
+                region_default[region] = text(region_rules["default"])
+
+        self.global_codes: Mapping[str, str] = MappingProxyType(global_codes)
+        self.region_codes: Mapping[str, Mapping[str, str]] = MappingProxyType(
+            {region: MappingProxyType(codes) for region, codes in region_codes.items()}
+        )
+        self.region_default: Mapping[str, str] = MappingProxyType(region_default)
+        # 벡터화 조회용 (시/도, 변전소코드) 평탄화 색인
+        self._pair_index = {
+            (region, code): message
+            for region, codes in region_codes.items()
+            for code, message in codes.items()
+        }
+
+    def lookup(self, addr_do: str, subst_cd: str) -> Optional[str]:
+        """시/도와 변전소코드에 해당하는 안내문 (없으면 None)"""
+        message = self.global_codes.get(subst_cd)
+        if message is None:
+            message = self.region_codes.get(addr_do, {}).get(subst_cd)
+        if message is None:
+            message = self.region_default.get(addr_do)
+        return message
+
+    def apply(self, df: pd.DataFrame, region_col: str = "sido", code_col: str = "변전소코드") -> pd.Series:
+        """DataFrame 각 행의 안내문을 컬럼 단위로 계산 (해당 없으면 None)"""
+        if df.empty:
+            return pd.Series([], index=df.index, dtype="object")
+
+        regions = df[region_col].fillna("").astype(str)
+        codes = df[code_col].fillna("").astype(str)
+
+        result = codes.map(self.global_codes)
+        pairs = pd.Series(list(zip(regions, codes)), index=df.index)
+        result = result.fillna(pairs.map(self._pair_index))
+        result = result.fillna(regions.map(self.region_default))
+        return result.astype("object").where(result.notna(), None)
+
+
+def load_guidance_engine(path: str = DEFAULT_RULES_PATH) -> GuidanceEngine:
+    """규칙 파일을 읽어 엔진 생성 (파일이 없으면 규칙 없는 엔진)"""
+    if not os.path.exists(path):
+        return GuidanceEngine({})
+    with open(path, "r", encoding="utf-8") as f:
+        return GuidanceEngine(json.load(f))
+
+
+_shared_engine: Optional[GuidanceEngine] = None
+_shared_engine_mtime: Optional[float] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_guidance_engine() -> GuidanceEngine:
+    """
+    프로세스 전역 엔진 (KEPCO_GUIDANCE_RULES 경로)
+
+    규칙 파일이 바뀌면(수정 시각 기준) 다음 호출 때 다시 컴파일하므로 재배포 없이 반영됩니다.
+    """
+    global _shared_engine, _shared_engine_mtime
+
+    path = os.getenv("KEPCO_GUIDANCE_RULES", DEFAULT_RULES_PATH)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+
+    if _shared_engine is None or mtime != _shared_engine_mtime:
+        with _shared_engine_lock:
+            if _shared_engine is None or mtime != _shared_engine_mtime:
+                try:
+                    _shared_engine = load_guidance_engine(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"지역별 안내사항 규칙 로드 오류: {str(e)}")
+                    if _shared_engine is None:
+                        _shared_engine = GuidanceEngine({})
+                _shared_engine_mtime = mtime
+
+    return _shared_engine
@@ -0,0 +1,72 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    동일 키 동시 호출 병합 (single-flight)
+
+    같은 키로 진행 중인 호출이 있으면 새로 호출하지 않고 그 결과를 함께 받습니다.
+    호출이 끝나면 키는 즉시 해제되므로 결과를 보관하는 캐시는 아닙니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """key로 func 실행 (진행 중이면 대기 후 같은 결과 반환, 예외도 그대로 전달)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+def payload_key(endpoint: str, payload: Dict) -> str:
+    """요청 본문 정규화 키 (키 순서·앞뒤 공백과 무관)"""
+    def normalize(value):
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    return endpoint + ":" + json.dumps(normalize(payload), ensure_ascii=False, sort_keys=True)
@@ -0,0 +1,217 @@
+"""
+용량 스냅샷 증분 비교 (변경 설비 감지)
+
+새 수집 결과를 이전 스냅샷과 설비 키(SUBST_CD, MTR_NO, DL_CD)로 맞대어
+여유용량(G_*_CAPA, VOL_*)이 달라진 설비만 골라 전/후 값과 함께 내보냅니다.
+
+설비 행마다 여유용량 필드의 내용 해시를 계산해 두고, 비교 시에는 키로 이전 해시를 찾아
+같으면 바로 건너뜁니다(설비당 O(1)). 해시 색인은 스냅샷 디렉터리의 facility_hashes.json에
+전/후 값과 함께 저장되며, facilities.ndjson 크기/수정 시각이 같으면 다시 계산하지 않으므로
+직전 비교에서 '새 스냅샷'이었던 디렉터리는 다음 비교에서 파싱 없이 바로 읽힙니다.
+
+변경 레코드:
+    {"key": [...], "change": "changed" | "added" | "removed",
+     "subst_nm": ..., "dl_nm": ..., "before": {필드: 값} | None, "after": {필드: 값} | None,
+     "delta": {필드: 후-전}, "freed": 여유용량이 늘어난 필드가 있는지}
+
+"freed"는 필드 계열마다 방향이 다릅니다: 여유용량 VOL_*는 증가, 접속계획반영접속용량 G_*는
+이미 배정된 용량이므로 감소가 여유 확대입니다.
+
+수집기는 같은 --out으로 다시 실행하면 이어서 수집할 뿐 기존 설비 행을 갱신하지 않으므로,
+비교할 새 스냅샷은 새 디렉터리에 수집해야 합니다(capacity_crawler --dated).
+
+사용법:
+    python -m utils.capacity_crawler --out data/capacity_snapshot --dated
+    python -m utils.snapshot_diff --old data/capacity_snapshot/2026-10-01 --new data/capacity_snapshot/2026-10-17 --out changes.ndjson
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.capacity_crawler import FACILITIES_FILE, FacilityKey, _read_ndjson, facility_key
+from utils.normalize import int_columns
+
+HASH_INDEX_FILE = "facility_hashes.json"
+HASH_INDEX_VERSION = 2
+
+# 비교 대상 여유용량 필드 (정규화 엔진의 접속계획반영접속용량/접수기준 여유용량)
+HEADROOM_FIELDS = ["G_SUBST_CAPA", "G_MTR_CAPA", "G_DL_CAPA", "VOL_1", "VOL_2", "VOL_3"]
+_PACK = struct.Struct(f"<{len(HEADROOM_FIELDS)}q")
+
+# 여유용량이 늘어나는 변화 방향 (+1: 값 증가, -1: 값 감소)
+FREED_DIRECTION = {
+    "G_SUBST_CAPA": -1, "G_MTR_CAPA": -1, "G_DL_CAPA": -1,
+    "VOL_1": 1, "VOL_2": 1, "VOL_3": 1
+}
+
+# 색인 항목: (해시, 여유용량 값, 변전소명, 배전선로명)
+IndexEntry = Tuple[str, Tuple[int, ...], str, str]
+
+
+def headroom_values(rows: List[Dict]) -> List[Tuple[int, ...]]:
+    """행 목록의 여유용량 값 (정규화 엔진과 같은 int_columns 규칙으로 한 번에 변환)"""
+    columns = int_columns(rows, HEADROOM_FIELDS)
+    return list(zip(*(columns[field].tolist() for field in HEADROOM_FIELDS)))
+
+
+def values_hash(values: Tuple[int, ...]) -> str:
+    return hashlib.blake2b(_PACK.pack(*values), digest_size=8).hexdigest()
+
+
+def row_hash(row: Dict) -> str:
+    """설비 행의 여유용량 내용 해시 (수집 시각·주소 등 다른 필드는 무시)"""
+    return values_hash(headroom_values([row])[0])
+
+
+def _source_signature(snapshot_dir: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(os.path.join(snapshot_dir, FACILITIES_FILE))
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_hash_index(snapshot_dir: str) -> Dict[FacilityKey, IndexEntry]:
+    """facilities.ndjson을 한 번 읽어 설비별 해시 색인 생성"""
+    records = list(_read_ndjson(os.path.join(snapshot_dir, FACILITIES_FILE)))
+    rows = [record.get("row") or {} for record in records]
+
+    index = {}
+    for record, row, values in zip(records, rows, headroom_values(rows)):
+        key = tuple(record["key"]) if record.get("key") else facility_key(row)
+        index[key] = (values_hash(values), values, str(row.get("SUBST_NM", "")), str(row.get("DL_NM", "")))
+    return index
+
+
+def save_hash_index(snapshot_dir: str, index: Dict[FacilityKey, IndexEntry], signature: Optional[List[int]] = None):
+    path = os.path.join(snapshot_dir, HASH_INDEX_FILE)
+    data = {
+        "version": HASH_INDEX_VERSION,
+        "fields": HEADROOM_FIELDS,
+        "source": signature if signature is not None else _source_signature(snapshot_dir),
+        "entries": [[*key, digest, list(values), subst_nm, dl_nm]
+                    for key, (digest, values, subst_nm, dl_nm) in index.items()]
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_hash_index(snapshot_dir: str, rebuild: bool = False) -> Dict[FacilityKey, IndexEntry]:
+    """
+    스냅샷의 해시 색인 로드
+
+    저장된 색인이 현재 facilities.ndjson(크기/수정 시각)과 맞으면 그대로 사용하고,
+    없거나 오래됐으면 다시 만들어 저장합니다.
+    """
+    path = os.path.join(snapshot_dir, HASH_INDEX_FILE)
+    # 색인 생성 전후로 파일이 바뀌었는지 확인할 수 있도록 읽기 전에 서명 확보
+    signature = _source_signature(snapshot_dir)
+
+    if not rebuild and signature is not None and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (data.get("version") == HASH_INDEX_VERSION and data.get("fields") == HEADROOM_FIELDS
+                    and data.get("source") == signature):
+                return {(s, m, d): (digest, tuple(values), subst_nm, dl_nm)
+                        for s, m, d, digest, values, subst_nm, dl_nm in data["entries"]}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"해시 색인 로드 실패, 다시 생성합니다 ({path}): {str(e)}")
+
+    index = build_hash_index(snapshot_dir)
+    if signature is not None:
+        try:
+            save_hash_index(snapshot_dir, index, signature)
+        except OSError as e:
+            print(f"해시 색인 저장 실패 ({path}): {str(e)}")
+    return index
+
+
+def _change(key: FacilityKey, change: str, before: Optional[IndexEntry], after: Optional[IndexEntry]) -> Dict:
+    before_values = before[1] if before else None
+    after_values = after[1] if after else None
+    names = after or before
+
+    delta = {}
+    if before_values and after_values:
+        delta = {field: a - b for field, b, a in zip(HEADROOM_FIELDS, before_values, after_values) if a != b}
+
+    return {
+        "key": list(key),
+        "change": change,
+        "subst_nm": names[2],
+        "dl_nm": names[3],
+        "before": dict(zip(HEADROOM_FIELDS, before_values)) if before_values else None,
+        "after": dict(zip(HEADROOM_FIELDS, after_values)) if after_values else None,
+        "delta": delta,
+        "freed": any(value * FREED_DIRECTION[field] > 0 for field, value in delta.items())
+    }
+
+
+def diff_indexes(
+    old: Dict[FacilityKey, IndexEntry],
+    new: Dict[FacilityKey, IndexEntry],
+    include_added: bool = True,
+    include_removed: bool = True
+) -> Iterator[Dict]:
+    """두 해시 색인 비교 - 변경된 설비만 생성 (해시가 같은 설비는 값 비교 없이 건너뜀)"""
+    for key, after in new.items():
+        before = old.get(key)
+        if before is None:
+            if include_added:
+                yield _change(key, "added", None, after)
+        elif before[0] != after[0]:
+            yield _change(key, "changed", before, after)
+
+    if include_removed:
+        for key, before in old.items():
+            if key not in new:
+                yield _change(key, "removed", before, None)
+
+
+def diff_snapshots(old_dir: str, new_dir: str, include_added: bool = True, include_removed: bool = True) -> Iterator[Dict]:
+    """이전/새 스냅샷 디렉터리 비교"""
+    old = load_hash_index(old_dir)
+    new = load_hash_index(new_dir)
+    return diff_indexes(old, new, include_added=include_added, include_removed=include_removed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="용량 스냅샷 증분 비교 (변경 설비만 출력)",
+        epilog="같은 디렉터리에 재수집하면 설비 행이 갱신되지 않으므로 스냅샷마다 새 디렉터리"
+               "(capacity_crawler --dated)를 사용하세요."
+    )
+    parser.add_argument("--old", required=True, help="이전 스냅샷 디렉터리")
+    parser.add_argument("--new", required=True, help="새 스냅샷 디렉터리")
+    parser.add_argument("--out", default="-", help="변경 설비 NDJSON 출력 경로 (기본: 표준 출력)")
+    parser.add_argument("--freed-only", action="store_true", help="여유용량이 늘어난 설비만 출력")
+    parser.add_argument("--no-added", action="store_true", help="새로 생긴 설비 제외")
+    parser.add_argument("--no-removed", action="store_true", help="사라진 설비 제외")
+    args = parser.parse_args()
+
+    changes = diff_snapshots(args.old, args.new, include_added=not args.no_added, include_removed=not args.no_removed)
+
+    counts = {"changed": 0, "added": 0, "removed": 0}
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        for change in changes:
+            if args.freed_only and not change["freed"]:
+                continue
+            counts[change["change"]] += 1
+            out.write(json.dumps(change, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"변경 {counts['changed']:,}개, 신규 {counts['added']:,}개, 삭제 {counts['removed']:,}개", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+로컬 KEPCO 대역(stand-in) 서버
+
+retrieveAddrInit / retrieveAddrGbn / retrieveMeshNo / retrieveDl을 같은 경로·요청·응답 형식으로
+흉내 냅니다. attached_assets의 녹화 응답이 있으면 그대로 재생하고, 없으면 시드 기반 합성
+데이터를 돌려주므로 같은 시드에서는 항상 같은 결과를 얻습니다. 지연과 오류(429/503) 비율을
+지정해 재시도·회로 차단·캐시 동작을 실제 서버 없이 확인할 수 있습니다.
+
+사용법:
+    python -m utils.standin_server --port 8765 --latency 0.05 --error-rate 0.02
+    KEPCO_BASE_URL=http://127.0.0.1:8765/ew/cpct/ KEPCO_API_KEY=local streamlit run app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from utils.fixtures import (
+    DEFAULT_ASSETS_DIR,
+    RecordedFixtures,
+    load_recorded_fixtures,
+    synthetic_address_children,
+    synthetic_dl_states,
+    synthetic_mesh_rows
+)
+
+PATH_PREFIX = "/ew/cpct/"
+
+# 녹화본에 시/도 목록이 없을 때 사용하는 기본 목록
+DEFAULT_SIDO = [
+    "서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시", "대전광역시",
+    "울산광역시", "세종특별자치시", "경기도", "강원특별자치도", "충청북도", "충청남도",
+    "전북특별자치도", "전라남도", "경상북도", "경상남도", "제주특별자치도"
+]
+
+
+class StandinBackend:
+    """엔드포인트별 응답 생성 (HTTP와 분리되어 있어 직접 호출도 가능)"""
+
+    def __init__(
+        self,
+        fixtures: Optional[RecordedFixtures] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.fixtures = fixtures if fixtures is not None else load_recorded_fixtures()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        # 지연/오류 주입용 난수 (응답 내용과 별개로 시드 고정)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def handle(self, endpoint: str, body: Dict) -> Tuple[int, Dict]:
+        """(상태 코드, 응답 JSON) 반환"""
+        with self._rng_lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            status = self._rng.choice((429, 503))
+        with self._stats_lock:
+            self.requests += 1
+            if fail:
+                self.errors += 1
+
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            return status, {"rsMsg": {"statusCode": "E", "message": "주입된 오류"}}
+
+        handler = {
+            "retrieveAddrInit": self._addr_init,
+            "retrieveAddrGbn": self._addr_gbn,
+            "retrieveMeshNo": self._mesh_no,
+            "retrieveDl": self._dl
+        }.get(endpoint)
+        if handler is None:
+            return 404, {"rsMsg": {"statusCode": "E", "message": f"알 수 없는 엔드포인트: {endpoint}"}}
+        return 200, handler(body or {})
+
+    def _addr_init(self, body: Dict) -> Dict:
+        if self.fixtures.addr_init is not None:
+            return self.fixtures.addr_init
+        return {"rsMsg": {}, "dlt_sido": [{"ADDR_DO": sido} for sido in DEFAULT_SIDO]}
+
+    def _addr_gbn(self, body: Dict) -> Dict:
+        params = body.get("dma_addrGbn", {})
+        gbn = int(params.get("gbn", 0))
+        key = (gbn, params.get("addr_do", ""), params.get("addr_si", ""),
+               params.get("addr_gu", ""), params.get("addr_lidong", ""))
+
+        recorded = self.fixtures.addr_gbn.get(key)
+        if recorded is not None:
+            return recorded
+        if gbn not in range(5):
+            return {"rsMsg": {}, "dlt_addrGbn": [], "dlt_totCnt": [{"totCnt": "0"}]}
+
+        children = synthetic_address_children(gbn, *key[1:], seed=self.seed)
+        return {"rsMsg": {}, "dlt_addrGbn": children, "dlt_totCnt": [{"totCnt": str(len(children))}]}
+
+    def _mesh_no(self, body: Dict) -> Dict:
+        params = body.get("dma_reqParam", {})
+        key = (params.get("do", ""), params.get("si", ""), params.get("gu", ""), params.get("lidong", ""))
+
+        recorded = self.fixtures.mesh.get(key)
+        if recorded is not None:
+            return recorded
+        return {"rsMsg": {}, "dlt_resultList": synthetic_mesh_rows(*key, seed=self.seed)}
+
+    def _dl(self, body: Dict) -> Dict:
+        params = body.get("dma_reqDl", {})
+        key = (str(params.get("subst_cd", "")), str(params.get("dl_cd", "")))
+
+        recorded = self.fixtures.dl.get(key)
+        if recorded is not None:
+            return recorded
+        return {"rsMsg": {}, "dlt_resultDl": synthetic_dl_states(*key, seed=self.seed)}
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+def _make_handler(backend: StandinBackend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive (클라이언트 커넥션 풀 재사용)
+        # 헤더와 본문을 나눠 쓰므로 Nagle 지연(~40ms)이 응답마다 붙지 않도록 해제
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            if not self.path.startswith(PATH_PREFIX):
+                self._send(404, {"rsMsg": {"statusCode": "E", "message": "경로 없음"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw.decode("utf-8")) if raw else {}
+            except ValueError:
+                self._send(400, {"rsMsg": {"statusCode": "E", "message": "잘못된 요청 본문"}})
+                return
+
+            status, data = backend.handle(self.path[len(PATH_PREFIX):].split("?")[0], body)
+            self._send(status, data)
+
+        def _send(self, status: int, data: Dict):
+            payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(payload)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # 요청마다 stderr에 기록하지 않음 (벤치마크 시 출력 비용 제거)
+            pass
+
+    return Handler
+
+
+class StandinServer:
+    """백그라운드 스레드에서 실행되는 대역 서버 (with 문 지원)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, backend: Optional[StandinBackend] = None, **backend_options):
+        self.backend = backend or StandinBackend(**backend_options)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.backend))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """KEPCOHttpClient의 base_url로 사용할 주소 (KEPCO_BASE_URL과 같은 형식)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{PATH_PREFIX}"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="kepco-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 KEPCO 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1", help="바인드 주소")
+    parser.add_argument("--port", type=int, default=8765, help="포트 (0이면 임의 포트)")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 기본 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 지연 최댓값 (초, 균등 분포)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/503 오류 주입 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터/오류 주입 시드")
+    parser.add_argument("--assets", default=DEFAULT_ASSETS_DIR, help="녹화 응답 디렉터리")
+    args = parser.parse_args()
+
+    server = StandinServer(
+        args.host,
+        args.port,
+        fixtures=load_recorded_fixtures(args.assets),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed
+    )
+    print(f"KEPCO 대역 서버 실행 중: {server.base_url} (녹화 응답 {len(server.backend.fixtures)}건)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        stats = server.backend.stats()
+        print(f"종료: 요청 {stats['requests']:,}건, 주입 오류 {stats['errors']:,}건")
+
+
+if __name__ == "__main__":
+    main()
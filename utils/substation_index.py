@@ -0,0 +1,159 @@
+"""
+변전소 → 대표 주소 색인
+
+변전소명으로는 retrieveMeshNo를 직접 조회할 수 없으므로, 변전소별로 해당 변전소가
+공급하는 대표 주소 1건을 data/substation_addresses.json에 두고 주소 기반으로 조회합니다.
+수동 입력 항목에 capacity_crawler 수집 결과를 병합해 두며(merge_index_entries), 로드 후에는
+읽기 전용(MappingProxyType) 색인으로 변전소명 또는 SUBST_CD로 찾습니다.
+"""
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional
+
+DEFAULT_INDEX_PATH = "data/substation_addresses.json"
+INDEX_VERSION = 1
+ADDRESS_FIELDS = ["do", "si", "gu", "lidong", "li", "jibun"]
+SUFFIX = "변전소"
+
+
+def _base_name(name: str) -> str:
+    """'전주변전소' / '전주' → '전주'"""
+    name = (name or "").strip()
+    return name[:-len(SUFFIX)] if name.endswith(SUFFIX) else name
+
+
+class SubstationIndex:
+    """변전소명/SUBST_CD → 대표 주소 읽기 전용 색인"""
+
+    def __init__(self, entries: Iterable[Dict]):
+        by_name: Dict[str, Mapping] = {}
+        by_code: Dict[str, Mapping] = {}
+        self._count = 0
+        for entry in entries:
+            address = MappingProxyType({field: str(entry["address"].get(field, "")) for field in ADDRESS_FIELDS})
+            record = MappingProxyType({
+                "subst_nm": _base_name(entry.get("subst_nm", "")),
+                "subst_cd": str(entry.get("subst_cd", "") or ""),
+                "address": address
+            })
+            if record["subst_nm"]:
+                by_name.setdefault(record["subst_nm"], record)
+            if record["subst_cd"]:
+                by_code.setdefault(record["subst_cd"], record)
+            self._count += 1
+
+        self.by_name: Mapping[str, Mapping] = MappingProxyType(by_name)
+        self.by_code: Mapping[str, Mapping] = MappingProxyType(by_code)
+
+    def resolve(self, substation: str) -> Optional[Mapping]:
+        """변전소명('전주', '전주변전소') 또는 SUBST_CD로 색인 항목 조회"""
+        substation = (substation or "").strip()
+        return self.by_code.get(substation) or self.by_name.get(_base_name(substation))
+
+    def address_of(self, substation: str) -> Optional[Mapping[str, str]]:
+        """대표 주소 (do, si, gu, lidong, li, jibun) 조회, 없으면 None"""
+        record = self.resolve(substation)
+        return record["address"] if record else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, substation: str) -> bool:
+        return self.resolve(substation) is not None
+
+
+def read_index_data(path: str = DEFAULT_INDEX_PATH) -> Dict:
+    """색인 파일 원본 (파일이 없으면 빈 목록)"""
+    if not os.path.exists(path):
+        return {"version": INDEX_VERSION, "substations": []}
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != INDEX_VERSION:
+        raise ValueError(f"지원하지 않는 변전소 색인 버전: {data.get('version')}")
+    return data
+
+
+def read_substation_index(path: str = DEFAULT_INDEX_PATH) -> SubstationIndex:
+    """색인 파일 로드 (파일이 없으면 빈 색인)"""
+    return SubstationIndex(read_index_data(path).get("substations", []))
+
+
+def build_index_entries(snapshot: Dict) -> List[Dict]:
+    """
+    전국 수집 스냅샷(load_capacity_snapshot 결과)에서 변전소별 대표 주소 선정
+
+    변전소마다 공급 주소 중 정렬 순서상 첫 주소를 대표 주소로 사용합니다(재생성 시 결과 고정).
+    """
+    representatives: Dict[str, Dict] = {}
+    for (subst_cd, _, _), entry in snapshot.items():
+        if not subst_cd or not entry["addresses"]:
+            continue
+        address = min(tuple(a) for a in entry["addresses"])
+        current = representatives.get(subst_cd)
+        if current is None or address < current["_key"]:
+            representatives[subst_cd] = {
+                "_key": address,
+                "subst_nm": entry["row"].get("SUBST_NM", ""),
+                "subst_cd": subst_cd,
+                "address": dict(zip(ADDRESS_FIELDS, address))
+            }
+
+    return [
+        {k: v for k, v in record.items() if k != "_key"}
+        for _, record in sorted(representatives.items())
+    ]
+
+
+def merge_index_entries(existing: List[Dict], new: List[Dict]) -> List[Dict]:
+    """
+    기존 색인에 새 항목 병합
+
+    기존 항목(수동 입력 포함)은 그대로 두고, SUBST_CD와 변전소명이 모두 기존에 없는 변전소만 추가합니다.
+    일부 시/도만 수집한 결과로 갱신해도 다른 지역 변전소가 지워지지 않습니다.
+    """
+    codes = {str(entry.get("subst_cd", "") or "") for entry in existing} - {""}
+    names = {_base_name(entry.get("subst_nm", "")) for entry in existing} - {""}
+    merged = list(existing)
+    for entry in new:
+        code = str(entry.get("subst_cd", "") or "")
+        name = _base_name(entry.get("subst_nm", ""))
+        if (code and code in codes) or (name and name in names):
+            continue
+        merged.append(entry)
+        codes.add(code)
+        names.add(name)
+    return merged
+
+
+def write_substation_index(entries: List[Dict], path: str = DEFAULT_INDEX_PATH, source: str = "capacity_crawler"):
+    """색인 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "source": source, "substations": entries}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+_shared_index: Optional[SubstationIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_substation_index() -> SubstationIndex:
+    """프로세스 전역 색인 (KEPCO_SUBSTATION_INDEX 경로에서 최초 1회 로드)"""
+    global _shared_index
+
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                path = os.getenv("KEPCO_SUBSTATION_INDEX", DEFAULT_INDEX_PATH)
+                try:
+                    _shared_index = read_substation_index(path)
+                except (OSError, ValueError) as e:
+                    print(f"변전소 색인 로드 오류: {str(e)}")
+                    _shared_index = SubstationIndex([])
+
+    return _shared_index
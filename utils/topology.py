@@ -0,0 +1,274 @@
+"""
+변전소 → 주변압기 → 배전선로 → 주소 계통 인덱스
+
+retrieveMeshNo 결과의 각 행은 주소와 SUBST_CD/MTR_NO/DL_CD 계통을 연결합니다.
+이 관계를 양방향 dict로 유지하여 "이 포화 선로를 함께 쓰는 다른 마을은?",
+"이 변전소 아래 VOL_3 > 0인 선로는?" 같은 질의를 재수집 없이 바로 답합니다.
+
+사용법:
+    python -m utils.topology --db data/capacity.db --out data/topology.json
+    python -m utils.topology --snapshot data/capacity_snapshot --out data/topology.json
+"""
+import argparse
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+AddressKey = Tuple[str, str, str, str, str, str]
+FacilityKey = Tuple[str, str, str]
+
+DEFAULT_TOPOLOGY_PATH = "data/topology.json"
+TOPOLOGY_VERSION = 1
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _facility_key(row: Dict) -> FacilityKey:
+    return (str(row.get("SUBST_CD", "")), str(row.get("MTR_NO", "")), str(row.get("DL_CD", "")))
+
+
+class TopologyIndex:
+    """
+    계통 인덱스 (모든 조회는 dict 조회 1~2회, 스레드 안전)
+
+    loader를 주면 생성 시가 아니라 첫 조회/저장 시점에 (주소, 행 목록)을 읽어 구성합니다.
+    그 전에 add_rows로 들어온 주소는 loader 결과보다 최신이므로 그대로 유지합니다.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Iterable[Tuple[AddressKey, List[Dict]]]]] = None):
+        self._lock = threading.RLock()
+        self._loader = loader
+        # 구성 전에 add_rows로 갱신된 주소 (loader 결과로 덮어쓰지 않음)
+        self._updated: Set[AddressKey] = set()
+        # 정방향: 변전소 → 주변압기 → 배전선로
+        self._substations: Dict[str, Dict[str, Set[FacilityKey]]] = {}
+        self._substation_names: Dict[str, str] = {}
+        # 배전선로 → 최신 행 / 공급 주소
+        self._feeder_rows: Dict[FacilityKey, Dict] = {}
+        self._feeder_addresses: Dict[FacilityKey, Set[AddressKey]] = {}
+        # 역방향: 주소 → 배전선로
+        self._address_feeders: Dict[AddressKey, Set[FacilityKey]] = {}
+
+    def _ensure_loaded(self):
+        if self._loader is None:
+            return
+        with self._lock:
+            if self._loader is None:
+                return
+            try:
+                for address, rows in self._loader():
+                    address = tuple(address)
+                    if address not in self._updated:
+                        self._replace_rows(address, rows)
+            except Exception as e:
+                print(f"계통 인덱스 구성 오류: {str(e)}")
+            self._loader = None
+            self._updated.clear()
+
+    def add_rows(self, address: Iterable[str], rows: List[Dict]):
+        """주소 1건의 조회 결과 반영 (같은 주소의 이전 연결은 교체)"""
+        address = tuple(address)
+        with self._lock:
+            if self._loader is not None:
+                self._updated.add(address)
+            self._replace_rows(address, rows)
+
+    def _replace_rows(self, address: AddressKey, rows: List[Dict]):
+        with self._lock:
+            for old_key in self._address_feeders.pop(address, set()):
+                self._feeder_addresses.get(old_key, set()).discard(address)
+
+            keys = set()
+            for row in rows:
+                key = _facility_key(row)
+                subst_cd, mtr_no, _ = key
+                keys.add(key)
+                self._substations.setdefault(subst_cd, {}).setdefault(mtr_no, set()).add(key)
+                if row.get("SUBST_NM"):
+                    self._substation_names[subst_cd] = row["SUBST_NM"]
+                self._feeder_rows[key] = row
+                self._feeder_addresses.setdefault(key, set()).add(address)
+
+            if keys:
+                self._address_feeders[address] = keys
+
+    # 정방향 조회
+    def substations(self) -> List[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._substations)
+
+    def substation_name(self, subst_cd: str) -> str:
+        self._ensure_loaded()
+        return self._substation_names.get(subst_cd, "")
+
+    def transformers(self, subst_cd: str) -> List[str]:
+        """변전소의 주변압기 번호 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._substations.get(subst_cd, {}))
+
+    def feeders(self, subst_cd: str, mtr_no: Optional[str] = None) -> List[FacilityKey]:
+        """변전소(또는 주변압기) 아래 배전선로 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            transformers = self._substations.get(subst_cd, {})
+            if mtr_no is not None:
+                return sorted(transformers.get(mtr_no, set()))
+            return sorted(key for keys in transformers.values() for key in keys)
+
+    def addresses(self, feeder: FacilityKey) -> List[AddressKey]:
+        """배전선로가 공급하는 주소 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._feeder_addresses.get(tuple(feeder), set()))
+
+    def feeder_row(self, feeder: FacilityKey) -> Optional[Dict]:
+        """배전선로의 최신 retrieveMeshNo 행"""
+        self._ensure_loaded()
+        return self._feeder_rows.get(tuple(feeder))
+
+    # 역방향 조회
+    def feeders_for_address(self, address: Iterable[str]) -> List[FacilityKey]:
+        """주소에 연결된 배전선로 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._address_feeders.get(tuple(address), set()))
+
+    def neighbors(self, address: Iterable[str]) -> Dict[FacilityKey, List[AddressKey]]:
+        """주소와 같은 배전선로를 쓰는 다른 주소 (배전선로별)"""
+        self._ensure_loaded()
+        address = tuple(address)
+        with self._lock:
+            return {
+                key: sorted(self._feeder_addresses.get(key, set()) - {address})
+                for key in self._address_feeders.get(address, set())
+            }
+
+    def feeders_with_headroom(self, subst_cd: str, min_headroom: int = 1) -> List[Tuple[FacilityKey, int]]:
+        """변전소 아래 배전선로 여유용량(VOL_3)이 min_headroom 이상인 선로 (여유 큰 순)"""
+        self._ensure_loaded()
+        with self._lock:
+            result = [
+                (key, _to_int(self._feeder_rows[key].get("VOL_3")))
+                for key in self.feeders(subst_cd)
+            ]
+        result = [item for item in result if item[1] >= min_headroom]
+        return sorted(result, key=lambda item: -item[1])
+
+    def stats(self) -> Dict[str, int]:
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                "substations": len(self._substations),
+                "transformers": sum(len(t) for t in self._substations.values()),
+                "feeders": len(self._feeder_rows),
+                "addresses": len(self._address_feeders)
+            }
+
+    # 저장/복원
+    def save(self, path: str = DEFAULT_TOPOLOGY_PATH):
+        """JSON 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        self._ensure_loaded()
+        with self._lock:
+            data = {
+                "version": TOPOLOGY_VERSION,
+                "feeders": [
+                    {
+                        "key": key,
+                        "row": row,
+                        "addresses": sorted(self._feeder_addresses.get(key, set()))
+                    }
+                    for key, row in self._feeder_rows.items()
+                ]
+            }
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TOPOLOGY_PATH) -> "TopologyIndex":
+        """save로 저장한 파일에서 복원"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TOPOLOGY_VERSION:
+            raise ValueError(f"지원하지 않는 계통 인덱스 버전: {data.get('version')}")
+
+        # 주소별 행을 다시 모아 add_rows로 재구성
+        by_address: Dict[AddressKey, List[Dict]] = {}
+        for feeder in data["feeders"]:
+            for address in feeder["addresses"]:
+                by_address.setdefault(tuple(address), []).append(feeder["row"])
+
+        index = cls()
+        for address, rows in by_address.items():
+            index.add_rows(address, rows)
+        return index
+
+    @classmethod
+    def from_store(cls, store) -> "TopologyIndex":
+        """SQLite 용량 저장소의 주소별 최신 조회 결과로 구성 (첫 조회 시점에 읽음)"""
+        return cls(loader=store.iter_latest_mesh_rows)
+
+    @classmethod
+    def from_snapshot(cls, snapshot_dir: str) -> "TopologyIndex":
+        """전국 수집 스냅샷(capacity_crawler)으로 구성"""
+        from utils.capacity_crawler import load_capacity_snapshot
+
+        by_address: Dict[AddressKey, List[Dict]] = {}
+        for entry in load_capacity_snapshot(snapshot_dir).values():
+            for address in entry["addresses"]:
+                by_address.setdefault(tuple(address), []).append(entry["row"])
+
+        index = cls()
+        for address, rows in by_address.items():
+            index.add_rows(address, rows)
+        return index
+
+
+_shared_topology: Optional[TopologyIndex] = None
+_shared_topology_lock = threading.Lock()
+
+
+def get_shared_topology(store=None) -> TopologyIndex:
+    """프로세스 전역 계통 인덱스 (저장소 최신 결과는 시작 시가 아니라 첫 조회 때 읽음)"""
+    global _shared_topology
+
+    if _shared_topology is None:
+        with _shared_topology_lock:
+            if _shared_topology is None:
+                _shared_topology = TopologyIndex.from_store(store) if store is not None else TopologyIndex()
+
+    return _shared_topology
+
+
+def main():
+    parser = argparse.ArgumentParser(description="변전소/주변압기/배전선로 계통 인덱스 생성")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", default="data/capacity.db", help="SQLite 용량 저장소 경로")
+    source.add_argument("--snapshot", help="전국 수집 스냅샷 디렉터리")
+    parser.add_argument("--out", default=DEFAULT_TOPOLOGY_PATH, help="출력 JSON 경로")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        index = TopologyIndex.from_snapshot(args.snapshot)
+    else:
+        from utils.capacity_store import CapacityStore
+        index = TopologyIndex.from_store(CapacityStore(args.db))
+
+    index.save(args.out)
+    stats = index.stats()
+    print(f"계통 인덱스 저장 완료: {args.out} (변전소 {stats['substations']:,}개, 배전선로 {stats['feeders']:,}개, 주소 {stats['addresses']:,}건)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# 전산화번호 형식: 숫자4자리 + 영문1자리 + 숫자3자리 (예: 9185W431)
+POLE_NUMBER_PATTERN = r"\d{4}[A-Z]\d{3}"
+_POLE_NUMBER_RE = re.compile(POLE_NUMBER_PATTERN)
+
+PHASES = ["A상", "B상", "C상"]
+PHASE_FIELDS = ["기준용량", "가설누적용량", "여유용량"]
+
+
+def is_valid_pole_number(pole_number: str) -> bool:
+    """전산화번호 형식 검증 (대소문자 무시)"""
+    return bool(_POLE_NUMBER_RE.fullmatch(pole_number.strip().upper()))
+
+
+def parse_pole_numbers(text: str) -> List[str]:
+    """줄바꿈/쉼표/공백으로 구분된 전산화번호 목록 파싱"""
+    return [token for token in re.split(r"[\s,;]+", text) if token]
+
+
+def validate_pole_numbers(values: Iterable[str]) -> pd.DataFrame:
+    """전산화번호 일괄 정규화 및 형식 검증 (입력값, 전산화번호, 유효)"""
+    raw = pd.Series(list(values), dtype="object").fillna("").astype(str)
+    normalized = raw.str.strip().str.upper()
+    return pd.DataFrame({
+        "입력값": raw,
+        "전산화번호": normalized,
+        "유효": normalized.str.fullmatch(POLE_NUMBER_PATTERN)
+    })
+
+
+def flatten_transformer_result(pole_number: str, data: Optional[Dict]) -> Dict:
+    """변압기 조회 결과를 상별 컬럼의 1행으로 변환"""
+    row = {"전산화번호": pole_number}
+    if not data:
+        row["조회상태"] = "결과없음"
+        return row
+
+    row.update({
+        "본부": data.get("substation", ""),
+        "지사": data.get("branch", ""),
+        "가용": data.get("available", ""),
+        "조회상태": "정상"
+    })
+
+    phases = data.get("phases", {})
+    headrooms = {}
+    for phase in PHASES:
+        phase_data = phases.get(phase, {})
+        for field in PHASE_FIELDS:
+            row[f"{phase}_{field}"] = phase_data.get(field)
+        if phase_data.get("여유용량") is not None:
+            headrooms[phase] = phase_data["여유용량"]
+
+    if headrooms:
+        min_phase = min(headrooms, key=headrooms.get)
+        row["최소여유상"] = min_phase
+        row["최소여유용량"] = headrooms[min_phase]
+    return row
+
+
+def lookup_transformers(
+    service,
+    pole_numbers: Iterable[str],
+    concurrency: int = 8,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> pd.DataFrame:
+    """
+    전산화번호 목록 일괄 조회
+
+    형식 검증 후 중복을 제거하여 병렬 조회하고, 최소 상 여유용량 내림차순으로 정렬한
+    DataFrame을 반환합니다. 형식 오류 번호는 조회상태 '형식오류'로 포함됩니다.
+    """
+    validated = validate_pole_numbers(pole_numbers)
+    valid_numbers = list(dict.fromkeys(validated.loc[validated["유효"], "전산화번호"]))
+    invalid_numbers = list(dict.fromkeys(validated.loc[~validated["유효"], "입력값"]))
+
+    rows = []
+    if valid_numbers:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = executor.map(service.query_by_transformer_number, valid_numbers)
+            for done, (pole_number, data) in enumerate(zip(valid_numbers, results), start=1):
+                rows.append(flatten_transformer_result(pole_number, data))
+                if progress:
+                    progress(done, len(valid_numbers))
+
+    rows += [{"전산화번호": value, "조회상태": "형식오류"} for value in invalid_numbers]
+
+    columns = ["전산화번호", "본부", "지사", "가용", "조회상태", "최소여유상", "최소여유용량"]
+    columns += [f"{phase}_{field}" for phase in PHASES for field in PHASE_FIELDS]
+    df = pd.DataFrame(rows).reindex(columns=columns)
+    return df.sort_values("최소여유용량", ascending=False, na_position="last").reset_index(drop=True)